@@ -0,0 +1,268 @@
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import time
+import tracemalloc
+from typing import List, Optional
+
+import encrypt
+from encrypt import (CaesarCipher, CustomMappingCipher, ReverseCipher1, ReverseCipher2, Salting,
+                     VigenereCipher, XORCipher)
+
+# Input sizes in characters, from 10 B to 100 MB
+SIZES = [10, 1_000, 100_000, 10_000_000, 100_000_000]
+
+# Character mixes the inputs are drawn from
+MIXES = {
+    'letters': string.ascii_letters,
+    'punctuation': string.punctuation + ' ',
+    'non_ascii': string.ascii_letters + 'éüßøΩπжд漢字',
+    'special': encrypt.SPECIAL_CHAR,
+}
+
+# Every cipher class with the arguments its constructor takes after the text
+CIPHERS = {
+    'Salting': (Salting, (' salted',)),
+    'ReverseCipher1': (ReverseCipher1, ()),
+    'ReverseCipher2': (ReverseCipher2, ()),
+    'XORCipher': (XORCipher, ('gvsu',)),
+    'CaesarCipher': (CaesarCipher, (3,)),
+    'VigenereCipher': (VigenereCipher, ('lemon',)),
+    'CustomMappingCipher': (CustomMappingCipher, ()),
+}
+
+# Shortest timed run, small inputs are called in a loop until they take this long
+MIN_RUN_SECONDS = 0.01
+
+# Default fraction a throughput may drop, or peak memory grow, before it is flagged
+THRESHOLD = 0.25
+
+
+def make_text(size: int, mix: str, seed: int = 0) -> str:
+    """
+    Builds a reproducible benchmark input.
+
+    Args:
+        size (int): The number of characters.
+        mix (str): The name of a character mix in MIXES.
+        seed (int): The random seed.
+
+    Returns:
+        str: The text.
+    """
+    rng = random.Random(seed)
+    # Repeating one random block keeps 100 MB inputs quick to build
+    block = ''.join(rng.choice(MIXES[mix]) for _ in range(min(size, 1 << 16)))
+    return (block * (size // len(block) + 1))[:size] if block else ''
+
+
+def _measure(func, repeat: int, memory: bool) -> tuple:
+    """
+    Times a function and optionally measures its peak allocation.
+
+    Args:
+        func (Callable): The function to run.
+        repeat (int): How many timed runs to take the best of.
+        memory (bool): Measure the peak allocation with tracemalloc in an extra run.
+
+    Returns:
+        tuple: The best time per call in seconds and the peak bytes (None if not measured).
+    """
+    # Calls per timed run, raised until a run is long enough for the clock to resolve
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_RUN_SECONDS:
+            break
+        number *= 10
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def run(sizes: List[int], mixes: List[str], ciphers: List[str], memory: bool = True,
+        out=None) -> dict:
+    """
+    Benchmarks encryption and decryption of every cipher over every size and mix.
+
+    Encryption is timed as constructing the cipher object and reading its
+    cipher_text, which is only computed on first access, and decryption as calling
+    __str__ on an object whose ciphertext is already computed.
+
+    Args:
+        sizes (list): Input sizes in characters.
+        mixes (list): Names of character mixes in MIXES.
+        ciphers (list): Names of ciphers in CIPHERS.
+        memory (bool): Also measure peak allocations.
+        out: Where to print progress, None for silence.
+
+    Returns:
+        dict: The run's 'meta' data and its 'results', one entry per cipher, operation,
+            size and mix.
+    """
+    results = []
+    for size in sizes:
+        repeat = 5 if size <= 1_000_000 else 1
+        for mix in mixes:
+            text = make_text(size, mix)
+            for name in ciphers:
+                cls, args = CIPHERS[name]
+                obj = cls(text, *args)
+                obj.cipher_text
+                for operation, func in (('encrypt', lambda: cls(text, *args).cipher_text), ('decrypt', obj.__str__)):
+                    seconds, peak = _measure(func, repeat, memory)
+                    entry = {
+                        'cipher': name,
+                        'operation': operation,
+                        'size': size,
+                        'mix': mix,
+                        'seconds': seconds,
+                        'throughput': size / seconds if seconds else 0.0,
+                        'peak_bytes': peak,
+                    }
+                    results.append(entry)
+                    if out is not None:
+                        print(f'{name:20} {operation:8} {mix:12} {size:>11} B '
+                              f'{entry["throughput"] / 1e6:12.2f} MB/s', file=out)
+
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': encrypt.np.__version__ if encrypt.np is not None else None,
+        },
+        'results': results,
+    }
+
+
+def instance_memory(cls, args: tuple, count: int = 100_000, size: int = 32) -> float:
+    """
+    Measures the memory each cipher object holds once its ciphertext has been read.
+
+    The texts are built before measuring, so only the objects and what they keep alive
+    (the ciphertext and any per-instance state) are counted.
+
+    Args:
+        cls (type): The cipher class, from encrypt.py or any older copy of it.
+        args (tuple): The constructor arguments after the text.
+        count (int): How many objects to create.
+        size (int): The length of each text.
+
+    Returns:
+        float: The average bytes per object.
+    """
+    texts = [make_text(size, 'letters', seed) for seed in range(min(count, 64))]
+    texts = [text[1:] + text[0] + str(i) for i, text in enumerate(texts * (count // len(texts) + 1))][:count]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(text, *args) for text in texts]
+    for obj in objects:
+        obj.cipher_text
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The list holding the objects is not part of their cost
+    return (used - sys.getsizeof(objects)) / count
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[str]:
+    """
+    Finds the benchmarks that got slower or hungrier than the baseline allows.
+
+    Args:
+        baseline (dict): A saved run.
+        current (dict): The new run.
+        threshold (float): The fraction throughput may drop, or peak memory grow.
+
+    Returns:
+        list: One message per regression, empty if there are none.
+    """
+    def key(entry):
+        return entry['cipher'], entry['operation'], entry['size'], entry['mix']
+
+    before = {key(entry): entry for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        old = before.get(key(entry))
+        if old is None:
+            continue
+
+        label = '{} {} {} B {}'.format(*key(entry))
+        if entry['throughput'] < old['throughput'] * (1 - threshold):
+            regressions.append(f'{label}: throughput {old["throughput"] / 1e6:.2f} -> '
+                               f'{entry["throughput"] / 1e6:.2f} MB/s')
+        if old['peak_bytes'] and entry['peak_bytes'] and entry['peak_bytes'] > old['peak_bytes'] * (1 + threshold):
+            regressions.append(f'{label}: peak memory {old["peak_bytes"]} -> {entry["peak_bytes"]} B')
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point, run with `python bench.py`.
+
+    Args:
+        argv (list | None): The arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: 1 if a comparison found regressions, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the ciphers in encrypt.py.')
+    parser.add_argument('--max-size', type=int, default=100_000, help='largest input size to run, in characters')
+    parser.add_argument('--mixes', nargs='+', choices=list(MIXES), default=list(MIXES))
+    parser.add_argument('--ciphers', nargs='+', choices=list(CIPHERS), default=list(CIPHERS))
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory measurement')
+    parser.add_argument('--instances', type=int, metavar='N',
+                        help='only measure the memory per object over N objects of each cipher')
+    parser.add_argument('--save', help='write the results to this JSON baseline')
+    parser.add_argument('--compare', help='compare against this JSON baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='fraction of throughput loss or memory growth to flag')
+    args = parser.parse_args(argv)
+
+    if args.instances:
+        for name in args.ciphers:
+            cls, cipher_args = CIPHERS[name]
+            print(f'{name:20} {instance_memory(cls, cipher_args, args.instances):8.1f} B/object')
+        return 0
+
+    sizes = [size for size in SIZES if size <= args.max_size]
+    current = run(sizes, args.mixes, args.ciphers, not args.no_memory, sys.stdout)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        if regressions:
+            return 1
+        print('no regressions')
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
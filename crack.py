@@ -0,0 +1,268 @@
+import multiprocessing
+import os
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from encrypt import LOWER_CASE, CaesarCipher, VigenereCipher
+from encrypt_batch import imap_bounded
+
+# Relative frequency of each letter in English text, a to z
+ENGLISH = np.array([
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]) / 100
+
+# Index of coincidence of English text
+ENGLISH_IOC = float((ENGLISH ** 2).sum())
+
+# Longest Vigenere key tried when none is given
+MAX_KEY_LENGTH = 20
+
+# shifts[s, i] is the ciphertext letter that plaintext letter i becomes under shift s
+_SHIFTS = (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26
+
+
+def _letters(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the letters of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        tuple: The position of every ASCII letter in the text, and its index in the
+            alphabet (0 to 25, whatever the case).
+    """
+    if text.isascii():
+        codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    else:
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+    # Setting bit 5 turns upper-case ASCII letters into lower-case ones
+    folded = (codes | 0x20).astype(np.int64) - ord('a')
+    mask = (folded >= 0) & (folded < 26) & (codes < 128)
+    positions = np.flatnonzero(mask)
+    return positions, folded[positions]
+
+
+def _chi_squared(counts: np.ndarray) -> np.ndarray:
+    """
+    Scores every Caesar shift of one or more letter counts against English.
+
+    Args:
+        counts (np.ndarray): Letter counts, shape (..., 26).
+
+    Returns:
+        np.ndarray: The chi-squared statistic of every shift, shape (..., 26). Lower
+            is more English-like.
+    """
+    total = counts.sum(axis=-1, keepdims=True)[..., None]
+    expected = np.maximum(total * ENGLISH, 1e-9)
+    observed = counts[..., _SHIFTS]
+    return ((observed - expected) ** 2 / expected).sum(axis=-1)
+
+
+def crack_caesar(ciphertext: str) -> Tuple[int, str]:
+    """
+    Recovers the shift of a CaesarCipher ciphertext.
+
+    All 26 shifts are scored at once with a chi-squared test of the letter frequencies.
+
+    Args:
+        ciphertext (str): The encrypted text.
+
+    Returns:
+        tuple: The shift (0 to 25) and the decrypted text.
+    """
+    _, letters = _letters(ciphertext)
+    shift = int(np.argmin(_chi_squared(np.bincount(letters, minlength=26))))
+    return shift, CaesarCipher('', shift).cipher(ciphertext, -shift)
+
+
+def _column_counts(positions: np.ndarray, letters: np.ndarray, length: int) -> np.ndarray:
+    """
+    Counts the letters enciphered by each key position.
+
+    Args:
+        positions (np.ndarray): Where the letters are in the text.
+        letters (np.ndarray): The letters, 0 to 25.
+        length (int): The key length.
+
+    Returns:
+        np.ndarray: The letter counts of every key position, shape (length, 26).
+    """
+    return np.bincount((positions % length) * 26 + letters, minlength=length * 26).reshape(length, 26)
+
+
+def index_of_coincidence(ciphertext: str, max_length: int = MAX_KEY_LENGTH) -> Dict[int, float]:
+    """
+    Computes the average index of coincidence of the key columns for every key length.
+
+    The Vigenere cipher picks the key character by position in the whole text (spaces
+    and punctuation included), so columns are taken over character positions. For the
+    right key length each column is a Caesar cipher and scores close to English.
+
+    Args:
+        ciphertext (str): The encrypted text.
+        max_length (int): The longest key length to try.
+
+    Returns:
+        dict: The average index of coincidence of each key length.
+    """
+    positions, letters = _letters(ciphertext)
+    result = {}
+    for length in range(1, max_length + 1):
+        counts = _column_counts(positions, letters, length)
+        totals = counts.sum(axis=1)
+        pairs = np.maximum(totals * (totals - 1), 1)
+        result[length] = float(((counts * (counts - 1)).sum(axis=1) / pairs).mean())
+
+    return result
+
+
+def kasiski(ciphertext: str, max_length: int = MAX_KEY_LENGTH, limit: int = 1 << 20) -> Dict[int, int]:
+    """
+    Runs the Kasiski examination over the repeated trigrams of a ciphertext.
+
+    Plaintext repeated at a distance that is a multiple of the key length encrypts to the
+    same ciphertext, so the distances between repeated trigrams vote for their divisors.
+
+    Args:
+        ciphertext (str): The encrypted text.
+        max_length (int): The longest key length to vote for.
+        limit (int): How many leading characters to examine.
+
+    Returns:
+        dict: The number of distances each key length from 2 up divides.
+    """
+    text = ciphertext[:limit]
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.int64)
+    if len(codes) < 3:
+        return {length: 0 for length in range(2, max_length + 1)}
+
+    trigrams = (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+    order = np.argsort(trigrams, kind='stable')
+    same = trigrams[order[1:]] == trigrams[order[:-1]]
+    distances = (order[1:] - order[:-1])[same]
+    lengths = np.arange(2, max_length + 1)
+    votes = (distances[:, None] % lengths[None, :] == 0).sum(axis=0)
+    return dict(zip(lengths.tolist(), votes.tolist()))
+
+
+def estimate_key_length(ciphertext: str, max_length: int = MAX_KEY_LENGTH) -> int:
+    """
+    Estimates the key length of a VigenereCipher ciphertext.
+
+    Multiples of the key length score as well as the key length itself on the index of
+    coincidence, so every length within 10% of the best score is a candidate, and the
+    Kasiski examination picks among them. The shortest candidate wins a tie.
+
+    Args:
+        ciphertext (str): The encrypted text.
+        max_length (int): The longest key length to try.
+
+    Returns:
+        int: The estimated key length.
+    """
+    scores = index_of_coincidence(ciphertext, max_length)
+    best = max(scores.values())
+    candidates = [length for length, score in scores.items() if score >= best * 0.9]
+    votes = kasiski(ciphertext, max_length)
+    return max(candidates, key=lambda length: (votes.get(length, 0), -length))
+
+
+def crack_vigenere(ciphertext: str, max_length: int = MAX_KEY_LENGTH,
+                   key_length: Optional[int] = None) -> Tuple[str, str]:
+    """
+    Recovers the key of a VigenereCipher ciphertext.
+
+    Once the key length is known, every column is a Caesar cipher and all 26 shifts of
+    all columns are scored in one vectorized chi-squared test. Digit key characters are
+    recovered as the letter with the same shift ('1' as 'b').
+
+    Args:
+        ciphertext (str): The encrypted text, as produced from text with no characters
+            the cipher drops (otherwise the key positions are out of step).
+        max_length (int): The longest key length to try.
+        key_length (int | None): The key length, if it is known.
+
+    Returns:
+        tuple: The shortest key, in lower case, and the decrypted text.
+    """
+    if key_length is None:
+        key_length = estimate_key_length(ciphertext, max_length)
+
+    positions, letters = _letters(ciphertext)
+    scores = _chi_squared(_column_counts(positions, letters, key_length))
+    key = ''.join(LOWER_CASE[shift] for shift in np.argmin(scores, axis=1))
+
+    # A multiple of the key length recovers the key repeated, keep one copy
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key == key[:period] * (len(key) // period):
+            key = key[:period]
+            break
+
+    return key, VigenereCipher('', key).decrypt(ciphertext, key)
+
+
+def _crack(item: tuple):
+    """
+    Cracks one ciphertext in a worker process.
+
+    Args:
+        item (tuple): The cipher name, the ciphertext and the longest key length.
+
+    Returns:
+        tuple: The recovered key and plaintext.
+    """
+    cipher, ciphertext, max_length = item
+    if cipher == 'caesar':
+        return crack_caesar(ciphertext)
+    return crack_vigenere(ciphertext, max_length)
+
+
+def crack_many(ciphertexts: Iterable[str], cipher: str = 'caesar', workers: Optional[int] = None,
+               max_length: int = MAX_KEY_LENGTH) -> Iterator[tuple]:
+    """
+    Cracks many ciphertexts in parallel on a process pool.
+
+    The cipher is checked when this is called, the pool is started as the results
+    are iterated.
+
+    Args:
+        ciphertexts (Iterable[str]): The encrypted texts. Read lazily.
+        cipher (str): 'caesar' or 'vigenere'.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+        max_length (int): The longest Vigenere key length to try.
+
+    Returns:
+        Iterator[tuple]: The recovered key and plaintext of each ciphertext, in input
+            order.
+
+    Raises:
+        ValueError: If the cipher is not 'caesar' or 'vigenere', or workers is negative.
+    """
+    if cipher not in ('caesar', 'vigenere'):
+        raise ValueError('only caesar and vigenere ciphertexts can be cracked')
+    if workers is not None and workers < 0:
+        raise ValueError('workers cannot be negative')
+
+    workers = workers or os.cpu_count() or 1
+    items = ((cipher, ciphertext, max_length) for ciphertext in ciphertexts)
+    return _pooled_cracks(items, workers)
+
+
+def _pooled_cracks(items: Iterable[tuple], workers: int) -> Iterator[tuple]:
+    """
+    Cracks ciphertexts through a pool, see crack_many.
+
+    Args:
+        items (Iterable[tuple]): The cipher, ciphertext and longest key length of each.
+        workers (int): Number of worker processes.
+
+    Yields:
+        tuple: The recovered key and plaintext of each ciphertext, in input order.
+    """
+    with multiprocessing.Pool(workers) as pool:
+        yield from imap_bounded(pool, _crack, items, workers * 2)
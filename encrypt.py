@@ -1,4 +1,1144 @@
-class Salting:
+import argparse
+import codecs
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import ExitStack
+from functools import lru_cache, partial, wraps
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python engines are used without it
+    np = None
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Bytes handled per step by the buffer engines, a multiple of every small key length
+BLOCK_SIZE = 1 << 16
+
+LOWER_CASE = 'abcdefghijklmnopqrstuvwxyz'
+UPPER_CASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# Characters the Caesar and Vigenere ciphers pass through unchanged
+SPECIAL_CHAR = ' `~!@#$%^&*()_-+={[}|:;<,>./'
+
+# How many key schedules to keep, across every cipher
+KEY_SCHEDULE_CACHE_SIZE = 1024
+
+# The longest partial word a streaming word transform holds back, in characters
+MAX_PENDING_WORD = 1 << 20
+
+
+class TranslateTable(dict):
+    """
+    A str.translate table that deletes every character it has no entry for.
+    """
+
+    def __missing__(self, key: int) -> None:
+        return None
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe mapping that evicts the least recently used entry once it is full.
+
+    Lookups and stores take a lock, so one cache can be shared by every thread. Hits,
+    misses and evictions are counted to help choose a size.
+
+    Attributes:
+        maxsize (int): How many entries to keep, 0 disables the cache.
+        hits (int): Lookups that found an entry.
+        misses (int): Lookups that did not.
+        evictions (int): Entries dropped to stay within maxsize.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initializes an empty LRUCache.
+
+        Args:
+            maxsize (int): How many entries to keep, 0 disables the cache.
+
+        Raises:
+            ValueError: If maxsize is negative.
+        """
+        if maxsize < 0:
+            raise ValueError('maxsize must not be negative')
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Looks up an entry and marks it as the most recently used.
+
+        Args:
+            key: The entry's key.
+            default: What to return when the key is missing.
+
+        Returns:
+            The cached value, or `default`.
+        """
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value) -> None:
+        """
+        Stores an entry, evicting the least recently used ones if the cache is full.
+
+        Args:
+            key: The entry's key.
+            value: The value to cache.
+        """
+        if not self.maxsize:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict(self.maxsize)
+
+    def _evict(self, maxsize: int) -> None:
+        """
+        Drops the least recently used entries until at most `maxsize` are left. The
+        caller holds the lock.
+
+        Args:
+            maxsize (int): How many entries may stay.
+        """
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Changes the bound, evicting entries if the cache shrinks.
+
+        Args:
+            maxsize (int): The new bound, 0 disables and empties the cache.
+
+        Raises:
+            ValueError: If maxsize is negative.
+        """
+        if maxsize < 0:
+            raise ValueError('maxsize must not be negative')
+
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict(maxsize)
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets its counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Reports how well the cache is doing.
+
+        Returns:
+            dict: The hits, misses, evictions, current size and maxsize.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Key schedules (Caesar and mapping tables, Vigenere shifts, XOR keystream blocks) shared
+# by every cipher and thread, keyed by the function that builds them and its arguments
+KEY_SCHEDULE_CACHE = LRUCache(KEY_SCHEDULE_CACHE_SIZE)
+
+
+def set_key_schedule_cache(maxsize: int) -> None:
+    """
+    Bounds the key schedule cache shared by every cipher.
+
+    Args:
+        maxsize (int): How many schedules to keep, 0 rebuilds them on every call.
+    """
+    KEY_SCHEDULE_CACHE.resize(maxsize)
+
+
+def _key_schedule(func: Callable) -> Callable:
+    """
+    Caches a key schedule builder in KEY_SCHEDULE_CACHE.
+
+    Two threads missing on the same key at once may both build the schedule, the
+    second result simply replaces the first.
+
+    Args:
+        func (Callable): The builder, whose positional arguments must be hashable.
+
+    Returns:
+        Callable: The cached builder.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def cached(*args):
+        key = (name, args)
+        result = KEY_SCHEDULE_CACHE.get(key)
+        if result is None:
+            result = func(*args)
+            KEY_SCHEDULE_CACHE.put(key, result)
+        return result
+
+    return cached
+
+
+@_key_schedule
+def _caesar_table(shift: int) -> TranslateTable:
+    """
+    Compiles the Caesar cipher for one shift into a str.translate table.
+
+    Letters are shifted, spaces and special characters are kept and everything else
+    is dropped, as in CaesarCipher.cipher.
+
+    Args:
+        shift (int): The shift key, taken modulo 26.
+
+    Returns:
+        TranslateTable: The compiled table.
+    """
+    table = TranslateTable((ord(char), char) for char in SPECIAL_CHAR)
+    for i in range(26):
+        table[ord(LOWER_CASE[i])] = LOWER_CASE[(i + shift) % 26]
+        table[ord(UPPER_CASE[i])] = UPPER_CASE[(i + shift) % 26]
+
+    return table
+
+
+@_key_schedule
+def _caesar_byte_table(shift: int) -> tuple:
+    """
+    Compiles the Caesar cipher for one shift into bytes.translate arguments.
+
+    Args:
+        shift (int): The shift key, taken modulo 26.
+
+    Returns:
+        tuple: The 256-byte table and the bytes to delete.
+    """
+    return _byte_table(_caesar_table(shift % 26))
+
+
+@_key_schedule
+def _mapping_tables(items: tuple) -> tuple:
+    """
+    Compiles a character mapping into str.translate tables for both directions.
+
+    Args:
+        items (tuple): The (plain, cipher) character pairs of the mapping.
+
+    Returns:
+        tuple: The encryption table and the decryption table.
+    """
+    encrypt_table = TranslateTable((ord(k), v) for k, v in items)
+    decrypt_table = TranslateTable((ord(v), k) for k, v in items)
+    return encrypt_table, decrypt_table
+
+
+@_key_schedule
+def _mapping_byte_tables(items: tuple) -> tuple:
+    """
+    Compiles a character mapping into bytes.translate arguments for both directions.
+
+    Args:
+        items (tuple): The (plain, cipher) character pairs of the mapping.
+
+    Returns:
+        tuple: The (table, delete) pair for encryption and the one for decryption.
+
+    Raises:
+        ValueError: If the mapping has characters that do not fit in a byte.
+    """
+    return tuple(_byte_table(table) for table in _mapping_tables(items))
+
+
+def _byte_table(table: TranslateTable) -> tuple:
+    """
+    Converts a str.translate table into bytes.translate arguments.
+
+    Args:
+        table (TranslateTable): A table whose characters all fit in a byte.
+
+    Returns:
+        tuple: The 256-byte table and the bytes to delete.
+
+    Raises:
+        ValueError: If the table maps to a character that does not fit in a byte.
+    """
+    byte_table = bytearray(range(256))
+    delete = bytearray()
+    for byte in range(256):
+        char = table[byte]
+        if char is None:
+            delete.append(byte)
+        elif ord(char) > 255:
+            raise ValueError('translation table does not fit in bytes')
+        else:
+            byte_table[byte] = ord(char)
+
+    return bytes(byte_table), bytes(delete)
+
+
+@_key_schedule
+def _key_codes(key: str) -> tuple:
+    """
+    Computes the code point of every key character once.
+
+    Args:
+        key (str): The key.
+
+    Returns:
+        tuple: One code point per key character.
+    """
+    return tuple(map(ord, key))
+
+
+@_key_schedule
+def _xor_keystream(key: bytes, start: int) -> tuple:
+    """
+    Builds the keystream block _xor_buffer applies, for one key and starting position.
+
+    Args:
+        key (bytes): The key, one byte per key character.
+        start (int): The key position of the block's first byte.
+
+    Returns:
+        tuple: The block as bytes, and as a read-only NumPy array (or, without NumPy,
+            a little-endian integer).
+    """
+    rotated = key[start:] + key[:start]
+    block = rotated * max(1, BLOCK_SIZE // len(rotated))
+    if np is not None:
+        return block, np.frombuffer(block, dtype=np.uint8)
+
+    return block, int.from_bytes(block, 'little')
+
+
+def _xor_buffer(data: Buffer, key: bytes, offset: int = 0, inplace: bool = False) -> Buffer:
+    """
+    XORs a whole buffer with a repeating key.
+
+    The key is rotated to `offset` and tiled into one keystream block (cached in the
+    key schedule cache), which is then applied to the buffer a block at a time, so no
+    keystream as large as the input is ever built.
+
+    Args:
+        data (Buffer): The bytes to transform.
+        key (bytes): The key, one byte per key character.
+        offset (int): The key position of the first byte.
+        inplace (bool): Write the result back into `data`, which must be writable.
+
+    Returns:
+        Buffer: `data` itself when working in place, otherwise a new bytes object.
+
+    Raises:
+        TypeError: If `inplace` is set and `data` is read-only.
+    """
+    view = memoryview(data).cast('B')
+    if inplace and view.readonly:
+        raise TypeError
+
+    size = len(view)
+    if not size or not key:
+        # XOR with an empty key leaves the data as it is
+        return data if inplace else view.tobytes()
+
+    block, stream = _xor_keystream(key, offset % len(key))
+    step = len(block)
+
+    if np is not None:
+        source = np.frombuffer(view, dtype=np.uint8)
+        target = source if inplace else np.empty(size, dtype=np.uint8)
+        whole = size - size % step
+        # Broadcasting one keystream block over the rows covers everything but the tail
+        np.bitwise_xor(source[:whole].reshape(-1, step), stream, out=target[:whole].reshape(-1, step))
+        np.bitwise_xor(source[whole:], stream[:size - whole], out=target[whole:])
+        return data if inplace else target.tobytes()
+
+    # Without NumPy, XOR one block at a time as a single wide integer
+    target = view if inplace else bytearray(size)
+    for i in range(0, size, step):
+        chunk = view[i:i + step]
+        width = len(chunk)
+        mask = stream if width == step else int.from_bytes(block[:width], 'little')
+        target[i:i + width] = (int.from_bytes(chunk, 'little') ^ mask).to_bytes(width, 'little')
+
+    return data if inplace else bytes(target)
+
+
+@_key_schedule
+def _vigenere_shifts(key: str) -> tuple:
+    """
+    Computes the shift of every key character once.
+
+    Digits shift by their value and letters by their position in the alphabet,
+    whatever their case. Any other key character is marked with -1 and is only an
+    error if it lines up with a letter.
+
+    Args:
+        key (str): The Vigenere key.
+
+    Returns:
+        tuple: One shift per key character.
+    """
+    shifts = []
+    for key_char in key:
+        if key_char.isnumeric():
+            try:
+                shifts.append(int(key_char))
+            except ValueError:
+                shifts.append(-1)
+        elif key_char in LOWER_CASE:
+            shifts.append(LOWER_CASE.index(key_char))
+        elif key_char in UPPER_CASE:
+            shifts.append(UPPER_CASE.index(key_char))
+        else:
+            shifts.append(-1)
+
+    return tuple(shifts)
+
+
+@_key_schedule
+def _vigenere_rows(key: str, start: int, sign: int) -> 'np.ndarray':
+    """
+    Computes where each key position starts in the flattened _vigenere_lookup table.
+
+    Args:
+        key (str): The Vigenere key.
+        start (int): The key position of the first character.
+        sign (int): 1 to encrypt, -1 to decrypt.
+
+    Returns:
+        np.ndarray: One row offset per key position, rotated to `start`. Row 26 leaves
+            letters alone and stands for an invalid key character.
+    """
+    shifts = _vigenere_shifts(key)
+    shifts = shifts[start:] + shifts[:start]
+    rows = np.array([(sign * shift) % 26 * 256 if shift >= 0 else 26 * 256 for shift in shifts],
+                    dtype=np.int16)
+    rows.flags.writeable = False
+    return rows
+
+
+@_key_schedule
+def _shift_table(shift: int) -> dict:
+    """
+    Builds a str.translate table that shifts letters and leaves everything else alone.
+
+    Args:
+        shift (int): The shift, taken modulo 26.
+
+    Returns:
+        dict: The translation table.
+    """
+    table = {}
+    for i in range(26):
+        table[ord(LOWER_CASE[i])] = LOWER_CASE[(i + shift) % 26]
+        table[ord(UPPER_CASE[i])] = UPPER_CASE[(i + shift) % 26]
+
+    return table
+
+
+@lru_cache(maxsize=1)
+def _vigenere_keep_table() -> TranslateTable:
+    """
+    Builds the str.translate table that drops what the Vigenere cipher does not keep.
+
+    Returns:
+        TranslateTable: Keeps letters, spaces and special characters.
+    """
+    return TranslateTable((ord(char), char) for char in LOWER_CASE + UPPER_CASE + SPECIAL_CHAR)
+
+
+def _vigenere(text: Union[str, Buffer], key: str, offset: int = 0, sign: int = 1) -> Union[str, bytes]:
+    """
+    Applies the Vigenere shifts of a key to a whole text at once.
+
+    Letters are shifted by the key character at their position, spaces and special
+    characters are kept, and anything else is dropped while still using up its key
+    position, as in the original per-character loops.
+
+    Args:
+        text (str | Buffer): The text to transform. Bytes-like input is read as Latin-1.
+        key (str): The Vigenere key.
+        offset (int): The key position of the first character.
+        sign (int): 1 to encrypt, -1 to decrypt.
+
+    Returns:
+        str | bytes: The transformed text, of the same kind as the input.
+
+    Raises:
+        ValueError: If a letter lines up with a key character that is neither a
+            letter nor a digit.
+    """
+    if not text:
+        return text if isinstance(text, str) else b''
+
+    shifts = _vigenere_shifts(key)
+    start = offset % len(shifts)
+
+    if np is None:
+        shifts = shifts[start:] + shifts[:start]
+        if isinstance(text, str):
+            return _vigenere_slices(text, shifts, sign)
+
+        return _vigenere_slices(bytes(text).decode('latin-1'), shifts, sign).encode('latin-1')
+
+    if isinstance(text, str):
+        if text.isascii():
+            codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        else:
+            codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    else:
+        codes = np.frombuffer(memoryview(text).cast('B'), dtype=np.uint8)
+
+    lookup, keep, letters = _vigenere_lookup()
+    rows = _vigenere_rows(key, start, sign)
+    step = len(rows) * max(1, BLOCK_SIZE * 16 // len(rows))
+    rows = np.tile(rows, -(-min(step, len(codes)) // len(rows)))
+    invalid = rows == 26 * 256 if -1 in shifts else None
+
+    blocks = []
+    for i in range(0, len(codes), step):
+        block = codes[i:i + step]
+        size = len(block)
+        if block.dtype != np.uint8:
+            # Only ASCII is ever kept, so every wider code point can share column 255
+            block = np.minimum(block, 255).astype(np.uint8)
+
+        if invalid is not None and np.any(letters[block] & invalid[:size]):
+            raise ValueError('Vigenere key characters must be letters or digits')
+
+        result = lookup[rows[:size] + block]
+        blocks.append(result[keep[block]])
+
+    data = np.concatenate(blocks).tobytes()
+    if isinstance(text, str):
+        return data.decode('ascii')
+
+    return data
+
+
+@lru_cache(maxsize=1)
+def _vigenere_lookup() -> tuple:
+    """
+    Builds the NumPy lookup tables used by _vigenere.
+
+    Returns:
+        tuple: The flattened 27 x 256 table of shifted bytes (one row per shift plus
+            an identity row), the 256 entry mask of kept bytes and the 256 entry mask
+            of letters.
+    """
+    lookup = np.tile(np.arange(256, dtype=np.uint8), 27)
+    for shift in range(26):
+        for i in range(26):
+            lookup[shift * 256 + ord(LOWER_CASE[i])] = ord(LOWER_CASE[(i + shift) % 26])
+            lookup[shift * 256 + ord(UPPER_CASE[i])] = ord(UPPER_CASE[(i + shift) % 26])
+
+    letters = np.zeros(256, dtype=bool)
+    letters[np.frombuffer((LOWER_CASE + UPPER_CASE).encode('ascii'), dtype=np.uint8)] = True
+    keep = letters.copy()
+    keep[np.frombuffer(SPECIAL_CHAR.encode('ascii'), dtype=np.uint8)] = True
+    return lookup, keep, letters
+
+
+def _vigenere_slices(text: str, shifts: tuple, sign: int) -> str:
+    """
+    Pure Python fallback for _vigenere.
+
+    Every key position is a Caesar shift over one stride of the text, so each stride is
+    handled by a single str.translate call and the strides are woven back together
+    before dropping the characters the cipher does not keep.
+
+    Args:
+        text (str): The text to transform.
+        shifts (tuple): The key shifts, already rotated to the text's offset.
+        sign (int): 1 to encrypt, -1 to decrypt.
+
+    Returns:
+        str: The transformed text.
+
+    Raises:
+        ValueError: If a letter lines up with a key character that is neither a
+            letter nor a digit.
+    """
+    key_len = len(shifts)
+    step = key_len * max(1, BLOCK_SIZE // key_len)
+    letters = set(LOWER_CASE + UPPER_CASE)
+    result = []
+
+    for i in range(0, len(text), step):
+        block = text[i:i + step]
+        chars = list(block)
+        for j, shift in enumerate(shifts):
+            stride = block[j::key_len]
+            if shift < 0:
+                if letters.intersection(stride):
+                    raise ValueError('Vigenere key characters must be letters or digits')
+                continue
+            chars[j::key_len] = stride.translate(_shift_table((sign * shift) % 26))
+        result.append(''.join(chars).translate(_vigenere_keep_table()))
+
+    return ''.join(result)
+
+
+class ChunkTransform:
+    """
+    An incremental transform that applies a cipher to a stream of text chunks.
+
+    The base class handles ciphers that treat every character on its own, so each chunk
+    can be transformed as soon as it arrives. Subclasses carry whatever state a cipher
+    needs across chunk boundaries.
+
+    Attributes:
+        func (Callable): The function applied to each chunk.
+    """
+
+    def __init__(self, func: Callable) -> None:
+        """
+        Initializes the ChunkTransform with the function applied to each chunk.
+
+        Args:
+            func (Callable): Takes a chunk and returns the transformed chunk.
+        """
+        self.func = func
+
+    def update(self, chunk: str) -> str:
+        """
+        Transforms the next chunk of the stream.
+
+        Args:
+            chunk (str): The next piece of the input.
+
+        Returns:
+            str: The output that can be emitted so far (may be empty).
+        """
+        return self.func(chunk)
+
+    def finish(self) -> str:
+        """
+        Flushes any output held back by the transform.
+
+        Returns:
+            str: The remaining output (may be empty).
+        """
+        return ''
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Runs the transform over an iterable of chunks.
+
+        Args:
+            chunks (Iterable[str]): The input chunks.
+
+        Yields:
+            str: The non-empty output chunks, in order.
+        """
+        for chunk in chunks:
+            result = self.update(chunk)
+            if result:
+                yield result
+
+        result = self.finish()
+        if result:
+            yield result
+
+
+class KeyedChunkTransform(ChunkTransform):
+    """
+    A transform for ciphers that pick the key character by position (i % len(key)).
+
+    Attributes:
+        func (Callable): Takes a chunk and the key offset of its first character.
+        key_len (int): The length of the key.
+        offset (int): The key position of the next character in the stream.
+    """
+
+    def __init__(self, func: Callable, key_len: int) -> None:
+        """
+        Initializes the KeyedChunkTransform.
+
+        Args:
+            func (Callable): Takes a chunk and a key offset and returns the transformed chunk.
+            key_len (int): The length of the key.
+        """
+        super().__init__(func)
+        self.key_len = key_len
+        self.offset = 0
+
+    def update(self, chunk: str) -> str:
+        """
+        Transforms the next chunk and advances the key offset past it.
+        """
+        result = self.func(chunk, offset=self.offset)
+        if self.key_len:
+            self.offset = (self.offset + len(chunk)) % self.key_len
+        return result
+
+
+class WordChunkTransform(ChunkTransform):
+    """
+    A transform for ciphers that work word by word, holding back the last partial word.
+
+    A word can only be transformed once all of it has arrived, so the partial word is
+    capped at `max_pending` characters to keep memory bounded: a stream with a longer
+    run of characters without a space raises ValueError rather than growing without
+    limit.
+
+    Attributes:
+        func (Callable): Takes a run of complete words and returns the transformed text.
+        pending (str): The partial word waiting for the next chunk.
+        max_pending (int): The longest partial word held back.
+    """
+
+    def __init__(self, func: Callable, max_pending: int = MAX_PENDING_WORD) -> None:
+        """
+        Initializes the WordChunkTransform.
+
+        Args:
+            func (Callable): Takes text made of whole words and returns the transformed text.
+            max_pending (int): The longest partial word held back, in characters.
+        """
+        super().__init__(func)
+        self.pending = ''
+        self.max_pending = max_pending
+
+    def update(self, chunk: str) -> str:
+        """
+        Transforms every complete word seen so far and keeps the trailing partial word.
+
+        Raises:
+            ValueError: If the partial word grows past max_pending characters.
+        """
+        text = self.pending + chunk
+        split = text.rfind(' ')
+        pending = text[split + 1:]
+        if len(pending) > self.max_pending:
+            raise ValueError(f'words longer than {self.max_pending} characters cannot be streamed')
+
+        self.pending = pending
+        if split == -1:
+            return ''
+        return self.func(text[:split]) + ' '
+
+    def finish(self) -> str:
+        """
+        Transforms the last word of the stream.
+        """
+        result = self.func(self.pending) if self.pending else ''
+        self.pending = ''
+        return result
+
+
+class SuffixChunkTransform(ChunkTransform):
+    """
+    A transform that passes the stream through and appends a suffix at the end.
+
+    Attributes:
+        suffix (str): The text emitted after the last chunk.
+    """
+
+    def __init__(self, suffix: str) -> None:
+        """
+        Initializes the SuffixChunkTransform.
+
+        Args:
+            suffix (str): The text to append to the stream.
+        """
+        super().__init__(str)
+        self.suffix = suffix
+
+    def finish(self) -> str:
+        """
+        Emits the suffix.
+        """
+        return self.suffix
+
+
+class StripChunkTransform(ChunkTransform):
+    """
+    A transform that passes the stream through minus its last `size` characters.
+
+    A size of 0 emits nothing, as Salting does when it strips an empty salt with
+    text[:-0].
+
+    Attributes:
+        size (int): How many trailing characters to drop.
+        tail (str): The characters held back in case they belong to the end.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Initializes the StripChunkTransform.
+
+        Args:
+            size (int): How many trailing characters to drop.
+        """
+        super().__init__(str)
+        self.size = size
+        self.tail = ''
+
+    def update(self, chunk: str) -> str:
+        """
+        Emits everything except the last `size` characters seen so far.
+        """
+        if not self.size:
+            return ''
+
+        text = self.tail + chunk
+        self.tail = text[-self.size:]
+        return text[:-self.size]
+
+    def finish(self) -> str:
+        """
+        Discards the held back characters.
+        """
+        self.tail = ''
+        return ''
+
+
+class ReverseChunkTransform(ChunkTransform):
+    """
+    A transform that reverses the whole stream.
+
+    The first output character is the last input character, so nothing can be emitted
+    until the stream ends. The chunks are kept as they arrived and never joined, and
+    the output is produced one reversed chunk at a time.
+
+    Attributes:
+        chunks (list): The input chunks seen so far.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the ReverseChunkTransform with no chunks.
+        """
+        super().__init__(str)
+        self.chunks: List[str] = []
+
+    def update(self, chunk: str) -> str:
+        """
+        Stores the chunk until the end of the stream.
+        """
+        self.chunks.append(chunk)
+        return ''
+
+    def finish(self) -> str:
+        """
+        Returns the whole stream reversed.
+        """
+        result = ''.join(chunk[::-1] for chunk in reversed(self.chunks))
+        self.chunks = []
+        return result
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Reverses the stream, yielding one reversed input chunk at a time.
+        """
+        for chunk in chunks:
+            self.update(chunk)
+
+        while self.chunks:
+            chunk = self.chunks.pop()
+            if chunk:
+                yield chunk[::-1]
+
+
+class SaltedView(Sequence):
+    """
+    A read-only view of a text followed by a salt, without copying either.
+
+    Indexing, slicing, iteration and len() work as on the joined text, only the
+    characters asked for are copied. str() (or bytes() for bytes-like parts) builds
+    the joined text, and parts() hands both pieces to writers that accept several
+    buffers, such as file.writelines.
+
+    Attributes:
+        text (str | Buffer): The original text, which is also the decryption.
+        salt (str | Buffer): The salt appended to it.
+    """
+
+    __slots__ = ('text', 'salt')
+
+    def __init__(self, text: Union[str, Buffer], salt: Union[str, Buffer]) -> None:
+        """
+        Initializes the SaltedView.
+
+        Args:
+            text (str | Buffer): The original text.
+            salt (str | Buffer): The salt, of the same kind as the text.
+
+        Raises:
+            TypeError: If the text and salt are not both strings or both bytes-like.
+        """
+        if isinstance(text, str) != isinstance(salt, str):
+            raise TypeError
+
+        self.text = text
+        self.salt = salt
+
+    def __len__(self) -> int:
+        return len(self.text) + len(self.salt)
+
+    def __getitem__(self, index):
+        size = len(self.text)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1 and stop <= size:
+                return self.text[start:stop]
+            if step == 1 and start >= size:
+                return self.salt[start - size:stop - size]
+            if step == 1:
+                return self.text[start:] + self.salt[:stop - size]
+            return self._join()[index]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('SaltedView index out of range')
+        return self.text[index] if index < size else self.salt[index - size]
+
+    def __iter__(self) -> Iterator:
+        yield from self.text
+        yield from self.salt
+
+    def parts(self) -> tuple:
+        """
+        Returns the pieces of the view, in order.
+
+        Returns:
+            tuple: The text and the salt.
+        """
+        return self.text, self.salt
+
+    def _join(self):
+        """
+        Builds the salted text.
+
+        Returns:
+            str | bytes: The text followed by the salt.
+        """
+        if isinstance(self.text, str):
+            return self.text + self.salt
+        return b''.join((self.text, self.salt))
+
+    def __str__(self) -> str:
+        if isinstance(self.text, str):
+            return self._join()
+        return str(self._join())
+
+    def __bytes__(self) -> bytes:
+        if isinstance(self.text, str):
+            raise TypeError
+        return self._join()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SaltedView):
+            other = other._join()
+        if isinstance(other, (str, bytes, bytearray, memoryview)):
+            return len(other) == len(self) and other[:len(self.text)] == self.text \
+                and other[len(self.text):] == self.salt
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'SaltedView({self.text!r}, {self.salt!r})'
+
+
+class ReversedView(Sequence):
+    """
+    A read-only view of a text in reverse order, without building the reversed copy.
+
+    Indexing, slicing, iteration and len() work as on the reversed text, only the
+    characters asked for are copied. str() (or bytes() for a bytes-like text) builds
+    the reversed text, and a bytes-like text can also be exported as a memoryview
+    with a negative stride, which is still a view of the original buffer.
+
+    Attributes:
+        text (str | Buffer): The original text, which is also the decryption.
+    """
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: Union[str, Buffer]) -> None:
+        """
+        Initializes the ReversedView.
+
+        Args:
+            text (str | Buffer): The original text.
+
+        Raises:
+            TypeError: If the text is neither a string nor bytes-like.
+        """
+        if not isinstance(text, (str, bytes, bytearray, memoryview)):
+            raise TypeError
+
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, index):
+        size = len(self.text)
+        if isinstance(index, slice):
+            indices = range(size)[index]
+            if not indices:
+                return self.text[0:0]
+            # Position i of the view is position size - 1 - i of the text
+            stop = size - 1 - indices.stop
+            return self.text[size - 1 - indices.start:stop if stop >= 0 else None:-indices.step]
+
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('ReversedView index out of range')
+        return self.text[size - 1 - index]
+
+    def __iter__(self) -> Iterator:
+        return reversed(self.text)
+
+    def __reversed__(self) -> Iterator:
+        return iter(self.text)
+
+    def memoryview(self) -> memoryview:
+        """
+        Exports the reversed bytes as a memoryview of the original buffer.
+
+        Returns:
+            memoryview: A view with a negative stride.
+
+        Raises:
+            TypeError: If the text is a string.
+        """
+        if isinstance(self.text, str):
+            raise TypeError
+        return memoryview(self.text).cast('B')[::-1]
+
+    def __str__(self) -> str:
+        if isinstance(self.text, str):
+            return self.text[::-1]
+        return str(bytes(self))
+
+    def __bytes__(self) -> bytes:
+        return self.memoryview().tobytes()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ReversedView):
+            return self.text == other.text
+        if isinstance(other, str) and isinstance(self.text, str):
+            return other[::-1] == self.text
+        if isinstance(other, (bytes, bytearray, memoryview)) and not isinstance(self.text, str):
+            return memoryview(other).cast('B')[::-1] == memoryview(self.text).cast('B')
+        if isinstance(other, (str, bytes, bytearray, memoryview)):
+            return False
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'ReversedView({self.text!r})'
+
+
+# Plaintexts returned by __str__, keyed by cipher, key and ciphertext. Off by default.
+PLAINTEXT_CACHE = LRUCache(0)
+
+
+def set_plaintext_cache(maxsize: int) -> None:
+    """
+    Bounds the cache of decrypted plaintexts shared by every cipher object.
+
+    With a cache, calling str() again on a record (or on another record with the same
+    cipher, key and ciphertext) returns the stored plaintext instead of decrypting again.
+
+    Args:
+        maxsize (int): How many plaintexts to keep, 0 turns the cache off.
+    """
+    PLAINTEXT_CACHE.resize(maxsize)
+
+
+class _LazyCipher:
+    """
+    The storage shared by the cipher classes.
+
+    Instances use __slots__ instead of a per-instance __dict__. The ciphertext is only
+    computed the first time cipher_text is read, after which the plaintext is let go.
+    Subclasses implement _encrypt_text and _decrypt_text and list their key attributes
+    in __slots__, which also names the parts of the plaintext cache key.
+    """
+
+    __slots__ = ('_text', '_cipher_text')
+
+    def _set_text(self, text: str) -> None:
+        """
+        Stores the text to encrypt once cipher_text is first read.
+
+        Args:
+            text (str): The original text.
+        """
+        self._text = text
+        self._cipher_text = None
+
+    @property
+    def cipher_text(self) -> str:
+        """
+        The encrypted text, computed on first access.
+        """
+        if self._cipher_text is None:
+            self._cipher_text = self._encrypt_text(self._text)
+            self._text = None
+        return self._cipher_text
+
+    @cipher_text.setter
+    def cipher_text(self, value: str) -> None:
+        self._cipher_text = value
+        self._text = None
+
+    def __str__(self) -> str:
+        """
+        Returns the decrypted text, from the plaintext cache when it is turned on.
+
+        Returns:
+            str: The decrypted text.
+        """
+        if not PLAINTEXT_CACHE.maxsize:
+            return self._decrypt_text()
+
+        key = (type(self), tuple(getattr(self, name) for name in self.__slots__), self.cipher_text)
+        result = PLAINTEXT_CACHE.get(key)
+        if result is None:
+            result = self._decrypt_text()
+            PLAINTEXT_CACHE.put(key, result)
+        return result
+
+
+class Salting(_LazyCipher):
     """
     A class that applies salting to a given text.
 
@@ -7,36 +1147,99 @@ class Salting:
         cipher_text (str): The result of the original text concatenated with the salt.
     """
 
+    __slots__ = ('salt',)
+
     def __init__(self, text: str, salt: str) -> None:
         """
         Initializes the Salting class with the provided text and salt.
 
         Args:
-            text (str): The original text that will be salted.
-            salt (str): The salt string to append to the text.
+            text (str): The original text that will be salted.
+            salt (str): The salt string to append to the text.
+
+        Raises:
+            TypeError: If the provided text or salt is not a string.
+        """
+        if not isinstance(text, str):
+            raise TypeError
+        if not isinstance(salt, str):
+            raise TypeError
+
+        self.salt = salt
+        self._set_text(text)
+
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Appends the salt to the text.
+
+        Args:
+            text (str): The original text.
+
+        Returns:
+            str: The salted text.
+        """
+        return text + self.salt
+
+    def _decrypt_text(self) -> str:
+        """
+        Returns the original text by removing the salt.
+
+        Returns:
+            str: The original text before salting.
+        """
+        return self.cipher_text[:-len(self.salt)]
+
+    @classmethod
+    def view(cls, text: Union[str, Buffer], salt: Union[str, Buffer]) -> SaltedView:
+        """
+        Salts a text without copying it, for large payloads.
+
+        Args:
+            text (str | Buffer): The original text.
+            salt (str | Buffer): The salt, of the same kind as the text.
+
+        Returns:
+            SaltedView: The salted text. Its text attribute is the decryption.
+
+        Raises:
+            TypeError: If the text and salt are not both strings or both bytes-like.
+        """
+        return SaltedView(text, salt)
+
+    @classmethod
+    def encoder(cls, salt: str) -> ChunkTransform:
+        """
+        Creates a streaming encoder that salts a stream of chunks.
+
+        Args:
+            salt (str): The salt string to append to the stream.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
 
         Raises:
-            TypeError: If the provided text or salt is not a string.
+            TypeError: If the provided salt is not a string.
         """
-        if not isinstance(text, str):
-            raise TypeError
-        if not isinstance(salt, str):
-            raise TypeError
-
-        self.salt = salt
-        self.cipher_text = text + self.salt
+        return SuffixChunkTransform(cls('', salt).salt)
 
-    def __str__(self) -> str:
+    @classmethod
+    def decoder(cls, salt: str) -> ChunkTransform:
         """
-        Returns the original text by removing the salt.
+        Creates a streaming decoder that removes the trailing salt from a stream of chunks.
+
+        Args:
+            salt (str): The salt string that was appended to the stream.
 
         Returns:
-            str: The original text before salting.
+            ChunkTransform: The incremental decoder.
+
+        Raises:
+            TypeError: If the provided salt is not a string.
         """
-        return self.cipher_text[:-len(self.salt)]
+        return StripChunkTransform(len(cls('', salt).salt))
 
     
-class ReverseCipher1:
+class ReverseCipher1(_LazyCipher):
     """
     A class that encrypts a given text by reversing its characters.
 
@@ -44,6 +1247,8 @@ class ReverseCipher1:
         cipher_text (str): The encrypted (reversed) version of the provided text.
     """
 
+    __slots__ = ()
+
     def __init__(self, text: str) -> None:
         """
         Initializes the ReverseCipher1 class and encrypts the provided text by reversing it.
@@ -57,7 +1262,13 @@ class ReverseCipher1:
         if not isinstance(text, str):
             raise TypeError
 
-        self.cipher_text = self.encrypt(text)
+        self._set_text(text)
+
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Encrypts the text when cipher_text is first read.
+        """
+        return self.encrypt(text)
 
     def encrypt(self, text: str) -> str:
         """
@@ -69,13 +1280,9 @@ class ReverseCipher1:
         Returns:
             str: The reversed text.
         """
-        result = ''  # Initialize an empty string to store the reversed text
-        for letter in range(len(text) - 1, -1, -1):
-            result += text[letter]
-
-        return result
+        return text[::-1]
 
-    def __str__(self) -> str:
+    def _decrypt_text(self) -> str:
         """
         Returns the encrypted (reversed) text as a string.
 
@@ -85,8 +1292,44 @@ class ReverseCipher1:
         result = self.encrypt(self.cipher_text)
         return f"{result}"
 
+    @classmethod
+    def view(cls, text: Union[str, Buffer]) -> ReversedView:
+        """
+        Reverses a text without copying it, for large payloads.
+
+        Args:
+            text (str | Buffer): The original text.
+
+        Returns:
+            ReversedView: The reversed text. Its text attribute is the decryption.
+
+        Raises:
+            TypeError: If the text is neither a string nor bytes-like.
+        """
+        return ReversedView(text)
+
+    @classmethod
+    def encoder(cls) -> ChunkTransform:
+        """
+        Creates a streaming encoder that reverses a stream of chunks.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+        """
+        return ReverseChunkTransform()
+
+    @classmethod
+    def decoder(cls) -> ChunkTransform:
+        """
+        Creates a streaming decoder for a reversed stream of chunks.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+        """
+        return ReverseChunkTransform()
 
-class ReverseCipher2:
+
+class ReverseCipher2(_LazyCipher):
     """
     A class that reverses the letters of each word in the provided text.
     
@@ -94,6 +1337,8 @@ class ReverseCipher2:
         cipher_text (str): The reversed version of the input text.
     """
 
+    __slots__ = ()
+
     def __init__(self, text: str) -> None:
         """
         Initializes the ReverseCipher2 class and encrypts the provided text by reversing each word.
@@ -107,7 +1352,13 @@ class ReverseCipher2:
         if not isinstance(text, str):
             raise TypeError
 
-        self.cipher_text = self.encrypt(text)
+        self._set_text(text)
+
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Encrypts the text when cipher_text is first read.
+        """
+        return self.encrypt(text)
 
     def encrypt(self, text: str) -> str:
         """
@@ -131,7 +1382,7 @@ class ReverseCipher2:
         result = ' '.join(reversed_words)
         return result
 
-    def __str__(self) -> str:
+    def _decrypt_text(self) -> str:
         """
         Returns the encrypted (reversed words) version of the text.
 
@@ -141,8 +1392,30 @@ class ReverseCipher2:
         result = self.encrypt(self.cipher_text)
         return f"{result}"
 
+    @classmethod
+    def encoder(cls) -> ChunkTransform:
+        """
+        Creates a streaming encoder that reverses each word of a stream of chunks.
+
+        Words split across chunks are held back until their end is seen.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+        """
+        return WordChunkTransform(cls('').encrypt)
+
+    @classmethod
+    def decoder(cls) -> ChunkTransform:
+        """
+        Creates a streaming decoder for a stream of chunks with reversed words.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+        """
+        return WordChunkTransform(cls('').encrypt)
+
     
-class XORCipher:
+class XORCipher(_LazyCipher):
     """
     A class that applies XOR encryption using a key.
 
@@ -151,6 +1424,8 @@ class XORCipher:
         cipher_text (str): The encrypted text.
     """
 
+    __slots__ = ('key',)
+
     def __init__(self, text: str, key: str) -> None:
         """
         Initializes the XORCipher class with the provided text and key.
@@ -168,30 +1443,56 @@ class XORCipher:
             raise TypeError
         
         self.key = key
-        self.cipher_text = self.cipher(text)
+        self._set_text(text)
 
-    def cipher(self, text: str) -> str:
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Encrypts the text when cipher_text is first read.
+        """
+        return self.cipher(text)
+
+    def cipher(self, text: str, offset: int = 0) -> str:
         """
         Encrypts the provided text using the XOR operation and the key.
 
+        Text and keys made only of Latin-1 characters go through the buffer engine,
+        anything else falls back to XORing one character at a time. Bytes-like input
+        is handed to cipher_bytes.
+
         Args:
             text (str): The original text to be encrypted.
+            offset (int): The key position of the first character, for text that
+                continues an earlier piece of the same message.
 
         Returns:
             str: The XOR encrypted text.
         """
+        if not isinstance(text, str):
+            return self.cipher_bytes(text, offset)
+        if not self.key:
+            return text
+
+        try:
+            data = text.encode('latin-1')
+            key = self.key.encode('latin-1')
+        except UnicodeEncodeError:
+            pass
+        else:
+            return _xor_buffer(data, key, offset).decode('latin-1')
+
         encryption_lst = []
+        key_codes = _key_codes(self.key)
 
-        for i, char in enumerate(text):
-            key = self.key[i % len(self.key)]  # Match the length of the key with the text
-            xor = ord(char) ^ ord(key)
+        for i, char in enumerate(text, offset):
+            key = key_codes[i % len(key_codes)]  # Match the length of the key with the text
+            xor = ord(char) ^ key
             result = chr(xor)
             encryption_lst.append(result)
 
         encryption_str = ''.join(encryption_lst)
         return encryption_str
 
-    def __str__(self) -> str:
+    def _decrypt_text(self) -> str:
         """
         Returns the decrypted text by applying XOR encryption again on the encrypted text.
 
@@ -200,8 +1501,74 @@ class XORCipher:
         """
         return self.cipher(self.cipher_text)
 
+    def cipher_bytes(self, data: Buffer, offset: int = 0, inplace: bool = False) -> Buffer:
+        """
+        Applies the XOR operation to a bytes-like object.
+
+        Each key character is used as one byte, so the result matches the string path
+        on Latin-1 text byte for byte.
+
+        Args:
+            data (Buffer): The bytes, bytearray or memoryview to transform.
+            offset (int): The key position of the first byte.
+            inplace (bool): Overwrite `data` instead of returning a copy. Needs a
+                writable buffer such as a bytearray.
+
+        Returns:
+            Buffer: The transformed bytes, or `data` itself when working in place.
+
+        Raises:
+            TypeError: If `data` is not bytes-like, or is read-only and `inplace` is set.
+            ValueError: If the key has characters that do not fit in a byte.
+        """
+        if isinstance(data, str):
+            raise TypeError
+
+        try:
+            key = self.key.encode('latin-1')
+        except UnicodeEncodeError:
+            raise ValueError('XOR key must be Latin-1 to be used on bytes') from None
+
+        return _xor_buffer(data, key, offset, inplace)
+
+    @classmethod
+    def encoder(cls, key: str) -> ChunkTransform:
+        """
+        Creates a streaming encoder that XORs a stream of chunks with the key.
+
+        The key position is carried across chunk boundaries, so the output matches
+        encrypting the joined chunks in one go. Chunks may be str or bytes-like.
+
+        Args:
+            key (str): The key used for the XOR operation.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+
+        Raises:
+            TypeError: If the provided key is not a string.
+        """
+        cipher = cls('', key)
+        return KeyedChunkTransform(cipher.cipher, len(cipher.key))
+
+    @classmethod
+    def decoder(cls, key: str) -> ChunkTransform:
+        """
+        Creates a streaming decoder for a stream of XOR encrypted chunks.
+
+        Args:
+            key (str): The key used for the XOR operation.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+
+        Raises:
+            TypeError: If the provided key is not a string.
+        """
+        return cls.encoder(key)
+
 
-class CaesarCipher:
+class CaesarCipher(_LazyCipher):
     """
     A class that applies Caesar Cipher encryption to a text.
 
@@ -210,6 +1577,8 @@ class CaesarCipher:
         cipher_text (str): The encrypted text.
     """
 
+    __slots__ = ('key',)
+
     def __init__(self, text: str, key: int) -> None:
         """
         Initializes the CaesarCipher class with the text and key.
@@ -234,12 +1603,22 @@ class CaesarCipher:
             key = key % -26
 
         self.key = key
-        self.cipher_text = self.cipher(text, self.key)
+        self._set_text(text)
+
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Encrypts the text when cipher_text is first read.
+        """
+        return self.cipher(text, self.key)
     
     def cipher(self, text: str, key: int) -> str:
         """
         Applies Caesar Cipher encryption to the provided text.
 
+        The cipher for each shift is compiled once into a translation table, so the
+        text is encrypted in a single str.translate call. Bytes-like input is
+        translated with the matching bytes table.
+
         Args:
             text (str): The text to be encrypted.
             key (int): The shift key for the cipher.
@@ -247,35 +1626,12 @@ class CaesarCipher:
         Returns:
             str: The encrypted text.
         """
-        lower_case = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']
-        upper_case = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
-        special_char = ['`', '~', '!', '@', '#', '$', '%', '^', '&', '*', '(', ')', '_', '-', '+', '=', '{', '[', '}', '}', '|', ':', ';', '<', ',', '>', '.', '/']
-
-        encryption = ''
-
-        for i in text:
-            if i == ' ' or i in special_char:
-                encryption += i
-
-            if i in lower_case:
-                index_lc = lower_case.index(i)
-                if index_lc + key > 25:
-                    index_lc -= 26
-                    encryption += lower_case[index_lc + key]
-                else:
-                    encryption += lower_case[index_lc + key]
-
-            if i in upper_case:
-                index_uc = upper_case.index(i)
-                if index_uc + key > 25:
-                    index_uc -= 26
-                    encryption += upper_case[index_uc + key]
-                else:
-                    encryption += upper_case[index_uc + key]
-
-        return encryption
+        if isinstance(text, str):
+            return text.translate(_caesar_table(key % 26))
+
+        return bytes(text).translate(*_caesar_byte_table(key % 26))
     
-    def __str__(self) -> str:
+    def _decrypt_text(self) -> str:
         """
         Decrypts the text by reversing the Caesar cipher with the negative key.
 
@@ -284,8 +1640,42 @@ class CaesarCipher:
         """
         return self.cipher(self.cipher_text, -(self.key))
 
+    @classmethod
+    def encoder(cls, key: int) -> ChunkTransform:
+        """
+        Creates a streaming encoder that applies the Caesar cipher to a stream of chunks.
+
+        Args:
+            key (int): The shift key for the cipher.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+
+        Raises:
+            TypeError: If the key is not an integer.
+        """
+        cipher = cls('', key)
+        return ChunkTransform(partial(cipher.cipher, key=cipher.key))
+
+    @classmethod
+    def decoder(cls, key: int) -> ChunkTransform:
+        """
+        Creates a streaming decoder for a stream of Caesar encrypted chunks.
+
+        Args:
+            key (int): The shift key used for encryption.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+
+        Raises:
+            TypeError: If the key is not an integer.
+        """
+        cipher = cls('', key)
+        return ChunkTransform(partial(cipher.cipher, key=-(cipher.key)))
+
 
-class VigenereCipher:
+class VigenereCipher(_LazyCipher):
     """
     A class that applies Vigenere Cipher encryption to a text.
 
@@ -294,6 +1684,8 @@ class VigenereCipher:
         cipher_text (str): The encrypted text.
     """
 
+    __slots__ = ('key',)
+
     def __init__(self, text: str, key: str) -> None:
         """
         Initializes the VigenereCipher class with the text and key.
@@ -312,106 +1704,47 @@ class VigenereCipher:
             raise TypeError
         
         self.key = key
-        self.cipher_text = self.cipher(text)
+        self._set_text(text)
+
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Encrypts the text when cipher_text is first read.
+        """
+        return self.cipher(text)
     
-    def cipher(self, text: str) -> str:
+    def cipher(self, text: str, offset: int = 0) -> str:
         """
         Applies Vigenere Cipher encryption to the provided text.
 
+        The whole text is shifted at once over an array of code points, see _vigenere.
+        Digit key characters shift by their value and letter key characters by their
+        position in the alphabet, whatever the case of the text.
+
         Args:
             text (str): The text to be encrypted.
+            offset (int): The key position of the first character, for text that
+                continues an earlier piece of the same message.
 
         Returns:
             str: The encrypted text.
         """
-        lower_case = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']
-        upper_case = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
-        special_char = ['`', '~', '!', '@', '#', '$', '%', '^', '&', '*', '(', ')', '_', '-', '+', '=', '{', '[', '}', '}', '|', ':', ';', '<', ',', '>', '.', '/']
-        key_len = len(self.key)
-        encryption = ''
-
-        for i, char in enumerate(text):
-            key_char = self.key[i % key_len]
-
-            if char == ' ' or char in special_char:
-                encryption += char
-            # These two elifs handfle the main logic     
-            elif char in lower_case:
-                index_text_lc = lower_case.index(char)
-                if key_char.isnumeric():
-                    index_key_lc = int(key_char)
-                elif key_char in upper_case:
-                    index_key_uc = upper_case.index(key_char)
-                else:
-                    index_key_lc = lower_case.index(key_char)
-
-                index_result = (index_key_lc + index_text_lc) % 26
-                encryption += lower_case[index_result]
-
-            elif char in upper_case:
-                index_text_uc = upper_case.index(char)
-                if key_char.isnumeric(): 
-                    index_key_uc = int(key_char)
-                elif key_char in lower_case:
-                    index_key_uc = lower_case.index(key_char)
-                else:
-                    index_key_uc = upper_case.index(key_char)
-
-                index_result = (index_key_uc + index_text_uc) % 26
-                encryption += upper_case[index_result]
-
-        return encryption
-
-    def decrypt(self, text: str, key: str) -> str:
+        return _vigenere(text, self.key, offset)
+
+    def decrypt(self, text: str, key: str, offset: int = 0) -> str:
         """
         Decrypts the Vigenere Cipher encrypted text.
 
         Args:
             text (str): The encrypted text.
             key (str): The encryption key.
+            offset (int): The key position of the first character.
 
         Returns:
             str: The decrypted text.
         """
-        key_len = len(key)
-        decryption = ''
-        lower_case = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']
-        upper_case = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
-        special_char = ['`', '~', '!', '@', '#', '$', '%', '^', '&', '*', '(', ')', '_', '-', '+', '=', '{', '[', '}', '}', '|', ':', ';', '<', ',', '>', '.', '/']
-
-        for i, char in enumerate(text):
-            key_char = key[i % key_len]
-
-            if char == ' ' or char in special_char:
-                decryption += char
-
-            elif char in lower_case:
-                index_text_lc = lower_case.index(char)
-                if key_char.isnumeric():
-                    index_key_lc = int(key_char)
-                elif key_char.islower():
-                    index_key_lc = lower_case.index(key_char)
-                else:
-                    index_key_lc = upper_case.index(key_char)
-
-                index_result = (index_text_lc - index_key_lc) % 26
-                decryption += lower_case[index_result]
-
-            elif char in upper_case:
-                index_text_uc = upper_case.index(char)
-                if key_char.isnumeric():
-                    index_key_uc = int(key_char)
-                elif key_char.isupper():
-                    index_key_uc = upper_case.index(key_char)
-                else:
-                    index_key_uc = lower_case.index(key_char)
-
-                index_result = (index_text_uc - index_key_uc) % 26
-                decryption += upper_case[index_result]
-
-        return decryption
+        return _vigenere(text, key, offset, -1)
     
-    def __str__(self) -> str:
+    def _decrypt_text(self) -> str:
         """
         Decrypts the text using the Vigenere cipher.
 
@@ -420,7 +1753,44 @@ class VigenereCipher:
         """
         return self.decrypt(self.cipher_text, self.key)
 
-class CustomMappingCipher:
+    @classmethod
+    def encoder(cls, key: str) -> ChunkTransform:
+        """
+        Creates a streaming encoder that applies the Vigenere cipher to a stream of chunks.
+
+        The key position is carried across chunk boundaries, so the output matches
+        encrypting the joined chunks in one go.
+
+        Args:
+            key (str): The key for the Vigenere cipher.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+
+        Raises:
+            TypeError: If the provided key is not a string.
+        """
+        cipher = cls('', key)
+        return KeyedChunkTransform(cipher.cipher, len(cipher.key))
+
+    @classmethod
+    def decoder(cls, key: str) -> ChunkTransform:
+        """
+        Creates a streaming decoder for a stream of Vigenere encrypted chunks.
+
+        Args:
+            key (str): The key for the Vigenere cipher.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+
+        Raises:
+            TypeError: If the provided key is not a string.
+        """
+        cipher = cls('', key)
+        return KeyedChunkTransform(partial(cipher.decrypt, key=cipher.key), len(cipher.key))
+
+class CustomMappingCipher(_LazyCipher):
     """
     A class that implements a custom character mapping cipher for encryption and decryption.
 
@@ -429,6 +1799,27 @@ class CustomMappingCipher:
         cipher_text (str): The encrypted text after applying the custom mapping cipher.
     """
 
+    __slots__ = ()
+
+    # Shared by every instance, see cipher and decrypt
+    character_map = {
+        # Mapping of characters to their corresponding encrypted values
+        'a': ',', 'b': 'c', 'c': '/', 'd': '&', 'e': 'k', 'f': '}', 'g': '4', 'h': 'w',
+        'i': '>', 'j': 'b', 'k': 'W', 'l': 'P', 'm': 'V', 'n': '$', 'o': '"', 'p': '`',
+        'q': 'U', 'r': 'x', 's': '~', 't': 'o', 'u': 'K', 'v': 'B', 'w': ']', 'x': 'e',
+        'y': '[', 'z': '7', 'A': 'H', 'B': 'i', 'C': 'G', 'D': 's', 'E': ';', 'F': 'A',
+        'G': 'y', 'H': 'g', 'I': 'r', 'J': '%', 'K': 'p', 'L': '^', 'M': 'C', 'N': '6',
+        'O': 'O', 'P': '8', 'Q': '3', 'R': '\\', 'S': '5', 'T': '0', 'U': 'Y', 'V': '1',
+        'W': '+', 'X': '{', 'Y': '2', 'Z': 'D', '0': '(', '1': '=', '2': '?', '3': 'q',
+        '4': '<', '5': 't', '6': 'f', '7': 'L', '8': '|', '9': 'l', '!': 'Q', '"': 'F',
+        '#': 'h', '$': ')', '%': 'X', '&': 'd', "'": 'j', '(': '.', ')': 'v', '*': 'E',
+        '+': "'", ',': '#', '-': '@', '.': '*', '/': 'z', ':': 'S', ';': ':', '<': 'N',
+        '=': 'Z', '>': ' ', '?': 'T', '@': '-', '[': 'R', '\\': 'u', ']': 'M', '^': '9',
+        '_': '_', '`': 'a', '{': 'n', '|': 'I', '}': 'J', '~': '!', ' ': 'm'
+    }
+
+    _items = tuple(character_map.items())
+
     def __init__(self, text: str) -> None:
         """
         Initializes the CustomMappingCipher class with a text and applies the cipher to encrypt it.
@@ -442,41 +1833,31 @@ class CustomMappingCipher:
         if not isinstance(text, str):
             raise TypeError
         
-        self.character_map = {
-            # Mapping of characters to their corresponding encrypted values
-            'a': ',', 'b': 'c', 'c': '/', 'd': '&', 'e': 'k', 'f': '}', 'g': '4', 'h': 'w',
-            'i': '>', 'j': 'b', 'k': 'W', 'l': 'P', 'm': 'V', 'n': '$', 'o': '"', 'p': '`',
-            'q': 'U', 'r': 'x', 's': '~', 't': 'o', 'u': 'K', 'v': 'B', 'w': ']', 'x': 'e',
-            'y': '[', 'z': '7', 'A': 'H', 'B': 'i', 'C': 'G', 'D': 's', 'E': ';', 'F': 'A',
-            'G': 'y', 'H': 'g', 'I': 'r', 'J': '%', 'K': 'p', 'L': '^', 'M': 'C', 'N': '6',
-            'O': 'O', 'P': '8', 'Q': '3', 'R': '\\', 'S': '5', 'T': '0', 'U': 'Y', 'V': '1',
-            'W': '+', 'X': '{', 'Y': '2', 'Z': 'D', '0': '(', '1': '=', '2': '?', '3': 'q',
-            '4': '<', '5': 't', '6': 'f', '7': 'L', '8': '|', '9': 'l', '!': 'Q', '"': 'F',
-            '#': 'h', '$': ')', '%': 'X', '&': 'd', "'": 'j', '(': '.', ')': 'v', '*': 'E',
-            '+': "'", ',': '#', '-': '@', '.': '*', '/': 'z', ':': 'S', ';': ':', '<': 'N',
-            '=': 'Z', '>': ' ', '?': 'T', '@': '-', '[': 'R', '\\': 'u', ']': 'M', '^': '9',
-            '_': '_', '`': 'a', '{': 'n', '|': 'I', '}': 'J', '~': '!', ' ': 'm'
-        }
-        self.cipher_text = self.cipher(text)
+        self._set_text(text)
+
+    def _encrypt_text(self, text: str) -> str:
+        """
+        Encrypts the text when cipher_text is first read.
+        """
+        return self.cipher(text)
 
     def cipher(self, text: str) -> str:
         """
         Encrypts the provided text using the custom character mapping.
 
+        Characters missing from the mapping are dropped.
+
         Args:
             text (str): The original text to be encrypted.
 
         Returns:
             str: The encrypted text.
         """
-        encryption = ''
+        items = self._items
+        if isinstance(text, str):
+            return text.translate(_mapping_tables(items)[0])
 
-        for letter in text:
-            for k, v in self.character_map.items():
-                if letter == k:
-                    encryption += v
-            
-        return encryption
+        return bytes(text).translate(*_mapping_byte_tables(items)[0])
 
     def decrypt(self, text: str) -> str:
         """
@@ -488,20 +1869,13 @@ class CustomMappingCipher:
         Returns:
             str: The decrypted text.
         """
-        decrypted = ''
-        new_dict = dict()
+        items = self._items
+        if isinstance(text, str):
+            return text.translate(_mapping_tables(items)[1])
 
-        
-        for k, v in self.character_map.items():
-            new_dict[v] = k
-        
-        for letter in text:
-            for k, v in new_dict.items():
-                if letter == k:
-                    decrypted += v
-        return decrypted
+        return bytes(text).translate(*_mapping_byte_tables(items)[1])
 
-    def __str__(self) -> str:
+    def _decrypt_text(self) -> str:
         """
         Returns the decrypted version of the ciphered text.
 
@@ -510,4 +1884,344 @@ class CustomMappingCipher:
         """
         return self.decrypt(self.cipher_text)
 
+    @classmethod
+    def encoder(cls) -> ChunkTransform:
+        """
+        Creates a streaming encoder that applies the character mapping to a stream of chunks.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+        """
+        return ChunkTransform(cls('').cipher)
+
+    @classmethod
+    def decoder(cls) -> ChunkTransform:
+        """
+        Creates a streaming decoder that reverses the character mapping on a stream of chunks.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+        """
+        return ChunkTransform(cls('').decrypt)
+
+
+# Cipher names accepted by Codec and the tools built on it
+CIPHERS = {
+    'salting': Salting,
+    'reverse1': ReverseCipher1,
+    'reverse2': ReverseCipher2,
+    'xor': XORCipher,
+    'caesar': CaesarCipher,
+    'vigenere': VigenereCipher,
+    'mapping': CustomMappingCipher,
+}
+
+# Ciphers that take a key (or salt) next to the text
+KEYED_CIPHERS = ('salting', 'xor', 'caesar', 'vigenere')
+
+# Ciphers that transform each character on its own, so any slice of a message can be
+# processed separately as long as its key offset is known
+CHARACTER_CIPHERS = ('xor', 'caesar', 'vigenere', 'mapping')
+
+
+class Codec:
+    """
+    A cipher picked by name and compiled once for a key, with one calling convention
+    for all of them.
+
+    Attributes:
+        name (str): The cipher name, one of CIPHERS.
+        key (str | int | None): The key, salt or shift, None for ciphers without one.
+        cipher: The cipher instance holding the validated key.
+    """
+
+    def __init__(self, name: str, key=None) -> None:
+        """
+        Initializes the Codec and validates the key.
+
+        Args:
+            name (str): The cipher name, one of CIPHERS.
+            key (str | int | None): The key for keyed ciphers.
+
+        Raises:
+            ValueError: If the cipher name is unknown.
+            TypeError: If the key has the wrong type for the cipher.
+        """
+        if name not in CIPHERS:
+            raise ValueError(f'unknown cipher {name!r}, expected one of {", ".join(CIPHERS)}')
+
+        self.name = name
+        self.key = key
+        if name in KEYED_CIPHERS:
+            self.cipher = CIPHERS[name]('', key)
+        else:
+            self.cipher = CIPHERS[name]('')
+
+    @property
+    def positional(self) -> bool:
+        """
+        Whether the cipher picks key characters by position, so slices need an offset.
+        """
+        return self.name in ('xor', 'vigenere')
+
+    def encrypt(self, text: str, offset: int = 0) -> str:
+        """
+        Encrypts a text.
+
+        Args:
+            text (str): The text to encrypt.
+            offset (int): The key position of the first character, for XOR and Vigenere.
+
+        Returns:
+            str: The encrypted text.
+        """
+        cipher = self.cipher
+        if self.name == 'salting':
+            return text + cipher.salt
+        if self.name in ('reverse1', 'reverse2'):
+            return cipher.encrypt(text)
+        if self.name in ('xor', 'vigenere'):
+            return cipher.cipher(text, offset)
+        if self.name == 'caesar':
+            return cipher.cipher(text, cipher.key)
+        return cipher.cipher(text)
+
+    def decrypt(self, text: str, offset: int = 0) -> str:
+        """
+        Decrypts a text produced by encrypt.
+
+        Args:
+            text (str): The encrypted text.
+            offset (int): The key position of the first character, for XOR and Vigenere.
+
+        Returns:
+            str: The decrypted text.
+        """
+        cipher = self.cipher
+        if self.name == 'salting':
+            return text[:len(text) - len(cipher.salt)]
+        # These ciphers are their own inverse. They are called directly rather than
+        # through self.encrypt, so instrumentation records one decrypt and no encrypt.
+        if self.name in ('reverse1', 'reverse2'):
+            return cipher.encrypt(text)
+        if self.name == 'xor':
+            return cipher.cipher(text, offset)
+        if self.name == 'vigenere':
+            return cipher.decrypt(text, cipher.key, offset)
+        if self.name == 'caesar':
+            return cipher.cipher(text, -(cipher.key))
+        return cipher.decrypt(text)
+
+    def translate_table(self, decrypt: bool = False) -> Optional[TranslateTable]:
+        """
+        Returns the compiled str.translate table for ciphers that are a plain character mapping.
+
+        Args:
+            decrypt (bool): Return the decryption table instead.
+
+        Returns:
+            TranslateTable | None: The table, None for ciphers that are not one.
+        """
+        if self.name == 'caesar':
+            return _caesar_table((-self.cipher.key if decrypt else self.cipher.key) % 26)
+        if self.name == 'mapping':
+            return _mapping_tables(self.cipher._items)[1 if decrypt else 0]
+        return None
+
+    def deleted_bytes(self, decrypt: bool = False) -> bytes:
+        """
+        Lists the bytes the cipher drops when it is applied to bytes-like input.
+
+        Args:
+            decrypt (bool): Describe decryption instead of encryption.
+
+        Returns:
+            bytes: The dropped byte values, empty for ciphers that keep every byte.
+
+        Raises:
+            ValueError: If the cipher does not work on bytes.
+        """
+        if self.name == 'xor':
+            return b''
+        if self.name in ('caesar', 'vigenere'):
+            return _caesar_byte_table(0)[1]
+        if self.name == 'mapping':
+            items = self.cipher._items
+            return _mapping_byte_tables(items)[1 if decrypt else 0][1]
+        raise ValueError(f'{self.name} cipher does not work on bytes')
+
+    def encoder(self) -> ChunkTransform:
+        """
+        Creates a streaming encoder for the cipher, see the cipher classes.
+
+        Returns:
+            ChunkTransform: The incremental encoder.
+        """
+        cls = CIPHERS[self.name]
+        return cls.encoder(self.key) if self.name in KEYED_CIPHERS else cls.encoder()
+
+    def decoder(self) -> ChunkTransform:
+        """
+        Creates a streaming decoder for the cipher, see the cipher classes.
+
+        Returns:
+            ChunkTransform: The incremental decoder.
+        """
+        cls = CIPHERS[self.name]
+        return cls.decoder(self.key) if self.name in KEYED_CIPHERS else cls.decoder()
+
+
+def _read_chunks(stream, encoding: str, chunk_size: int,
+                 on_read: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    """
+    Reads a binary stream as text in fixed-size chunks.
+
+    Args:
+        stream: A binary file object.
+        encoding (str): The text encoding.
+        chunk_size (int): Bytes to read at a time.
+        on_read (Callable | None): Called with the number of bytes of every read.
+
+    Yields:
+        str: The decoded chunks, never splitting a character.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)('surrogatepass')
+    while True:
+        data = stream.read(chunk_size)
+        if on_read is not None:
+            on_read(len(data))
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
+
+
+def _peak_memory() -> Optional[int]:
+    """
+    Returns the peak resident memory of this process in bytes, if the platform reports it.
+
+    Returns:
+        int | None: The peak resident set size, None where it is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
 
+
+def _print_stats(read: int, written: int, seconds: float, latencies: List[float], out) -> None:
+    """
+    Prints the throughput, per-chunk latency and peak memory of a run.
+
+    Args:
+        read (int): Input bytes.
+        written (int): Output bytes.
+        seconds (float): Wall time.
+        latencies (list): Seconds spent on each chunk.
+        out: Where to print.
+    """
+    latencies = sorted(latencies) or [0.0]
+    peak = _peak_memory()
+    print(f'bytes read:      {read}', file=out)
+    print(f'bytes written:   {written}', file=out)
+    print(f'seconds:         {seconds:.6f}', file=out)
+    print(f'throughput:      {read / seconds if seconds else 0.0:.0f} B/s', file=out)
+    print(f'chunks:          {len(latencies)}', file=out)
+    print(f'chunk latency:   mean {sum(latencies) / len(latencies) * 1000:.3f} ms, '
+          f'p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, '
+          f'p99 {latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000:.3f} ms, '
+          f'max {latencies[-1] * 1000:.3f} ms', file=out)
+    print(f'peak memory:     {peak if peak is not None else "n/a"} B', file=out)
+    cache = KEY_SCHEDULE_CACHE.stats()
+    print(f'key schedules:   {cache["hits"]} hits, {cache["misses"]} misses, {cache["evictions"]} evictions, '
+          f'{cache["size"]}/{cache["maxsize"]} cached', file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point, run with `python -m encrypt`.
+
+    Streams stdin to stdout, or a file to a file, through one cipher in fixed-size
+    chunks, so memory use does not depend on the input size.
+
+    Args:
+        argv (list | None): The arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog='python -m encrypt', description='Encrypt or decrypt a stream of text.')
+    parser.add_argument('cipher', choices=list(CIPHERS), help='the cipher to apply')
+    parser.add_argument('-k', '--key', help='the key, salt or Caesar shift')
+    parser.add_argument('-d', '--decrypt', action='store_true', help='decrypt instead of encrypting')
+    parser.add_argument('-i', '--input', help='input file (default: stdin)')
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--encoding', default='utf-8', help='text encoding of the input and output')
+    parser.add_argument('--chunk-size', type=int, default=1 << 20, help='bytes read at a time')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='worker processes for ciphers that work character by character')
+    parser.add_argument('--stats', action='store_true', help='print throughput, latency and memory to stderr')
+    args = parser.parse_args(argv)
+
+    key = args.key
+    if args.cipher in KEYED_CIPHERS and key is None:
+        parser.error(f'the {args.cipher} cipher needs --key')
+    if args.cipher == 'caesar':
+        try:
+            key = int(key)
+        except ValueError:
+            parser.error('the caesar cipher needs an integer --key')
+    if args.chunk_size < 1 or args.workers < 1:
+        parser.error('--chunk-size and --workers must be positive')
+
+    codec = Codec(args.cipher, key)
+    read = written = 0
+    latencies = []
+    started = time.perf_counter()
+
+    def count_read(size):
+        nonlocal read
+        read += size
+
+    with ExitStack() as files:
+        source = files.enter_context(open(args.input, 'rb')) if args.input else sys.stdin.buffer
+        target = files.enter_context(open(args.output, 'wb')) if args.output else sys.stdout.buffer
+        chunks = _read_chunks(source, args.encoding, args.chunk_size, count_read)
+        if args.workers > 1 and args.cipher in CHARACTER_CIPHERS:
+            from encrypt_batch import encrypt_chunks
+
+            results = encrypt_chunks(args.cipher, chunks, key, args.workers, args.decrypt)
+        else:
+            transform = codec.decoder() if args.decrypt else codec.encoder()
+
+            def serial():
+                for chunk in chunks:
+                    chunk_started = time.perf_counter()
+                    result = transform.update(chunk)
+                    yield result, time.perf_counter() - chunk_started
+                finish_started = time.perf_counter()
+                result = transform.finish()
+                yield result, time.perf_counter() - finish_started
+
+            results = serial()
+
+        for text, seconds in results:
+            data = text.encode(args.encoding, 'surrogatepass')
+            target.write(data)
+            written += len(data)
+            latencies.append(seconds)
+        target.flush()
+
+    if args.stats:
+        _print_stats(read, written, time.perf_counter() - started, latencies, sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import asyncio
+import codecs
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from encrypt import ChunkTransform, Codec
+
+# Bytes read from a StreamReader at a time
+CHUNK_SIZE = 1 << 16
+
+
+async def _run(transform: ChunkTransform, chunk: str, executor: Optional[Executor],
+               offload_threshold: Optional[int]) -> str:
+    """
+    Feeds one chunk to a transform, on an executor thread if the chunk is large.
+
+    Args:
+        transform (ChunkTransform): The cipher state.
+        chunk (str): The next chunk.
+        executor (Executor | None): Where to run large chunks, None for the loop's default.
+        offload_threshold (int | None): Chunks at least this long leave the event loop,
+            None keeps everything on the loop.
+
+    Returns:
+        str: The transformed output.
+    """
+    if offload_threshold is None or len(chunk) < offload_threshold:
+        return transform.update(chunk)
+
+    return await asyncio.get_running_loop().run_in_executor(executor, transform.update, chunk)
+
+
+def atransform(chunks: AsyncIterable[str], cipher_name: str, key=None, decrypt: bool = False,
+               executor: Optional[Executor] = None,
+               offload_threshold: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Applies a cipher to an async iterable of chunks.
+
+    The cipher state (key offset, partial word, held back salt) lives in one streaming
+    transform, so the output matches encrypting the joined chunks in one go. Each chunk
+    is awaited only after the previous one has been consumed, which passes the
+    consumer's backpressure through to the source. The cipher and key are checked
+    when this is called, before the first chunk is awaited.
+
+    Chunks at least `offload_threshold` long are transformed on `executor` so the event
+    loop stays responsive. The transform is stateful and is called one chunk at a time,
+    so the executor has to run in this process (a ThreadPoolExecutor, or None for the
+    loop's default one).
+
+    Args:
+        chunks (AsyncIterable[str]): The input chunks.
+        cipher_name (str): The cipher name, one of encrypt.CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        decrypt (bool): Decrypt the chunks instead.
+        executor (Executor | None): Where to run large chunks.
+        offload_threshold (int | None): Chunk length from which work leaves the event
+            loop, None to keep everything on the loop.
+
+    Returns:
+        AsyncIterator[str]: The non-empty output chunks, in order.
+
+    Raises:
+        ValueError: If the cipher name is unknown.
+        TypeError: If the key has the wrong type for the cipher.
+    """
+    codec = Codec(cipher_name, key)
+    transform = codec.decoder() if decrypt else codec.encoder()
+    return _transform_chunks(chunks, transform, executor, offload_threshold)
+
+
+async def _transform_chunks(chunks: AsyncIterable[str], transform: ChunkTransform, executor: Optional[Executor],
+                            offload_threshold: Optional[int]) -> AsyncIterator[str]:
+    """
+    Feeds an async iterable of chunks through a transform, see atransform.
+
+    Args:
+        chunks (AsyncIterable[str]): The input chunks.
+        transform (ChunkTransform): The cipher state.
+        executor (Executor | None): Where to run large chunks.
+        offload_threshold (int | None): Chunk length from which work leaves the event loop.
+
+    Yields:
+        str: The non-empty output chunks, in order.
+    """
+    async for chunk in chunks:
+        result = await _run(transform, chunk, executor, offload_threshold)
+        if result:
+            yield result
+
+    result = transform.finish()
+    if result:
+        yield result
+
+
+async def _read_text(reader: asyncio.StreamReader, encoding: str, chunk_size: int) -> AsyncIterator[str]:
+    """
+    Reads a StreamReader as text, decoding characters split across reads correctly.
+
+    Args:
+        reader (asyncio.StreamReader): The source.
+        encoding (str): The text encoding.
+        chunk_size (int): Bytes to read at a time.
+
+    Yields:
+        str: The decoded chunks.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)('surrogatepass')
+    while True:
+        data = await reader.read(chunk_size)
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
+
+
+async def transform_stream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, cipher_name: str,
+                           key=None, decrypt: bool = False, encoding: str = 'utf-8',
+                           chunk_size: int = CHUNK_SIZE, executor: Optional[Executor] = None,
+                           offload_threshold: Optional[int] = None, close: bool = True) -> int:
+    """
+    Pipes a StreamReader through a cipher into a StreamWriter.
+
+    Reads `chunk_size` bytes at a time and waits for the writer to drain after every
+    write, so a slow consumer slows the reads down instead of filling memory. XOR output
+    can hold lone surrogates, which are written with the surrogatepass error handler
+    and read back the same way.
+
+    Args:
+        reader (asyncio.StreamReader): The source.
+        writer (asyncio.StreamWriter): The destination.
+        cipher_name (str): The cipher name, one of encrypt.CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        decrypt (bool): Decrypt the stream instead.
+        encoding (str): The text encoding on both sides.
+        chunk_size (int): Bytes to read at a time.
+        executor (Executor | None): Where to run large chunks, see atransform.
+        offload_threshold (int | None): Chunk length from which work leaves the event loop.
+        close (bool): Close the writer once the reader is exhausted.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    written = 0
+    chunks = _read_text(reader, encoding, chunk_size)
+    async for text in atransform(chunks, cipher_name, key, decrypt, executor, offload_threshold):
+        data = text.encode(encoding, 'surrogatepass')
+        writer.write(data)
+        written += len(data)
+        await writer.drain()
+
+    if close:
+        writer.close()
+        await writer.wait_closed()
+
+    return written
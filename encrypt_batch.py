@@ -0,0 +1,278 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from encrypt import CHARACTER_CIPHERS, Codec
+
+# The codec compiled once in each worker process by _init_worker
+_codec: Optional[Codec] = None
+
+
+def _init_worker(cipher_name: str, key) -> None:
+    """
+    Compiles the cipher once when a worker process starts.
+
+    Args:
+        cipher_name (str): The cipher name, one of encrypt.CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+    """
+    global _codec
+    _codec = Codec(cipher_name, key)
+
+
+def _encrypt_texts(texts: list) -> list:
+    """
+    Encrypts one batch of texts with the worker's codec.
+
+    Args:
+        texts (list): The texts to encrypt.
+
+    Returns:
+        list: The encrypted texts, in the same order.
+    """
+    encrypt = _codec.encrypt
+    return [encrypt(text) for text in texts]
+
+
+def _decrypt_texts(texts: list) -> list:
+    """
+    Decrypts one batch of texts with the worker's codec.
+
+    Args:
+        texts (list): The texts to decrypt.
+
+    Returns:
+        list: The decrypted texts, in the same order.
+    """
+    decrypt = _codec.decrypt
+    return [decrypt(text) for text in texts]
+
+
+def _encrypt_slice(item: tuple) -> tuple:
+    """
+    Encrypts one slice of a longer text with the worker's codec.
+
+    Args:
+        item (tuple): The slice and the key offset of its first character.
+
+    Returns:
+        tuple: The encrypted slice and the seconds it took.
+    """
+    started = time.perf_counter()
+    result = _codec.encrypt(*item)
+    return result, time.perf_counter() - started
+
+
+def _decrypt_slice(item: tuple) -> tuple:
+    """
+    Decrypts one slice of a longer text with the worker's codec.
+
+    Args:
+        item (tuple): The slice and the key offset of its first character.
+
+    Returns:
+        tuple: The decrypted slice and the seconds it took.
+    """
+    started = time.perf_counter()
+    result = _codec.decrypt(*item)
+    return result, time.perf_counter() - started
+
+
+def imap_bounded(pool, func: Callable, items: Iterable, max_pending: int) -> Iterator:
+    """
+    Maps a function over items on a pool, in order, with a bounded number of tasks in flight.
+
+    Pool.imap reads its whole input ahead of the workers. This only pulls the next item
+    once one of at most `max_pending` submitted tasks has been consumed, so memory stays
+    flat however long the input is.
+
+    Args:
+        pool (multiprocessing.pool.Pool): The pool to run on.
+        func (Callable): The function to apply, must be picklable.
+        items (Iterable): The arguments, one task each.
+        max_pending (int): How many tasks may be submitted but not yet consumed.
+
+    Yields:
+        The results, in input order.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+
+    while pending:
+        yield pending.popleft().get()
+
+
+def _batches(texts: Iterable[str], chunksize: int) -> Iterator[list]:
+    """
+    Groups texts into lists of `chunksize` items.
+
+    Args:
+        texts (Iterable[str]): The texts.
+        chunksize (int): The size of each list (the last may be shorter).
+
+    Yields:
+        list: The next group of texts.
+    """
+    texts = iter(texts)
+    while True:
+        batch = list(islice(texts, chunksize))
+        if not batch:
+            return
+        yield batch
+
+
+def encrypt_batch(cipher_name: str, texts: Iterable[str], key=None, workers: Optional[int] = None,
+                  chunksize: int = 1024, decrypt: bool = False) -> Iterator[str]:
+    """
+    Encrypts many short texts across a pool of worker processes.
+
+    Each worker compiles the cipher once and then handles batches of `chunksize` texts,
+    so there is no per-message object or pickling overhead beyond the texts themselves.
+    Results are yielded in input order as soon as the batches holding them are done.
+
+    The arguments are checked when this is called, and the texts are only read, and
+    the pool only started, as the results are iterated.
+
+    Args:
+        cipher_name (str): The cipher name, one of encrypt.CIPHERS.
+        texts (Iterable[str]): The texts to encrypt. Read lazily.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+            With 0 everything runs in the calling process.
+        chunksize (int): How many texts are sent to a worker at a time.
+        decrypt (bool): Decrypt the texts instead.
+
+    Returns:
+        Iterator[str]: The encrypted (or decrypted) texts, in input order.
+
+    Raises:
+        ValueError: If the cipher name is unknown, chunksize is not positive or
+            workers is negative.
+        TypeError: If the key has the wrong type for the cipher.
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be positive')
+    if workers is not None and workers < 0:
+        raise ValueError('workers cannot be negative')
+
+    # Validates the name and key up front, and serves the in-process mode
+    codec = Codec(cipher_name, key)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 0:
+        transform = codec.decrypt if decrypt else codec.encrypt
+        return map(transform, texts)
+
+    return _pooled_batches(cipher_name, texts, key, workers, chunksize, decrypt)
+
+
+def _pooled_batches(cipher_name: str, texts: Iterable[str], key, workers: int, chunksize: int,
+                    decrypt: bool) -> Iterator[str]:
+    """
+    Runs the batches of encrypt_batch through a pool, once its arguments are checked.
+
+    Args:
+        cipher_name (str): The cipher name.
+        texts (Iterable[str]): The texts to encrypt.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int): Number of worker processes.
+        chunksize (int): How many texts are sent to a worker at a time.
+        decrypt (bool): Decrypt the texts instead.
+
+    Yields:
+        str: The encrypted (or decrypted) texts, in input order.
+    """
+    func = _decrypt_texts if decrypt else _encrypt_texts
+    with multiprocessing.Pool(workers, _init_worker, (cipher_name, key)) as pool:
+        for results in imap_bounded(pool, func, _batches(texts, chunksize), workers * 4):
+            yield from results
+
+
+def decrypt_batch(cipher_name: str, texts: Iterable[str], key=None, workers: Optional[int] = None,
+                  chunksize: int = 1024) -> Iterator[str]:
+    """
+    Decrypts many short texts across a pool of worker processes, see encrypt_batch.
+
+    Args:
+        cipher_name (str): The cipher name, one of encrypt.CIPHERS.
+        texts (Iterable[str]): The texts to decrypt. Read lazily.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+        chunksize (int): How many texts are sent to a worker at a time.
+
+    Returns:
+        Iterator[str]: The decrypted texts, in input order.
+    """
+    return encrypt_batch(cipher_name, texts, key, workers, chunksize, decrypt=True)
+
+
+def encrypt_chunks(cipher_name: str, chunks: Iterable[str], key=None, workers: Optional[int] = None,
+                   decrypt: bool = False) -> Iterator[Tuple[str, float]]:
+    """
+    Encrypts consecutive slices of one long text across a pool of worker processes.
+
+    Only ciphers that transform each character on its own (encrypt.CHARACTER_CIPHERS)
+    can be split like this. Every slice is sent with the key offset of its first
+    character, so the joined output matches encrypting the whole text at once. The
+    cipher and key are checked when this is called, the pool is started as the
+    results are iterated.
+
+    Args:
+        cipher_name (str): One of encrypt.CHARACTER_CIPHERS.
+        chunks (Iterable[str]): The consecutive slices of the text. Read lazily.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+        decrypt (bool): Decrypt the slices instead.
+
+    Returns:
+        Iterator[tuple]: Each transformed slice, in order, with the seconds a worker
+            spent on it.
+
+    Raises:
+        ValueError: If the cipher cannot be split into slices or workers is not
+            positive.
+        TypeError: If the key has the wrong type for the cipher.
+    """
+    if cipher_name not in CHARACTER_CIPHERS:
+        raise ValueError(f'{cipher_name} cipher cannot be split, expected one of {", ".join(CHARACTER_CIPHERS)}')
+    if workers is not None and workers < 1:
+        raise ValueError('workers must be positive')
+
+    Codec(cipher_name, key)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    return _pooled_slices(cipher_name, chunks, key, workers, decrypt)
+
+
+def _pooled_slices(cipher_name: str, chunks: Iterable[str], key, workers: int,
+                   decrypt: bool) -> Iterator[Tuple[str, float]]:
+    """
+    Runs the slices of encrypt_chunks through a pool, once its arguments are checked.
+
+    Args:
+        cipher_name (str): The cipher name.
+        chunks (Iterable[str]): The consecutive slices of the text.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int): Number of worker processes.
+        decrypt (bool): Decrypt the slices instead.
+
+    Yields:
+        tuple: Each transformed slice, in order, with the seconds a worker spent on it.
+    """
+    def items():
+        offset = 0
+        for chunk in chunks:
+            yield chunk, offset
+            offset += len(chunk)
+
+    func = _decrypt_slice if decrypt else _encrypt_slice
+    with multiprocessing.Pool(workers, _init_worker, (cipher_name, key)) as pool:
+        yield from imap_bounded(pool, func, items(), workers * 2)
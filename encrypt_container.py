@@ -0,0 +1,472 @@
+import hashlib
+import hmac
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import struct
+import zlib
+from bisect import bisect_right
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+
+from encrypt import Codec
+from encrypt_batch import imap_bounded
+
+# Characters encrypted into each chunk by default
+CHUNK_SIZE = 1 << 20
+
+MAGIC = b'ENCC'
+FOOTER_MAGIC = b'ENCX'
+VERSION = 2
+
+# PBKDF2 rounds behind a key fingerprint, so guessing keys from a header is slow
+FINGERPRINT_ITERATIONS = 100_000
+
+# Container cipher ids, never renumbered. Only ciphers that work character by
+# character can be cut into independent chunks.
+CIPHER_IDS = {'xor': 1, 'caesar': 2, 'vigenere': 3, 'mapping': 4}
+CIPHER_NAMES = {cipher_id: name for name, cipher_id in CIPHER_IDS.items()}
+
+# magic, version, cipher id, length of the JSON parameters
+_HEADER = struct.Struct('<4sBBH')
+_SALT_SIZE = 16
+_FINGERPRINT_SIZE = 8
+# tag, key offset of the first character, characters, stored bytes, CRC-32 of the stored bytes
+_CHUNK = struct.Struct('<cQQII')
+# tag, number of entries
+_INDEX = struct.Struct('<cI')
+# file position, key offset, characters
+_ENTRY = struct.Struct('<QQQ')
+# file position of the index, magic
+_FOOTER = struct.Struct('<Q4s')
+
+
+class ChunkInfo(NamedTuple):
+    """
+    Where a chunk is in the container and which part of the text it holds.
+    """
+
+    position: int
+    offset: int
+    length: int
+
+
+# Vigenere key characters with the same shift map to the same one: upper case letters
+# to lower case and digits to the letter as far into the alphabet
+_VIGENERE_KEY = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', 'abcdefghijklmnopqrstuvwxyzabcdefghij')
+
+
+def _normal_key(cipher_name: str, key):
+    """
+    Rewrites a key in the one form every key encrypting the same way shares.
+
+    Args:
+        cipher_name (str): The cipher name.
+        key (str | int | None): The key.
+
+    Returns:
+        str | int | None: The Caesar shift modulo 26, the Vigenere key in lower case
+            letters, or any other key as it is.
+    """
+    if cipher_name == 'caesar' and isinstance(key, int):
+        return key % 26
+    if cipher_name == 'vigenere' and isinstance(key, str):
+        return key.translate(_VIGENERE_KEY)
+    return key
+
+
+def new_salt() -> bytes:
+    """
+    Draws the random salt of a new key fingerprint.
+
+    Returns:
+        bytes: 16 random bytes.
+    """
+    return os.urandom(_SALT_SIZE)
+
+
+def key_fingerprint(cipher_name: str, key, salt: bytes) -> bytes:
+    """
+    Fingerprints a cipher and key, so a reader can tell it has the right key.
+
+    The key is normalized first, so a Caesar shift of 29 matches one of 3, and
+    stretched with a salt through PBKDF2, so the fingerprint of one file tells
+    nothing about another's and guessing the key from it takes
+    FINGERPRINT_ITERATIONS hashes a guess.
+
+    Args:
+        cipher_name (str): The cipher name.
+        key (str | int | None): The key.
+        salt (bytes): The salt stored next to the fingerprint, see new_salt.
+
+    Returns:
+        bytes: The first 8 bytes of the PBKDF2-HMAC-SHA256 of the cipher name and key.
+    """
+    secret = f'{cipher_name}:{_normal_key(cipher_name, key)!r}'.encode('utf-8', 'surrogatepass')
+    return hashlib.pbkdf2_hmac('sha256', secret, salt, FINGERPRINT_ITERATIONS, _FINGERPRINT_SIZE)
+
+
+class ContainerWriter:
+    """
+    Streams text into an encrypted container, one independently encrypted chunk at a time.
+
+    The container starts with a header naming the cipher, its parameters and the key's
+    salted fingerprint. Each chunk records the key offset of its first character, its length
+    and a CRC-32 of its bytes, so it can be checked and decrypted on its own. Closing
+    the writer appends an index of every chunk for random access.
+
+    Attributes:
+        codec (Codec): The cipher.
+        chunks (list): The ChunkInfo of every chunk written so far.
+    """
+
+    def __init__(self, target: BinaryIO, cipher_name: str, key=None, chunk_size: int = CHUNK_SIZE,
+                 encoding: str = 'utf-8') -> None:
+        """
+        Initializes the ContainerWriter and writes the header.
+
+        Args:
+            target (BinaryIO): Where to write the container.
+            cipher_name (str): One of CIPHER_IDS.
+            key (str | int | None): The key for keyed ciphers.
+            chunk_size (int): Characters per chunk.
+            encoding (str): How the encrypted text is stored.
+
+        Raises:
+            ValueError: If the cipher cannot be chunked or chunk_size is not positive.
+            TypeError: If the key has the wrong type for the cipher.
+        """
+        if cipher_name not in CIPHER_IDS:
+            raise ValueError(f'{cipher_name} cipher cannot be chunked, expected one of {", ".join(CIPHER_IDS)}')
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        self.codec = Codec(cipher_name, key)
+        self.chunks: List[ChunkInfo] = []
+        self._target = target
+        self._chunk_size = chunk_size
+        self._encoding = encoding
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._offset = 0
+        self._closed = False
+
+        params = json.dumps({'encoding': encoding, 'chunk_size': chunk_size}).encode('ascii')
+        self._position = target.write(_HEADER.pack(MAGIC, VERSION, CIPHER_IDS[cipher_name], len(params)))
+        self._position += target.write(params)
+        salt = new_salt()
+        self._position += target.write(salt + key_fingerprint(cipher_name, key, salt))
+
+    def write(self, text: str) -> None:
+        """
+        Adds text to the container, writing every chunk it completes.
+
+        Args:
+            text (str): The next piece of the plaintext.
+
+        Raises:
+            TypeError: If the text is not a string.
+            ValueError: If the writer is closed.
+        """
+        if not isinstance(text, str):
+            raise TypeError
+        if self._closed:
+            raise ValueError('write to a closed container')
+
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self._chunk_size:
+            text = ''.join(self._pending)
+            whole = len(text) - len(text) % self._chunk_size
+            for start in range(0, whole, self._chunk_size):
+                self._write_chunk(text[start:start + self._chunk_size])
+            self._pending = [text[whole:]]
+            self._pending_size = len(text) - whole
+
+    def _write_chunk(self, text: str) -> None:
+        """
+        Encrypts and writes one chunk.
+
+        Args:
+            text (str): The chunk's plaintext.
+        """
+        data = self.codec.encrypt(text, self._offset).encode(self._encoding, 'surrogatepass')
+        self.chunks.append(ChunkInfo(self._position, self._offset, len(text)))
+        self._position += self._target.write(_CHUNK.pack(b'C', self._offset, len(text), len(data), zlib.crc32(data)))
+        self._position += self._target.write(data)
+        self._offset += len(text)
+
+    def close(self) -> None:
+        """
+        Writes the last chunk, the index and the footer. The target is left open.
+        """
+        if self._closed:
+            return
+
+        text = ''.join(self._pending)
+        if text:
+            self._write_chunk(text)
+        self._pending = []
+
+        index = self._position
+        self._target.write(_INDEX.pack(b'I', len(self.chunks)))
+        self._target.write(b''.join(_ENTRY.pack(*chunk) for chunk in self.chunks))
+        self._target.write(_FOOTER.pack(index, FOOTER_MAGIC))
+        self._closed = True
+
+    def __enter__(self) -> 'ContainerWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    """
+    Reads exactly `size` bytes.
+
+    Args:
+        source (BinaryIO): The container.
+        size (int): How many bytes to read.
+
+    Returns:
+        bytes: The data.
+
+    Raises:
+        ValueError: If the container ends first.
+    """
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError('truncated container')
+    return data
+
+
+class ContainerReader:
+    """
+    Reads and decrypts a container written by ContainerWriter.
+
+    Iterating over the reader decrypts the chunks one after the other without seeking,
+    so it works on pipes. The index, which read_chunk and find_chunk use for random
+    access, needs a seekable source and is loaded on first use.
+
+    Attributes:
+        codec (Codec): The cipher, built from the header and the key.
+        encoding (str): How the encrypted text is stored.
+        chunk_size (int): The characters per chunk the writer used.
+        salt (bytes): The salt of the key fingerprint.
+        fingerprint (bytes): The key fingerprint from the header.
+    """
+
+    def __init__(self, source: BinaryIO, key=None) -> None:
+        """
+        Initializes the ContainerReader and reads the header.
+
+        Args:
+            source (BinaryIO): The container, positioned at its start.
+            key (str | int | None): The key for keyed ciphers.
+
+        Raises:
+            ValueError: If the header is invalid or the key does not match its fingerprint.
+            TypeError: If the key has the wrong type for the cipher.
+        """
+        magic, version, cipher_id, params_size = _HEADER.unpack(_read_exact(source, _HEADER.size))
+        if magic != MAGIC or version != VERSION or cipher_id not in CIPHER_NAMES:
+            raise ValueError('not a supported encrypted container')
+
+        params = json.loads(_read_exact(source, params_size))
+        self.salt = _read_exact(source, _SALT_SIZE)
+        self.fingerprint = _read_exact(source, _FINGERPRINT_SIZE)
+        cipher_name = CIPHER_NAMES[cipher_id]
+        self.codec = Codec(cipher_name, key)
+        if not hmac.compare_digest(key_fingerprint(cipher_name, key, self.salt), self.fingerprint):
+            raise ValueError('the key does not match the container')
+
+        self.encoding = params['encoding']
+        self.chunk_size = params['chunk_size']
+        self._source = source
+        self._index: Optional[List[ChunkInfo]] = None
+
+    @property
+    def chunks(self) -> List[ChunkInfo]:
+        """
+        The ChunkInfo of every chunk, read from the trailing index.
+        """
+        if self._index is None:
+            source = self._source
+            source.seek(-_FOOTER.size, os.SEEK_END)
+            position, magic = _FOOTER.unpack(_read_exact(source, _FOOTER.size))
+            if magic != FOOTER_MAGIC:
+                raise ValueError('the container has no index, it was not closed')
+
+            source.seek(position)
+            tag, count = _INDEX.unpack(_read_exact(source, _INDEX.size))
+            if tag != b'I':
+                raise ValueError('corrupt container index')
+            data = _read_exact(source, count * _ENTRY.size)
+            self._index = [ChunkInfo(*entry) for entry in _ENTRY.iter_unpack(data)]
+
+        return self._index
+
+    def _read_record(self, decrypt: bool = True) -> Optional[str]:
+        """
+        Reads the chunk record at the current position and checks its CRC.
+
+        Args:
+            decrypt (bool): Decrypt the chunk, or return its ciphertext.
+
+        Returns:
+            str | None: The chunk's text, None at the index.
+
+        Raises:
+            ValueError: If there is no chunk record there or its CRC does not match.
+        """
+        head = _read_exact(self._source, 1)
+        if head == b'I':
+            return None
+        if head != b'C':
+            raise ValueError('corrupt container')
+
+        tag, offset, length, size, crc = _CHUNK.unpack(head + _read_exact(self._source, _CHUNK.size - 1))
+        data = _read_exact(self._source, size)
+        if zlib.crc32(data) != crc:
+            raise ValueError(f'chunk at key offset {offset} is corrupt')
+
+        text = data.decode(self.encoding, 'surrogatepass')
+        return self.codec.decrypt(text, offset) if decrypt else text
+
+    def read_chunk(self, index: int) -> str:
+        """
+        Decrypts one chunk.
+
+        Args:
+            index (int): The chunk's number.
+
+        Returns:
+            str: The chunk's plaintext.
+        """
+        self._source.seek(self.chunks[index].position)
+        return self._read_record()
+
+    def find_chunk(self, offset: int) -> int:
+        """
+        Finds the chunk holding a character of the plaintext.
+
+        Args:
+            offset (int): The character's position in the plaintext.
+
+        Returns:
+            int: The chunk's number.
+
+        Raises:
+            IndexError: If the offset is outside the plaintext.
+        """
+        chunks = self.chunks
+        index = bisect_right([chunk.offset for chunk in chunks], offset) - 1
+        if index < 0 or offset >= chunks[index].offset + chunks[index].length:
+            raise IndexError('offset outside the container')
+        return index
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Decrypts the chunks in order, from the current position.
+
+        Yields:
+            str: The plaintext of each chunk.
+        """
+        while True:
+            text = self._read_record()
+            if text is None:
+                return
+            yield text
+
+    def read(self) -> str:
+        """
+        Decrypts the whole container.
+
+        Returns:
+            str: The plaintext.
+        """
+        return ''.join(self)
+
+
+# The reader each worker process opens once, set by _init_worker
+_reader: Optional[ContainerReader] = None
+
+
+def _init_worker(path: str, key) -> None:
+    """
+    Opens the container once when a worker process starts, and registers its closing
+    for when the worker exits.
+
+    Args:
+        path (str): The container file.
+        key (str | int | None): The key for keyed ciphers.
+    """
+    global _reader
+    source = open(path, 'rb')
+    try:
+        _reader = ContainerReader(source, key)
+    except BaseException:
+        source.close()
+        raise
+    multiprocessing.util.Finalize(None, source.close, exitpriority=10)
+
+
+def _read_chunk(index: int) -> str:
+    """
+    Decrypts one chunk with the worker's reader.
+
+    Args:
+        index (int): The chunk's number.
+
+    Returns:
+        str: The chunk's plaintext.
+    """
+    return _reader.read_chunk(index)
+
+
+def decrypt_container(path: str, key=None, workers: Optional[int] = None) -> Iterator[str]:
+    """
+    Decrypts the chunks of a container file across a pool of worker processes.
+
+    Every worker opens the file itself and reads its chunks through the index, so only
+    chunk numbers and plaintexts cross process boundaries. The header, key and index
+    are checked when this is called, the pool is started as the results are iterated.
+
+    Args:
+        path (str): The container file.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+
+    Returns:
+        Iterator[str]: The plaintext of each chunk, in order.
+
+    Raises:
+        ValueError: If the container is invalid, the key does not match or workers is
+            negative.
+    """
+    if workers is not None and workers < 0:
+        raise ValueError('workers cannot be negative')
+
+    with open(path, 'rb') as source:
+        count = len(ContainerReader(source, key).chunks)
+
+    workers = workers or os.cpu_count() or 1
+    return _pooled_chunks(path, key, count, workers)
+
+
+def _pooled_chunks(path: str, key, count: int, workers: int) -> Iterator[str]:
+    """
+    Decrypts the chunks of a checked container through a pool, see decrypt_container.
+
+    Args:
+        path (str): The container file.
+        key (str | int | None): The key for keyed ciphers.
+        count (int): The number of chunks.
+        workers (int): Number of worker processes.
+
+    Yields:
+        str: The plaintext of each chunk, in order.
+    """
+    with multiprocessing.Pool(workers, _init_worker, (path, key)) as pool:
+        yield from imap_bounded(pool, _read_chunk, range(count), workers * 2)
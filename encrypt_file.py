@@ -0,0 +1,331 @@
+import io
+import mmap
+import os
+import time
+from typing import Callable, Optional
+
+from encrypt import Codec
+
+# Default bytes mapped at a time, rounded up to whole allocation granules
+WINDOW_SIZE = 1 << 24
+
+# Ciphers that can work on a file's bytes
+FILE_CIPHERS = ('xor', 'caesar', 'vigenere', 'mapping')
+
+
+def _window_size(window: int) -> int:
+    """
+    Rounds a window size up to a whole number of mmap allocation granules.
+
+    Args:
+        window (int): The requested window size in bytes.
+
+    Returns:
+        int: The page-aligned window size.
+
+    Raises:
+        ValueError: If the window size is not positive.
+    """
+    if window < 1:
+        raise ValueError('window must be positive')
+
+    granule = mmap.ALLOCATIONGRANULARITY
+    return -(-window // granule) * granule
+
+
+def _output_size(fd: int, size: int, window: int, deleted: bytes) -> int:
+    """
+    Counts the bytes left once the cipher has dropped the ones it does not keep.
+
+    Args:
+        fd (int): The input file descriptor.
+        size (int): The input size.
+        window (int): The page-aligned window size.
+        deleted (bytes): The byte values the cipher drops.
+
+    Returns:
+        int: The size of the output.
+    """
+    if not deleted:
+        return size
+
+    kept = 0
+    for start in range(0, size, window):
+        with mmap.mmap(fd, min(window, size - start), access=mmap.ACCESS_READ, offset=start) as view:
+            kept += len(view[:].translate(None, deleted))
+
+    return kept
+
+
+def encrypt_file(path: str, cipher_name: str, key=None, output: Optional[str] = None,
+                 window: int = WINDOW_SIZE, decrypt: bool = False,
+                 progress: Optional[Callable[[int, int, float], None]] = None) -> dict:
+    """
+    Encrypts a file through memory-mapped windows, without reading it into memory.
+
+    The file is processed one page-aligned window at a time, with the key position of
+    each window taken from its offset in the file, so peak memory is bounded by the
+    window size rather than the file size. XOR windows are transformed in place inside
+    the mapping.
+
+    With no output path the file is rewritten in place, which needs a cipher that keeps
+    every byte: XOR always does, Caesar, Vigenere and mapping ciphers only when the
+    file holds nothing they drop. This is checked before anything is written. With an
+    output path the output file is preallocated to its final size and filled through
+    its own mapped windows. In both modes, a Vigenere key with characters that are
+    neither letters nor digits is checked against the whole file first.
+
+    Args:
+        path (str): The file to encrypt.
+        cipher_name (str): One of FILE_CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        output (str | None): Where to write the result, None to rewrite `path`.
+        window (int): How many bytes to map at a time.
+        decrypt (bool): Decrypt the file instead.
+        progress (Callable | None): Called after every window with the bytes done, the
+            total bytes and the seconds elapsed.
+
+    Returns:
+        dict: The input size in 'bytes', the 'output_bytes', the elapsed 'seconds' and
+            the 'throughput' in bytes per second.
+
+    Raises:
+        ValueError: If the cipher cannot work on bytes, would drop bytes from a file
+            rewritten in place, or a Vigenere key character that is neither a letter
+            nor a digit lines up with a letter.
+        TypeError: If the key has the wrong type for the cipher.
+    """
+    if cipher_name not in FILE_CIPHERS:
+        raise ValueError(f'{cipher_name} cipher cannot encrypt files, expected one of {", ".join(FILE_CIPHERS)}')
+
+    codec = Codec(cipher_name, key)
+    transform = codec.decrypt if decrypt else codec.encrypt
+    window = _window_size(window)
+    started = time.perf_counter()
+
+    with open(path, 'r+b' if output is None else 'rb') as source:
+        fd = source.fileno()
+        size = os.fstat(fd).st_size
+        out_size = _output_size(fd, size, window, codec.deleted_bytes(decrypt))
+
+        if output is None and out_size != size:
+            raise ValueError(f'{cipher_name} cipher would drop {size - out_size} bytes, '
+                             'write to an output file instead')
+
+        if cipher_name == 'vigenere' and not (key.isascii() and key.isalnum()):
+            # A key character that is neither a letter nor a digit is only an error where
+            # it lines up with a letter, so the whole file is checked before any of it is
+            # rewritten or the output is created. The window is copied, since a mapping
+            # cannot be closed while the traceback of an error still holds an array over it.
+            for start in range(0, size, window):
+                with mmap.mmap(fd, min(window, size - start), access=mmap.ACCESS_READ, offset=start) as view:
+                    transform(view[:], start)
+
+        target = None if output is None else open(output, 'w+b')
+        try:
+            if target is not None:
+                target.truncate(out_size)
+
+            written = 0
+            for start in range(0, size, window):
+                length = min(window, size - start)
+                access = mmap.ACCESS_WRITE if target is None else mmap.ACCESS_READ
+                with mmap.mmap(fd, length, access=access, offset=start) as view:
+                    if target is None and cipher_name == 'xor':
+                        codec.cipher.cipher_bytes(view, start, inplace=True)
+                    elif target is None:
+                        view[:] = transform(view, start)
+                    else:
+                        written += _write_window(target.fileno(), written, transform(view, start))
+
+                if progress is not None:
+                    progress(start + length, size, time.perf_counter() - started)
+        finally:
+            if target is not None:
+                target.close()
+
+    seconds = time.perf_counter() - started
+    return {
+        'bytes': size,
+        'output_bytes': out_size,
+        'seconds': seconds,
+        'throughput': size / seconds if seconds else 0.0,
+    }
+
+
+def _write_window(fd: int, position: int, data: bytes) -> int:
+    """
+    Writes bytes into a preallocated output file through a mapping of just that range.
+
+    Args:
+        fd (int): The output file descriptor.
+        position (int): Where in the file to write.
+        data (bytes): The bytes to write.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    if not data:
+        return 0
+
+    start = position - position % mmap.ALLOCATIONGRANULARITY
+    with mmap.mmap(fd, position + len(data) - start, offset=start) as view:
+        view[position - start:position - start + len(data)] = data
+
+    return len(data)
+
+
+def decrypt_file(path: str, cipher_name: str, key=None, output: Optional[str] = None,
+                 window: int = WINDOW_SIZE,
+                 progress: Optional[Callable[[int, int, float], None]] = None) -> dict:
+    """
+    Decrypts a file through memory-mapped windows, see encrypt_file.
+
+    Args:
+        path (str): The file to decrypt.
+        cipher_name (str): One of FILE_CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        output (str | None): Where to write the result, None to rewrite `path`.
+        window (int): How many bytes to map at a time.
+        progress (Callable | None): Called after every window, see encrypt_file.
+
+    Returns:
+        dict: The sizes, elapsed time and throughput, see encrypt_file.
+    """
+    return encrypt_file(path, cipher_name, key, output, window, True, progress)
+
+
+class DecryptedReader(io.RawIOBase):
+    """
+    A seekable, read-only file object over the decryption of an encrypted file.
+
+    The key position of every byte is its offset in the file, so any range can be
+    decrypted on its own: a read fetches just the requested bytes and decrypts them
+    with the key rotated to their offset, which takes the same time wherever it lands.
+    This matches decrypting the whole file as long as the file was encrypted without
+    any bytes being dropped, which XOR always guarantees and the other ciphers do for
+    input made only of what they keep.
+
+    Wrap it in io.BufferedReader (see open_decrypted) for small reads, or in
+    io.TextIOWrapper to read text.
+    """
+
+    def __init__(self, path: str, cipher_name: str, key=None) -> None:
+        """
+        Initializes the DecryptedReader and opens the file.
+
+        Args:
+            path (str): The encrypted file.
+            cipher_name (str): One of FILE_CIPHERS.
+            key (str | int | None): The key for keyed ciphers.
+
+        Raises:
+            ValueError: If the cipher cannot work on bytes.
+            TypeError: If the key has the wrong type for the cipher.
+        """
+        if cipher_name not in FILE_CIPHERS:
+            raise ValueError(f'{cipher_name} cipher cannot decrypt files, expected one of {", ".join(FILE_CIPHERS)}')
+
+        super().__init__()
+        self.codec = Codec(cipher_name, key)
+        self._file = open(path, 'rb', buffering=0)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """
+        Moves to a new position, as in io.IOBase.seek.
+
+        Args:
+            offset (int): The offset, relative to `whence`.
+            whence (int): io.SEEK_SET, io.SEEK_CUR or io.SEEK_END.
+
+        Returns:
+            int: The new absolute position.
+
+        Raises:
+            ValueError: If the new position would be negative or whence is unknown.
+        """
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = os.fstat(self._file.fileno()).st_size + offset
+        else:
+            raise ValueError(f'invalid whence ({whence})')
+
+        if position < 0:
+            raise ValueError(f'negative seek position {position}')
+
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        """
+        Reads and decrypts bytes from the current position into a buffer.
+
+        Args:
+            buffer (Buffer): A writable buffer.
+
+        Returns:
+            int: The number of bytes read, 0 at the end of the file.
+
+        Raises:
+            ValueError: If the range holds bytes the cipher drops, so the file cannot
+                have been produced by encrypting without drops.
+        """
+        self._checkClosed()
+        view = memoryview(buffer).cast('B')
+        self._file.seek(self._position)
+        size = self._file.readinto(view)
+        if not size:
+            return 0
+
+        data = view[:size]
+        if self.codec.name == 'xor':
+            self.codec.cipher.cipher_bytes(data, self._position, inplace=True)
+        else:
+            result = self.codec.decrypt(data, self._position)
+            if len(result) != size:
+                raise ValueError(f'bytes {self._position} to {self._position + size} hold characters '
+                                 f'the {self.codec.name} cipher drops')
+            data[:] = result
+
+        self._position += size
+        return size
+
+    def close(self) -> None:
+        """
+        Closes the underlying file.
+        """
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def open_decrypted(path: str, cipher_name: str, key=None,
+                   buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> io.BufferedReader:
+    """
+    Opens an encrypted file for seekable reading of its decrypted bytes.
+
+    Args:
+        path (str): The encrypted file.
+        cipher_name (str): One of FILE_CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        buffer_size (int): The read buffer size, see io.BufferedReader.
+
+    Returns:
+        io.BufferedReader: A buffered DecryptedReader.
+    """
+    return io.BufferedReader(DecryptedReader(path, cipher_name, key), buffer_size)
@@ -0,0 +1,426 @@
+import argparse
+import json
+import json.scanner
+import multiprocessing
+import os
+import re
+import sys
+from contextlib import ExitStack
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence
+
+from encrypt import KEYED_CIPHERS
+from encrypt_batch import imap_bounded
+from encrypt_pipeline import CipherPipeline, Stage
+
+# Bytes read at a time and handed to a worker as one task
+BLOCK_SIZE = 1 << 20
+
+# The pipeline and field paths set once in each worker process by _init_worker
+_pipeline: Optional[CipherPipeline] = None
+_paths: List[List[str]] = []
+
+# The same settings as json.loads, built once
+_DECODER = json.JSONDecoder()
+
+# The layouts json.dumps writes, with and without ensure_ascii and separators=(',', ':').
+# A line one of them reproduces exactly is transformed and written back with it.
+_ENCODERS = [json.JSONEncoder(ensure_ascii=ascii, separators=separators)
+             for separators in ((', ', ': '), (',', ':')) for ascii in (True, False)]
+_ASCII_ENCODER = _ENCODERS[0]
+_UNICODE_ENCODER = _ENCODERS[1]
+
+# Lone surrogates, which only an escape can carry through UTF-8
+_SURROGATE = re.compile('[\ud800-\udfff]')
+
+
+class _Located(str):
+    """
+    A string value parsed from a line, with the span of its JSON literal.
+
+    Attributes:
+        start (int): Where the opening quote is.
+        end (int): Just past the closing quote.
+    """
+
+
+def _parse_located(string: str, end: int, strict: bool = True) -> tuple:
+    """
+    Parses a JSON string literal as json's scanner does, remembering where it is.
+    """
+    value, stop = json.decoder.scanstring(string, end, strict)
+    value = _Located(value)
+    value.start = end - 1
+    value.end = stop
+    return value, stop
+
+
+def _unique_pairs(pairs: list) -> dict:
+    """
+    Builds an object from its pairs, refusing a repeated key, which would leave all
+    but one of its values untransformed in the line.
+    """
+    record = dict(pairs)
+    if len(record) != len(pairs):
+        raise ValueError('records with a repeated key cannot be transformed in place')
+    return record
+
+
+class _LocatingDecoder(json.JSONDecoder):
+    """
+    A JSON decoder whose string values carry their spans in the line, for _splice.
+
+    This is a pure Python fallback, used only for lines that are not in one of
+    json.dumps' layouts. The C scanner reads string literals itself, so the decoder
+    runs on json.scanner.py_make_scanner instead, which calls parse_string for every
+    string value. That makes it several times slower than json.loads.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the _LocatingDecoder, refusing repeated keys.
+        """
+        super().__init__(object_pairs_hook=_unique_pairs)
+        self.parse_string = _parse_located
+        self.scan_once = json.scanner.py_make_scanner(self)
+
+
+_LOCATING_DECODER = _LocatingDecoder()
+
+
+def _init_worker(stages: list, fields: Sequence[str]) -> None:
+    """
+    Compiles the cipher pipeline and field paths once when a worker process starts.
+
+    Args:
+        stages (list): The pipeline stages, see CipherPipeline.
+        fields (Sequence[str]): Dotted paths of the fields to transform.
+    """
+    global _pipeline, _paths
+    _pipeline = CipherPipeline(stages)
+    _paths = [field.split('.') for field in fields]
+
+
+def _transform_value(value, transform):
+    """
+    Transforms a field value, or every item of a list of them.
+
+    Args:
+        value (str | list): The field value.
+        transform (Callable): The cipher to apply to strings.
+
+    Returns:
+        str | list: The transformed value.
+
+    Raises:
+        TypeError: If the value is neither a string nor a list.
+    """
+    if isinstance(value, str):
+        return transform(value)
+    if isinstance(value, list):
+        return [_transform_value(item, transform) for item in value]
+    raise TypeError(f'only string fields can be encrypted, got {type(value).__name__}')
+
+
+def _transform_path(record, path: List[str], transform) -> None:
+    """
+    Transforms the field at a path of a record in place.
+
+    Lists met along the way are followed into every item, and records without the
+    field, or with a null in it, are left alone.
+
+    Args:
+        record (dict | list): The record, or the part of it the path starts from.
+        path (list): The keys leading to the field.
+        transform (Callable): The cipher to apply to strings.
+    """
+    node = record
+    last = len(path) - 1
+    for depth, key in enumerate(path):
+        if type(node) is list:
+            for item in node:
+                _transform_path(item, path[depth:], transform)
+            return
+        if type(node) is not dict:
+            return
+
+        if depth < last:
+            node = node.get(key)
+            continue
+
+        value = node.get(key)
+        if type(value) is str:
+            node[key] = transform(value)
+        elif value is not None:
+            node[key] = _transform_value(value, transform)
+
+
+def _dumps_string(value: str) -> str:
+    """
+    Serializes a transformed string, escaping non-ASCII characters only if it holds
+    a lone surrogate.
+
+    Args:
+        value (str): The string.
+
+    Returns:
+        str: Its JSON literal.
+    """
+    literal = _UNICODE_ENCODER.encode(value)
+    if _SURROGATE.search(literal):
+        return _ASCII_ENCODER.encode(value)
+    return literal
+
+
+def _splice(line: str, transform) -> str:
+    """
+    Transforms the fields of one line by replacing their string literals in it,
+    so every other byte of the line is kept as it was.
+
+    Args:
+        line (str): The JSON record.
+        transform (Callable): The cipher to apply to strings.
+
+    Returns:
+        str: The transformed line.
+
+    Raises:
+        ValueError: If the line is not JSON or repeats a key.
+    """
+    edits = []
+
+    def located(value: _Located) -> str:
+        result = transform(value)
+        edits.append((value.start, value.end, _dumps_string(result)))
+        return result
+
+    record = _LOCATING_DECODER.decode(line)
+    for path in _paths:
+        _transform_path(record, path, located)
+
+    pieces = []
+    position = 0
+    for start, end, literal in sorted(edits):
+        pieces += (line[position:start], literal)
+        position = end
+    pieces.append(line[position:])
+    return ''.join(pieces)
+
+
+def _transform_block(item: tuple) -> bytes:
+    """
+    Parses, transforms and serializes one block of whole lines with the worker's pipeline.
+
+    Only the transformed values change: the rest of every line, its spacing,
+    escapes and number formats included, is written back byte for byte. A line in
+    one of json.dumps' layouts is re-serialized in that layout, which is fast, and
+    any other line has the new values spliced into it, see _splice.
+
+    Args:
+        item (tuple): The block and whether to decrypt it.
+
+    Returns:
+        bytes: The transformed block. Blank lines are kept as they are.
+    """
+    block, decrypt = item
+    transform = _pipeline.decrypt if decrypt else _pipeline.encrypt
+    # Decoding the block once spares json.loads detecting the encoding of every line
+    loads = _DECODER.decode
+    # Lines of a file share a layout, so the last one that matched is tried first
+    encoders = list(_ENCODERS)
+    lines = block.decode('utf-8').split('\n')
+    for i, line in enumerate(lines):
+        if not line or line.isspace():
+            continue
+
+        record = loads(line)
+        for encoder in encoders:
+            if encoder.encode(record) == line:
+                break
+        else:
+            lines[i] = _splice(line, transform)
+            continue
+
+        if encoder is not encoders[0]:
+            encoders.remove(encoder)
+            encoders.insert(0, encoder)
+        for path in _paths:
+            _transform_path(record, path, transform)
+        dumped = encoder.encode(record)
+        if not encoder.ensure_ascii and _SURROGATE.search(dumped):
+            dumped = _splice(line, transform)
+        lines[i] = dumped
+
+    return '\n'.join(lines).encode('utf-8')
+
+
+def _blocks(source: BinaryIO, block_size: int) -> Iterator[bytes]:
+    """
+    Reads a file in large blocks cut at line boundaries.
+
+    Args:
+        source (BinaryIO): The input.
+        block_size (int): Bytes to read at a time.
+
+    Yields:
+        bytes: Whole lines, each block ending with a newline except maybe the last.
+    """
+    rest = b''
+    while True:
+        data = source.read(block_size)
+        if not data:
+            if rest:
+                yield rest
+            return
+
+        data = rest + data
+        cut = data.rfind(b'\n') + 1
+        if cut:
+            yield data[:cut]
+        rest = data[cut:]
+
+
+def transform_jsonl(source: BinaryIO, target: BinaryIO, fields: Sequence[str], stages: Iterable[Stage],
+                    decrypt: bool = False, workers: Optional[int] = None,
+                    block_size: int = BLOCK_SIZE) -> int:
+    """
+    Encrypts fields of the records in a JSONL stream across a pool of worker processes.
+
+    The input is read `block_size` bytes at a time, cut at the last newline, and each
+    block of lines is parsed, transformed and serialized by a worker. Blocks are
+    written back in input order with a bounded number in flight, so memory stays flat
+    however long the input is.
+
+    Only the transformed string values are rewritten, with json's escaping, which
+    keeps every character the ciphers produce (control characters, lone surrogates)
+    intact. Everything else in a line stays byte for byte, so decrypting restores
+    the original line exactly for ciphers that drop nothing from the values, as long
+    as they were written with json.dumps' escaping.
+
+    Args:
+        source (BinaryIO): The JSONL input.
+        target (BinaryIO): Where to write the transformed JSONL.
+        fields (Sequence[str]): Dotted paths of the string fields to transform, such
+            as 'body' or 'user.name'. Lists along a path are followed into every item.
+        stages (Iterable): The cipher stages, see CipherPipeline.
+        decrypt (bool): Decrypt the fields instead.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+            With 0 everything runs in the calling process.
+        block_size (int): Bytes read and handed to a worker at a time.
+
+    Returns:
+        int: The number of bytes written.
+
+    Raises:
+        ValueError: If no fields are given, a field repeats or lies inside another,
+            block_size is not positive, a stage is invalid, or a record repeats a key.
+        TypeError: If a field holds something other than strings.
+    """
+    stages = list(stages)
+    if not fields:
+        raise ValueError('at least one field is needed')
+    paths = sorted(field.split('.') for field in fields)
+    for path, following in zip(paths, paths[1:]):
+        # Sorted, a path is followed by any path it is a prefix of
+        if following[:len(path)] == path:
+            raise ValueError(f'field {".".join(following)!r} repeats or lies inside {".".join(path)!r}')
+    if block_size < 1:
+        raise ValueError('block_size must be positive')
+
+    # Validates the stages up front, and serves the in-process mode
+    _init_worker(stages, fields)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    items = ((block, decrypt) for block in _blocks(source, block_size))
+    written = 0
+    if workers == 0:
+        for item in items:
+            written += target.write(_transform_block(item))
+        return written
+
+    with multiprocessing.Pool(workers, _init_worker, (stages, list(fields))) as pool:
+        for block in imap_bounded(pool, _transform_block, items, workers * 2):
+            written += target.write(block)
+
+    return written
+
+
+def decrypt_jsonl(source: BinaryIO, target: BinaryIO, fields: Sequence[str], stages: Iterable[Stage],
+                  workers: Optional[int] = None, block_size: int = BLOCK_SIZE) -> int:
+    """
+    Decrypts fields of the records in a JSONL stream, see transform_jsonl.
+
+    Args:
+        source (BinaryIO): The JSONL input.
+        target (BinaryIO): Where to write the decrypted JSONL.
+        fields (Sequence[str]): Dotted paths of the encrypted fields.
+        stages (Iterable): The cipher stages they were encrypted with.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+        block_size (int): Bytes read and handed to a worker at a time.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    return transform_jsonl(source, target, fields, stages, True, workers, block_size)
+
+
+def _stage(spec: str) -> tuple:
+    """
+    Parses a NAME or NAME:KEY command-line stage.
+
+    Args:
+        spec (str): The stage, such as 'reverse1', 'vigenere:lemon' or 'caesar:3'.
+
+    Returns:
+        tuple: The cipher name and key.
+
+    Raises:
+        argparse.ArgumentTypeError: If a keyed cipher has no key, or a Caesar shift
+            is not an integer.
+    """
+    name, _, key = spec.partition(':')
+    if name not in KEYED_CIPHERS:
+        return name, None
+    if not key:
+        raise argparse.ArgumentTypeError(f'the {name} cipher needs a key, as {name}:KEY')
+    if name == 'caesar':
+        try:
+            return name, int(key)
+        except ValueError:
+            raise argparse.ArgumentTypeError('the caesar cipher needs an integer key')
+    return name, key
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point, run with `python encrypt_jsonl.py`.
+
+    Args:
+        argv (list | None): The arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description='Encrypt or decrypt fields of JSONL records.')
+    parser.add_argument('-f', '--field', action='append', required=True, dest='fields',
+                        help='dotted path of a field to transform, may be repeated')
+    parser.add_argument('-c', '--cipher', action='append', required=True, type=_stage, dest='stages',
+                        metavar='NAME[:KEY]', help='a cipher stage, may be repeated to chain ciphers')
+    parser.add_argument('-d', '--decrypt', action='store_true', help='decrypt instead of encrypting')
+    parser.add_argument('-i', '--input', help='input file (default: stdin)')
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('-w', '--workers', type=int, help='worker processes (default: one per CPU, 0 for none)')
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE, help='bytes handed to a worker at a time')
+    args = parser.parse_args(argv)
+
+    with ExitStack() as files:
+        source = files.enter_context(open(args.input, 'rb')) if args.input else sys.stdin.buffer
+        target = files.enter_context(open(args.output, 'wb')) if args.output else sys.stdout.buffer
+        transform_jsonl(source, target, args.fields, args.stages, args.decrypt, args.workers, args.block_size)
+        target.flush()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
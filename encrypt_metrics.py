@@ -0,0 +1,297 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional, Sequence
+
+import encrypt
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0)
+
+
+def _text_size(args: tuple, result) -> int:
+    """
+    Counts the characters of a call whose first argument after self is the text.
+    """
+    return len(args[1])
+
+
+def _cipher_text_size(args: tuple, result) -> int:
+    """
+    Counts the characters of a call that works on the object's own ciphertext.
+    """
+    return len(args[0].cipher_text)
+
+
+# The methods wrapped on every cipher class: name, operation label, character counter
+_CIPHER_METHODS = (
+    ('_encrypt_text', 'encrypt', _text_size),
+    ('_decrypt_text', 'decrypt', _cipher_text_size),
+    ('__str__', '__str__', _cipher_text_size),
+)
+
+# The Codec methods wrapped, labelled with the class of the codec's cipher
+_CODEC_METHODS = (
+    ('encrypt', 'encrypt'),
+    ('decrypt', 'decrypt'),
+)
+
+
+class Registry:
+    """
+    Call counts, characters, wall time and latency histograms per cipher and operation.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the latency histogram buckets, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """
+        Initializes an empty Registry.
+
+        Args:
+            buckets (Sequence[float]): Increasing latency bucket bounds, in seconds. An
+                unbounded bucket is always added at the end.
+
+        Raises:
+            ValueError: If the bounds are not increasing.
+        """
+        if list(buckets) != sorted(set(buckets)):
+            raise ValueError('bucket bounds must be increasing')
+
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, cipher: str, operation: str, characters: int, seconds: float) -> None:
+        """
+        Adds one call to the series of a cipher and operation.
+
+        Args:
+            cipher (str): The cipher class name.
+            operation (str): 'encrypt', 'decrypt' or '__str__'.
+            characters (int): The characters the call processed.
+            seconds (float): How long the call took.
+        """
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get((cipher, operation))
+            if series is None:
+                series = self._series[(cipher, operation)] = [0, 0, 0.0, [0] * (len(self.buckets) + 1)]
+            series[0] += 1
+            series[1] += characters
+            series[2] += seconds
+            series[3][bucket] += 1
+
+    def reset(self) -> None:
+        """
+        Forgets everything recorded so far.
+        """
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> list:
+        """
+        Copies the recorded series.
+
+        Returns:
+            list: One dict per cipher and operation, sorted, with the 'cipher',
+                'operation', 'calls', 'characters', 'seconds' and the 'histogram' as
+                [upper bound, calls] pairs (not cumulative, the last bound is None).
+        """
+        with self._lock:
+            items = sorted((key, [calls, characters, seconds, list(counts)])
+                           for key, (calls, characters, seconds, counts) in self._series.items())
+
+        bounds = list(self.buckets) + [None]
+        return [{
+            'cipher': cipher,
+            'operation': operation,
+            'calls': calls,
+            'characters': characters,
+            'seconds': seconds,
+            'histogram': [[bound, count] for bound, count in zip(bounds, counts)],
+        } for (cipher, operation), (calls, characters, seconds, counts) in items]
+
+    def to_json(self, **kwargs) -> str:
+        """
+        Dumps the recorded series as JSON, see snapshot.
+
+        Args:
+            **kwargs: Passed on to json.dumps.
+
+        Returns:
+            str: The JSON document.
+        """
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix: str = 'cipher') -> str:
+        """
+        Dumps the recorded series in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): The prefix of every metric name.
+
+        Returns:
+            str: A '<prefix>_characters_total' counter and a '<prefix>_seconds'
+                histogram, labelled by cipher and operation.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_characters_total Characters processed.',
+            f'# TYPE {prefix}_characters_total counter',
+        ]
+        for series in snapshot:
+            labels = f'cipher="{series["cipher"]}",operation="{series["operation"]}"'
+            lines.append(f'{prefix}_characters_total{{{labels}}} {series["characters"]}')
+
+        lines += [
+            f'# HELP {prefix}_seconds Wall time per call.',
+            f'# TYPE {prefix}_seconds histogram',
+        ]
+        for series in snapshot:
+            labels = f'cipher="{series["cipher"]}",operation="{series["operation"]}"'
+            cumulative = 0
+            for bound, count in series['histogram']:
+                cumulative += count
+                le = '+Inf' if bound is None else repr(bound)
+                lines.append(f'{prefix}_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_seconds_sum{{{labels}}} {series["seconds"]!r}')
+            lines.append(f'{prefix}_seconds_count{{{labels}}} {series["calls"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# The registry used when none is given
+REGISTRY = Registry()
+
+# The registry instrumentation is recording into, None when it is off
+_active: Optional[Registry] = None
+
+# The (owner, name, original attribute or None) of every patched method
+_patched: list = []
+
+_lock = threading.Lock()
+
+
+def _timed(func: Callable, registry: Registry, operation: str, cipher: Optional[str],
+           size: Callable) -> Callable:
+    """
+    Wraps a method so every call is recorded.
+
+    Args:
+        func (Callable): The method.
+        registry (Registry): Where to record.
+        operation (str): The operation label.
+        cipher (str | None): The cipher label, None to take it from the Codec called.
+        size (Callable): Counts the characters from the call's arguments and result.
+
+    Returns:
+        Callable: The timed method.
+    """
+    perf_counter = time.perf_counter
+
+    @wraps(func)
+    def timed(*args, **kwargs):
+        started = perf_counter()
+        result = func(*args, **kwargs)
+        seconds = perf_counter() - started
+        label = cipher if cipher is not None else type(args[0].cipher).__name__
+        registry.record(label, operation, size(args, result), seconds)
+        return result
+
+    return timed
+
+
+def enable(registry: Optional[Registry] = None) -> Registry:
+    """
+    Starts recording calls to the cipher classes and Codec.
+
+    The methods are patched on the classes only while instrumentation is on, so when
+    it is off the ciphers run their own code with no overhead at all. Streaming
+    transforms built by encoder() and decoder() keep the methods they were built with.
+
+    Args:
+        registry (Registry | None): Where to record, defaults to REGISTRY.
+
+    Returns:
+        Registry: The registry being recorded into.
+
+    Raises:
+        RuntimeError: If instrumentation is already on.
+    """
+    global _active
+    registry = registry if registry is not None else REGISTRY
+    with _lock:
+        if _active is not None:
+            raise RuntimeError('instrumentation is already enabled')
+
+        for cls in encrypt.CIPHERS.values():
+            for name, operation, size in _CIPHER_METHODS:
+                _patch(cls, name, _timed(getattr(cls, name), registry, operation, cls.__name__, size))
+
+        for name, operation in _CODEC_METHODS:
+            _patch(encrypt.Codec, name, _timed(getattr(encrypt.Codec, name), registry, operation, None, _text_size))
+
+        _active = registry
+
+    return registry
+
+
+def _patch(owner: type, name: str, method: Callable) -> None:
+    """
+    Replaces a method on a class, remembering how to undo it.
+
+    Args:
+        owner (type): The class.
+        name (str): The method name.
+        method (Callable): The replacement.
+    """
+    _patched.append((owner, name, vars(owner).get(name)))
+    setattr(owner, name, method)
+
+
+def disable() -> None:
+    """
+    Stops recording and restores the original methods. Does nothing if it is off.
+    """
+    global _active
+    with _lock:
+        while _patched:
+            owner, name, original = _patched.pop()
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        _active = None
+
+
+def enabled() -> bool:
+    """
+    Tells whether instrumentation is on.
+
+    Returns:
+        bool: True between enable and disable.
+    """
+    return _active is not None
+
+
+@contextmanager
+def instrument(registry: Optional[Registry] = None) -> Iterator[Registry]:
+    """
+    Records calls to the ciphers for the duration of a with block.
+
+    Args:
+        registry (Registry | None): Where to record, defaults to REGISTRY.
+
+    Yields:
+        Registry: The registry being recorded into.
+    """
+    registry = enable(registry)
+    try:
+        yield registry
+    finally:
+        disable()
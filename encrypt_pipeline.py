@@ -0,0 +1,244 @@
+from typing import Iterable, List, Tuple, Union
+
+from encrypt import Codec, TranslateTable
+
+Stage = Union[str, Tuple[str, object], Codec]
+
+
+def _codec(stage: Stage) -> Codec:
+    """
+    Turns a stage description into a Codec.
+
+    Args:
+        stage (str | tuple | Codec): A cipher name, a (name, key) pair or a Codec.
+
+    Returns:
+        Codec: The compiled stage.
+    """
+    if isinstance(stage, Codec):
+        return stage
+    if isinstance(stage, str):
+        return Codec(stage)
+    return Codec(*stage)
+
+
+def _compose(first: TranslateTable, second: TranslateTable) -> TranslateTable:
+    """
+    Builds the table that applies `first` and then `second` in one translate call.
+
+    Args:
+        first (TranslateTable): The table applied first.
+        second (TranslateTable): The table applied second.
+
+    Returns:
+        TranslateTable: The composed table. Characters either table drops are dropped.
+    """
+    table = TranslateTable()
+    for code, char in first.items():
+        if char is None:
+            continue
+        result = second[ord(char)]
+        if result is not None:
+            table[code] = result
+
+    return table
+
+
+def _operations(codec: Codec, decrypt: bool) -> list:
+    """
+    Describes one stage as the primitive operation the fusion passes work on.
+
+    Operations are tuples whose first item names them:
+    ('caesar', shift, table), ('table', table), ('reverse',), ('words',),
+    ('keyed', codec, decrypt), ('suffix', salt) and ('strip', size).
+
+    Args:
+        codec (Codec): The stage.
+        decrypt (bool): Describe the stage's decryption instead.
+
+    Returns:
+        list: The operations of the stage.
+    """
+    if codec.name == 'caesar':
+        shift = -codec.cipher.key if decrypt else codec.cipher.key
+        return [('caesar', shift, codec.translate_table(decrypt))]
+    if codec.name == 'mapping':
+        return [('table', codec.translate_table(decrypt))]
+    if codec.name == 'reverse1':
+        return [('reverse',)]
+    if codec.name == 'reverse2':
+        return [('words',)]
+    if codec.name == 'salting':
+        return [('strip', len(codec.cipher.salt))] if decrypt else [('suffix', codec.cipher.salt)]
+    return [('keyed', codec, decrypt)]
+
+
+def _fuse(operations: list) -> list:
+    """
+    Rewrites a list of operations into an equivalent, shorter one.
+
+    The passes run until nothing changes:
+    - Caesar shifts next to each other add up,
+    - translate tables next to each other compose into one table,
+    - a reversal moves past a character mapping (reversing and then mapping is the same
+      as mapping and then reversing), so reversals gather at the end,
+    - two reversals, or two word reversals, next to each other cancel out,
+    - a suffix followed by a character mapping becomes the mapping followed by the
+      mapped suffix, so tables on both sides of a Salting stage can merge.
+
+    Args:
+        operations (list): The operations, see _operations.
+
+    Returns:
+        list: The fused operations.
+    """
+    tables = ('caesar', 'table')
+    changed = True
+    while changed:
+        changed = False
+        fused: List[tuple] = []
+        for operation in operations:
+            previous = fused[-1] if fused else None
+            kind = operation[0]
+
+            if previous is None:
+                fused.append(operation)
+                continue
+
+            if previous[0] == 'caesar' and kind == 'caesar':
+                shift = previous[1] + operation[1]
+                fused[-1] = ('caesar', shift, Codec('caesar', shift).translate_table())
+            elif previous[0] in tables and kind in tables:
+                fused[-1] = ('table', _compose(previous[-1], operation[-1]))
+            elif previous[0] == kind and kind in ('reverse', 'words'):
+                fused.pop()
+            elif previous[0] == 'reverse' and kind in tables:
+                fused[-1:] = [operation, previous]
+            elif previous[0] == 'suffix' and kind in tables:
+                fused[-1:] = [operation, ('suffix', previous[1].translate(operation[-1]))]
+            else:
+                fused.append(operation)
+                continue
+
+            changed = True
+
+        operations = fused
+
+    return operations
+
+
+def _apply(operations: list, text: str) -> str:
+    """
+    Runs a list of operations over a text.
+
+    Args:
+        operations (list): The fused operations.
+        text (str): The input.
+
+    Returns:
+        str: The output.
+    """
+    for operation in operations:
+        kind = operation[0]
+        if kind in ('caesar', 'table'):
+            text = text.translate(operation[-1])
+        elif kind == 'reverse':
+            text = text[::-1]
+        elif kind == 'words':
+            text = ' '.join(word[::-1] for word in text.split(' '))
+        elif kind == 'keyed':
+            codec = operation[1]
+            text = codec.decrypt(text) if operation[2] else codec.encrypt(text)
+        elif kind == 'suffix':
+            text = text + operation[1]
+        else:
+            text = text[:len(text) - operation[1]]
+
+    return text
+
+
+class CipherPipeline:
+    """
+    A chain of ciphers applied one after the other, fused into as few passes as possible.
+
+    The stages are compiled once into primitive operations which are then fused: Caesar
+    shifts add up, character mappings merge into one translate table, reversals move to
+    the end of the chain and cancel out in pairs. Decryption is planned the same way from
+    the inverse of every stage, in reverse order, so it exactly undoes encryption.
+
+    Attributes:
+        stages (list): The Codec of every stage, in the order they are applied.
+        encrypt_plan (list): The fused operations used by encrypt.
+        decrypt_plan (list): The fused operations used by decrypt.
+    """
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        """
+        Initializes the CipherPipeline and plans both directions.
+
+        Args:
+            stages (Iterable): Cipher names, (name, key) pairs or Codec objects, in the
+                order they are applied.
+
+        Raises:
+            ValueError: If a cipher name is unknown or there are no stages.
+            TypeError: If a key has the wrong type for its cipher.
+        """
+        self.stages = [_codec(stage) for stage in stages]
+        if not self.stages:
+            raise ValueError('a pipeline needs at least one stage')
+
+        operations = []
+        for codec in self.stages:
+            operations.extend(_operations(codec, False))
+        self.encrypt_plan = _fuse(operations)
+
+        operations = []
+        for codec in reversed(self.stages):
+            operations.extend(_operations(codec, True))
+        self.decrypt_plan = _fuse(operations)
+
+    def encrypt(self, text: str) -> str:
+        """
+        Encrypts a text through every stage.
+
+        Args:
+            text (str): The original text.
+
+        Returns:
+            str: The encrypted text.
+
+        Raises:
+            TypeError: If the provided text is not a string.
+        """
+        if not isinstance(text, str):
+            raise TypeError
+
+        return _apply(self.encrypt_plan, text)
+
+    def decrypt(self, text: str) -> str:
+        """
+        Decrypts a text produced by encrypt.
+
+        Args:
+            text (str): The encrypted text.
+
+        Returns:
+            str: The decrypted text.
+
+        Raises:
+            TypeError: If the provided text is not a string.
+        """
+        if not isinstance(text, str):
+            raise TypeError
+
+        return _apply(self.decrypt_plan, text)
+
+    def passes(self) -> List[str]:
+        """
+        Lists the passes encrypt makes over the data, after fusion.
+
+        Returns:
+            list: The name of every fused operation.
+        """
+        return [operation[0] for operation in self.encrypt_plan]
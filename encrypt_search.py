@@ -0,0 +1,356 @@
+import hmac
+import mmap
+import struct
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+from encrypt import Codec
+from encrypt_container import key_fingerprint, new_salt
+
+# Ciphers that encrypt a piece of text the same way wherever it appears
+SEARCH_CIPHERS = ('caesar', 'mapping', 'reverse2')
+
+MAGIC = b'ENCS'
+VERSION = 2
+
+# magic, version, cipher name length, fingerprint salt, key fingerprint, records, trigrams,
+# postings, text bytes
+_HEADER = struct.Struct('<4sBB16s8sQQQQ')
+
+
+def _codes(text: str) -> np.ndarray:
+    """
+    Converts a text to its code points.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        np.ndarray: One int64 code point per character.
+    """
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.int64)
+
+
+def _trigrams(codes: np.ndarray) -> np.ndarray:
+    """
+    Packs every run of three code points into one integer.
+
+    Args:
+        codes (np.ndarray): The code points.
+
+    Returns:
+        np.ndarray: One int64 per trigram, 21 bits per character.
+    """
+    return (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+
+
+def _align(size: int) -> int:
+    """
+    Rounds a size up to a multiple of 8, so the arrays that follow stay aligned.
+    """
+    return -(-size // 8) * 8
+
+
+class SearchIndex:
+    """
+    A trigram index over a corpus of ciphertexts from one deterministic cipher.
+
+    A query is encrypted with the corpus' cipher and key, and the ciphertext records
+    holding every trigram of the encrypted query are intersected through sorted
+    posting lists, then checked for the whole query. Queries shorter than three
+    characters scan every record.
+
+    Caesar and mapping queries match any substring without decrypting the corpus, as
+    do ReverseCipher2 queries within one word. ReverseCipher2 reverses each word in
+    place, so the ciphertext of a query spanning a space neither has to appear in a
+    record holding it nor means the record does ('hello world' encrypts to 'olleh
+    dlrow', which holds 'h d'). Such a query is looked up one word at a time, and
+    the records holding every word are decrypted and checked for the whole query.
+
+    The index is saved as one file of flat arrays that load() maps into memory, so
+    opening an index does not read it.
+
+    Attributes:
+        codec (Codec): The corpus' cipher.
+        ids (np.ndarray): The id of every record.
+    """
+
+    def __init__(self, codec: Codec, ids: np.ndarray, keys: np.ndarray, starts: np.ndarray,
+                 postings: np.ndarray, offsets: np.ndarray, text: Union[bytes, mmap.mmap],
+                 base: int = 0) -> None:
+        """
+        Initializes the SearchIndex from its arrays, see build and load.
+
+        Args:
+            codec (Codec): The corpus' cipher.
+            ids (np.ndarray): The id of every record.
+            keys (np.ndarray): Every trigram, sorted.
+            starts (np.ndarray): Where each trigram's postings start, plus the end.
+            postings (np.ndarray): Record numbers, sorted within each trigram.
+            offsets (np.ndarray): Where each record starts in the text, plus the end.
+            text (bytes | mmap.mmap): Every record's UTF-8 ciphertext, one after the
+                other, from position `base`.
+            base (int): Where the first record starts in `text`.
+        """
+        self.codec = codec
+        self.ids = ids
+        self._keys = keys
+        self._starts = starts
+        self._postings = postings
+        self._offsets = offsets
+        self._text = text
+        self._base = base
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, ciphertexts: Iterable[str], cipher_name: str, key=None,
+              ids: Optional[Iterable[int]] = None) -> 'SearchIndex':
+        """
+        Indexes a corpus of ciphertexts.
+
+        Args:
+            ciphertexts (Iterable[str]): The encrypted records.
+            cipher_name (str): One of SEARCH_CIPHERS.
+            key (str | int | None): The key they were encrypted with.
+            ids (Iterable[int] | None): The id of every record, defaults to its position.
+
+        Returns:
+            SearchIndex: The index.
+
+        Raises:
+            ValueError: If the cipher is not deterministic, or there are not as many
+                ids as records.
+            TypeError: If the key has the wrong type for the cipher.
+        """
+        if cipher_name not in SEARCH_CIPHERS:
+            raise ValueError(f'{cipher_name} cipher cannot be searched, expected one of {", ".join(SEARCH_CIPHERS)}')
+
+        codec = Codec(cipher_name, key)
+        texts = list(ciphertexts)
+        ids = np.arange(len(texts), dtype=np.uint64) if ids is None else np.fromiter(ids, dtype=np.uint64)
+        if len(ids) != len(texts):
+            raise ValueError('there must be one id per record')
+
+        encoded = [text.encode('utf-8', 'surrogatepass') for text in texts]
+        offsets = np.zeros(len(texts) + 1, dtype=np.uint64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+
+        # One array of code points, with the record each trigram starts in
+        lengths = np.array([len(text) for text in texts], dtype=np.int64)
+        codes = _codes(''.join(texts))
+        records = np.repeat(np.arange(len(texts), dtype=np.uint32), lengths)
+        if len(codes) >= 3:
+            trigrams = _trigrams(codes)
+            # A trigram is only kept if it does not run into the next record
+            inside = records[:-2] == records[2:]
+            trigrams, records = trigrams[inside], records[:-2][inside]
+        else:
+            trigrams, records = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint32)
+
+        # Records are in order already, so a stable sort keeps every posting list sorted
+        order = np.argsort(trigrams, kind='stable')
+        trigrams, records = trigrams[order], records[order]
+        new = np.ones(len(trigrams), dtype=bool)
+        new[1:] = (trigrams[1:] != trigrams[:-1]) | (records[1:] != records[:-1])
+        trigrams, postings = trigrams[new], records[new]
+
+        first = np.flatnonzero(np.append(True, trigrams[1:] != trigrams[:-1]) if len(trigrams) else trigrams)
+        keys = trigrams[first]
+        starts = np.append(first, len(postings)).astype(np.uint64)
+        return cls(codec, ids, keys, starts, postings, offsets, b''.join(encoded))
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a file load() can map.
+
+        Args:
+            path (str): Where to write it.
+        """
+        name = self.codec.name.encode('ascii')
+        salt = new_salt()
+        header = _HEADER.pack(MAGIC, VERSION, len(name), salt, key_fingerprint(self.codec.name, self.codec.key, salt),
+                              len(self.ids), len(self._keys), len(self._postings), int(self._offsets[-1]))
+        with open(path, 'wb') as f:
+            f.write(header + name)
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            for array in (self.ids, self._keys, self._starts, self._offsets):
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.write(np.ascontiguousarray(self._postings, dtype=np.uint32).tobytes())
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            f.write(self._text[self._base:self._base + int(self._offsets[-1])])
+
+    @classmethod
+    def load(cls, path: str, key=None) -> 'SearchIndex':
+        """
+        Maps an index written by save into memory.
+
+        Args:
+            path (str): The index file.
+            key (str | int | None): The key the corpus was encrypted with, used to
+                encrypt queries.
+
+        Returns:
+            SearchIndex: The index, backed by the file.
+
+        Raises:
+            ValueError: If the file is not an index or the key does not match.
+        """
+        with open(path, 'rb') as f:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, name_size, salt, fingerprint, count, trigrams, postings, size = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a supported search index')
+
+        name = view[_HEADER.size:_HEADER.size + name_size].decode('ascii')
+        if not hmac.compare_digest(key_fingerprint(name, key, salt), fingerprint):
+            raise ValueError('the key does not match the index')
+
+        position = _align(_HEADER.size + name_size)
+        arrays = []
+        for dtype, length in ((np.uint64, count), (np.int64, trigrams), (np.uint64, trigrams + 1),
+                              (np.uint64, count + 1), (np.uint32, postings)):
+            arrays.append(np.frombuffer(view, dtype=dtype, count=length, offset=position))
+            position += length * np.dtype(dtype).itemsize
+
+        ids, keys, starts, offsets, postings = arrays
+        index = cls(Codec(name, key), ids, keys, starts, postings, offsets, view, _align(position))
+        index._mmap = view
+        return index
+
+    def search_encrypted(self, query: str) -> List[int]:
+        """
+        Finds the records holding an already encrypted query.
+
+        Args:
+            query (str): The encrypted query.
+
+        Returns:
+            list: The ids of the matching records, in corpus order.
+        """
+        codec = self.codec
+        if codec.name != 'reverse2' or ' ' not in query:
+            return self.ids[self._find(query)].tolist()
+
+        plain = codec.decrypt(query)
+        numbers = None
+        for word in [word for word in plain.split(' ') if word] or [plain]:
+            found = set(self._find(codec.encrypt(word)))
+            numbers = found if numbers is None else numbers & found
+        matches = sorted(number for number in numbers if plain in codec.decrypt(self._record(number)))
+        return self.ids[matches].tolist()
+
+    def _find(self, query: str) -> List[int]:
+        """
+        Finds the records whose ciphertext holds an encrypted query.
+
+        Args:
+            query (str): The encrypted query.
+
+        Returns:
+            list: The numbers of the matching records, in corpus order.
+        """
+        needle = query.encode('utf-8', 'surrogatepass')
+        if not needle:
+            return list(range(len(self.ids)))
+        if len(query) < 3:
+            return self._scan(needle)
+
+        lists = []
+        for trigram in np.unique(_trigrams(_codes(query))):
+            at = int(np.searchsorted(self._keys, trigram))
+            if at == len(self._keys) or self._keys[at] != trigram:
+                return []
+            lists.append(self._postings[int(self._starts[at]):int(self._starts[at + 1])])
+
+        # Every posting list is sorted, so the shortest one is looked up in the others
+        lists.sort(key=len)
+        candidates = lists[0]
+        for postings in lists[1:]:
+            found = np.searchsorted(postings, candidates)
+            candidates = candidates[postings[np.minimum(found, len(postings) - 1)] == candidates]
+            if not len(candidates):
+                return []
+
+        if len(query) == 3:
+            return candidates.tolist()
+
+        text, base, find = self._text, self._base, self._text.find
+        starts = self._offsets[candidates].tolist()
+        ends = self._offsets[candidates + 1].tolist()
+        return [number for number, start, end in zip(candidates.tolist(), starts, ends)
+                if find(needle, base + start, base + end) != -1]
+
+    def _scan(self, needle: bytes) -> List[int]:
+        """
+        Finds the records holding a short query by searching the whole text.
+
+        Args:
+            needle (bytes): The encrypted query as UTF-8.
+
+        Returns:
+            list: The numbers of the matching records, in corpus order.
+        """
+        find, base, offsets = self._text.find, self._base, self._offsets
+        end = base + int(offsets[-1])
+        matches = []
+        position = find(needle, base, end)
+        while position != -1:
+            # A uint64 needle spares searchsorted casting the whole array
+            number = int(offsets.searchsorted(np.uint64(position - base), side='right')) - 1
+            stop = base + int(offsets[number + 1])
+            if position + len(needle) > stop:
+                # The match runs into the next record
+                position = find(needle, position + 1, end)
+                continue
+
+            matches.append(number)
+            # Carry on from the next record, one match per record is enough
+            position = find(needle, stop, end)
+
+        return matches
+
+    def _record(self, number: int) -> str:
+        """
+        Reads one record's ciphertext.
+
+        Args:
+            number (int): The record's position in the corpus.
+
+        Returns:
+            str: The ciphertext.
+        """
+        start = self._base + int(self._offsets[number])
+        end = self._base + int(self._offsets[number + 1])
+        return bytes(self._text[start:end]).decode('utf-8', 'surrogatepass')
+
+    def search(self, query: str) -> List[int]:
+        """
+        Finds the records whose plaintext holds a query, without decrypting them.
+
+        Args:
+            query (str): The plaintext query.
+
+        Returns:
+            list: The ids of the matching records, in corpus order.
+
+        Raises:
+            TypeError: If the query is not a string.
+        """
+        if not isinstance(query, str):
+            raise TypeError
+
+        return self.search_encrypted(self.codec.encrypt(query))
+
+    def close(self) -> None:
+        """
+        Releases the file mapping of a loaded index. The index cannot be used afterwards.
+        """
+        if self._mmap is not None:
+            self.ids = self._keys = self._starts = self._postings = self._offsets = self._text = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
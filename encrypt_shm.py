@@ -0,0 +1,200 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from encrypt import Buffer, Codec
+
+# Ciphers whose output byte i depends only on input byte i and its position
+SHARED_CIPHERS = ('xor', 'caesar', 'vigenere', 'mapping')
+
+# Smallest range handed to a worker, smaller inputs use fewer workers
+MIN_RANGE_SIZE = 1 << 20
+
+# The codec a worker process compiles once, set by _init_worker
+_codec: Optional[Codec] = None
+
+# The shared blocks a worker process has attached to, by name
+_blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to a shared memory block created by the parent process, once per worker.
+
+    Pool workers share the parent's resource tracker, so the block stays registered
+    once and is unlinked by the parent alone.
+
+    Args:
+        name (str): The block's name.
+
+    Returns:
+        SharedMemory: The attached block.
+    """
+    block = _blocks.get(name)
+    if block is None:
+        block = _blocks[name] = shared_memory.SharedMemory(name)
+    return block
+
+
+def _init_worker(cipher_name: str, key) -> None:
+    """
+    Compiles the cipher once when a worker process starts.
+
+    Args:
+        cipher_name (str): One of SHARED_CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+    """
+    global _codec
+    _codec = Codec(cipher_name, key)
+
+
+def _count_range(item: tuple) -> int:
+    """
+    Counts the bytes of one input range the cipher keeps.
+
+    Args:
+        item (tuple): The input block's name, the range's start and stop, and whether
+            to decrypt.
+
+    Returns:
+        int: The number of bytes the range becomes.
+    """
+    source, start, stop, decrypt = item
+    with _attach(source).buf[start:stop] as view:
+        return len(view.tobytes().translate(None, _codec.deleted_bytes(decrypt)))
+
+
+def _transform_range(item: tuple) -> int:
+    """
+    Transforms one input range straight into its place in the output block.
+
+    XOR is copied across and transformed in place in the output. The other ciphers
+    translate the range into a temporary bytes object first.
+
+    Args:
+        item (tuple): The input and output blocks' names, the range's start and stop,
+            where its output starts, and whether to decrypt.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    source, target, start, stop, position, decrypt = item
+    output = _attach(target).buf
+    with _attach(source).buf[start:stop] as view:
+        if _codec.name == 'xor':
+            size = stop - start
+            with output[position:position + size] as out:
+                out[:] = view
+                _codec.cipher.cipher_bytes(out, start, inplace=True)
+            return size
+
+        result = _codec.decrypt(view, start) if decrypt else _codec.encrypt(view, start)
+
+    output[position:position + len(result)] = result
+    return len(result)
+
+
+def _ranges(size: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Splits an input into about four ranges per worker, none smaller than MIN_RANGE_SIZE.
+
+    Args:
+        size (int): The input size.
+        workers (int): The number of worker processes.
+
+    Returns:
+        list: The (start, stop) of every range, in order.
+    """
+    step = max(MIN_RANGE_SIZE, -(-size // (workers * 4)))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def encrypt_shared(data: Buffer, cipher_name: str, key=None, workers: Optional[int] = None,
+                   decrypt: bool = False) -> bytes:
+    """
+    Encrypts a large buffer on several cores through shared memory.
+
+    The input is copied once into a shared memory block and split into disjoint
+    ranges. Each worker attaches to the block when it starts, transforms the ranges it
+    is given (only their bounds are pickled) with the key offset of their first byte,
+    and writes the result straight into a shared output block.
+
+    When the cipher keeps every byte (XOR, or decrypting with a cipher whose
+    ciphertext alphabet is every byte it reads), range i of the output is range i of
+    the input. Otherwise a first parallel pass counts the bytes each range keeps, and
+    their running total tells the second pass where to write.
+
+    Args:
+        data (Buffer): The bytes to encrypt, read as Latin-1 characters.
+        cipher_name (str): One of SHARED_CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+        decrypt (bool): Decrypt the data instead.
+
+    Returns:
+        bytes: The encrypted (or decrypted) data.
+
+    Raises:
+        ValueError: If the cipher cannot work on byte ranges or workers is negative.
+        TypeError: If the key has the wrong type for the cipher.
+    """
+    if cipher_name not in SHARED_CIPHERS:
+        raise ValueError(f'{cipher_name} cipher cannot be split, expected one of {", ".join(SHARED_CIPHERS)}')
+    if workers is not None and workers < 0:
+        raise ValueError('workers cannot be negative')
+
+    codec = Codec(cipher_name, key)
+    view = memoryview(data).cast('B')
+    size = len(view)
+    if not size:
+        return b''
+
+    workers = workers or os.cpu_count() or 1
+    ranges = _ranges(size, workers)
+    workers = min(workers, len(ranges))
+    deleted = codec.deleted_bytes(decrypt)
+
+    source = shared_memory.SharedMemory(create=True, size=size)
+    target = None
+    try:
+        source.buf[:size] = view
+        with multiprocessing.Pool(workers, _init_worker, (cipher_name, key)) as pool:
+            if deleted:
+                sizes = pool.map(_count_range, [(source.name, start, stop, decrypt) for start, stop in ranges],
+                                 chunksize=1)
+            else:
+                sizes = [stop - start for start, stop in ranges]
+
+            # A block cannot be empty, even when every byte is dropped
+            target = shared_memory.SharedMemory(create=True, size=max(1, sum(sizes)))
+            items = []
+            position = 0
+            for (start, stop), kept in zip(ranges, sizes):
+                items.append((source.name, target.name, start, stop, position, decrypt))
+                position += kept
+
+            pool.map(_transform_range, items, chunksize=1)
+
+        return bytes(target.buf[:position])
+    finally:
+        for block in (source, target):
+            if block is not None:
+                block.close()
+                block.unlink()
+
+
+def decrypt_shared(data: Buffer, cipher_name: str, key=None, workers: Optional[int] = None) -> bytes:
+    """
+    Decrypts a large buffer on several cores through shared memory, see encrypt_shared.
+
+    Args:
+        data (Buffer): The bytes to decrypt.
+        cipher_name (str): One of SHARED_CIPHERS.
+        key (str | int | None): The key for keyed ciphers.
+        workers (int | None): Number of worker processes, defaults to os.cpu_count().
+
+    Returns:
+        bytes: The decrypted data.
+    """
+    return encrypt_shared(data, cipher_name, key, workers, decrypt=True)
@@ -0,0 +1,220 @@
+import random
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+# Grid dimensions, in cells
+GRID_WIDTH = 40
+GRID_HEIGHT = 40
+
+# A live cell, as (col, row)
+Position = Tuple[int, int]
+
+# Where the eight neighbours of a cell are
+_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def gen(num: int, width: int = GRID_WIDTH, height: int = GRID_HEIGHT,
+        rng: Optional[random.Random] = None) -> Set[Position]:
+    """
+    Generates up to `num` random live cells.
+
+    Args:
+        num (int): How many cells to draw, repeats are dropped.
+        width (int): The grid width.
+        height (int): The grid height.
+        rng (random.Random | None): The random generator, defaults to the random module.
+
+    Returns:
+        set: The live cells.
+    """
+    rng = rng or random
+    return set([(rng.randrange(0, height), rng.randrange(0, width)) for _ in range(num)])
+
+
+def get_neighbors(pos: Position, width: int = GRID_WIDTH, height: int = GRID_HEIGHT) -> List[Position]:
+    """
+    Lists the cells around a cell.
+
+    Cells left of column 0 or above row 0 do not exist, but column `width` and row
+    `height` do, one past the visible grid, as they always have.
+
+    Args:
+        pos (Position): The cell, as (col, row).
+        width (int): The grid width.
+        height (int): The grid height.
+
+    Returns:
+        list: Up to eight neighbouring cells.
+    """
+    x, y = pos
+    neighbors = []
+    for dx in [-1, 0, 1]:
+
+        if x + dx < 0 or x + dx > width:
+            continue
+
+        for dy in [-1, 0, 1]:
+
+            if y + dy < 0 or y + dy > height:
+                continue
+
+            if dx == 0 and dy == 0:
+                continue
+
+            neighbors.append((x + dx, y + dy))
+
+    return neighbors
+
+
+def adjust_grid(positions: Set[Position], width: int = GRID_WIDTH, height: int = GRID_HEIGHT) -> Set[Position]:
+    """
+    Advances the live cells by one generation.
+
+    A live cell with two or three live neighbours survives, and a dead cell with
+    exactly three comes alive.
+
+    Args:
+        positions (set): The live cells.
+        width (int): The grid width.
+        height (int): The grid height.
+
+    Returns:
+        set: The live cells of the next generation.
+    """
+    all_neighbors = set()
+    new_positons = set()
+
+    for position in positions:
+        neighbors = get_neighbors(position, width, height)
+        all_neighbors.update(neighbors)
+
+        neighbors = list(filter(lambda x: x in positions, neighbors))
+
+        if len(neighbors) in [2, 3]:
+            new_positons.add(position)
+
+    for position in all_neighbors:
+        neighbors = get_neighbors(position, width, height)
+        neighbors = list(filter(lambda x: x in positions, neighbors))
+
+        if len(neighbors) == 3:
+            new_positons.add(position)
+
+    return new_positons
+
+
+def adjust_grid_sparse(positions: Set[Position], width: Optional[int] = GRID_WIDTH,
+                       height: Optional[int] = GRID_HEIGHT) -> Set[Position]:
+    """
+    Advances the live cells by one generation, with one counting pass.
+
+    Every live cell adds one to each of its eight neighbours in a single Counter,
+    so a cell's neighbour count is looked up rather than recomputed, and only cells
+    next to a live cell are ever visited. The results are the same as adjust_grid,
+    including its edges: only cells inside the grid are counted as neighbours and
+    only cells inside it are born.
+
+    Args:
+        positions (set): The live cells.
+        width (int | None): The grid width, None with height for an unbounded universe.
+        height (int | None): The grid height.
+
+    Returns:
+        set: The live cells of the next generation.
+
+    Raises:
+        ValueError: If only one of width and height is None.
+    """
+    if width is None or height is None:
+        if width is not None or height is not None:
+            raise ValueError('width and height must both be None for an unbounded universe')
+        cells = positions
+    else:
+        cells = [(x, y) for x, y in positions if 0 <= x <= width and 0 <= y <= height]
+
+    counts = Counter([(x + dx, y + dy) for x, y in cells for dx, dy in _OFFSETS])
+    if width is None:
+        return {position for position, count in counts.items()
+                if count == 3 or count == 2 and position in positions}
+
+    return {(x, y) for (x, y), count in counts.items()
+            if count == 3 and (0 <= x <= width and 0 <= y <= height or (x, y) in positions)
+            or count == 2 and (x, y) in positions}
+
+
+class Life:
+    """
+    The state of a Game of Life, with no display attached, stepped by adjust_grid_sparse.
+
+    Attributes:
+        positions (set): The live cells, as (col, row).
+        width (int | None): The grid width, None for an unbounded universe.
+        height (int | None): The grid height, None for an unbounded universe.
+        generation (int): How many generations have been run.
+    """
+
+    def __init__(self, positions: Iterable[Position] = (), width: Optional[int] = GRID_WIDTH,
+                 height: Optional[int] = GRID_HEIGHT) -> None:
+        """
+        Initializes the Life.
+
+        Args:
+            positions (Iterable[Position]): The live cells.
+            width (int | None): The grid width, None with height for an unbounded universe.
+            height (int | None): The grid height.
+        """
+        self.positions = set(positions)
+        self.width = width
+        self.height = height
+        self.generation = 0
+
+    def step(self) -> Set[Position]:
+        """
+        Advances by one generation.
+
+        Returns:
+            set: The live cells.
+        """
+        self.positions = adjust_grid_sparse(self.positions, self.width, self.height)
+        self.generation += 1
+        return self.positions
+
+    def run(self, generations: int) -> Set[Position]:
+        """
+        Advances by a number of generations.
+
+        Args:
+            generations (int): How many generations to run.
+
+        Returns:
+            set: The live cells.
+
+        Raises:
+            ValueError: If generations is negative.
+        """
+        if generations < 0:
+            raise ValueError('generations cannot be negative')
+
+        for _ in range(generations):
+            self.step()
+        return self.positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def run(positions: Iterable[Position], generations: int, width: Optional[int] = GRID_WIDTH,
+        height: Optional[int] = GRID_HEIGHT) -> Set[Position]:
+    """
+    Runs a Game of Life without a display.
+
+    Args:
+        positions (Iterable[Position]): The live cells.
+        generations (int): How many generations to run.
+        width (int | None): The grid width, None with height for an unbounded universe.
+        height (int | None): The grid height.
+
+    Returns:
+        set: The live cells after the last generation.
+    """
+    return Life(positions, width, height).run(generations)
@@ -0,0 +1,380 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from game_of_life import Position
+
+# Canonical nodes kept between advances before unreachable ones are collected, about
+# 200 bytes each
+NODE_CACHE_SIZE = 1 << 20
+
+
+class Node:
+    """
+    A square of 2**level cells in a quadtree. Nodes are canonical within a HashLife,
+    so two equal squares are the same Node and compare by identity.
+
+    Attributes:
+        nw (Node): The top left quadrant, None for a single cell.
+        ne (Node): The top right quadrant.
+        sw (Node): The bottom left quadrant.
+        se (Node): The bottom right quadrant.
+        level (int): The square is 2**level cells wide.
+        population (int): Its live cells.
+        result (Node | None): Its centre half 2**(level - 2) generations on, once known.
+    """
+
+    __slots__ = ('nw', 'ne', 'sw', 'se', 'level', 'population', 'result')
+
+    def __init__(self, nw: Optional['Node'], ne: Optional['Node'], sw: Optional['Node'], se: Optional['Node'],
+                 level: int, population: int) -> None:
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+        self.result: Optional[Node] = None
+
+
+# The two single cells every tree is built from
+_OFF = Node(None, None, None, None, 0, 0)
+_ON = Node(None, None, None, None, 0, 1)
+
+
+class HashLife:
+    """
+    An unbounded Game of Life advanced by Gosper's HashLife algorithm.
+
+    The universe is a quadtree of canonical nodes, so repeated squares are stored
+    once. A node's centre half some power of two generations later is computed from
+    the results of its overlapping quadrants and memoized, so patterns with
+    repeating structure advance 2**k generations in one call, in time that grows
+    with the structure rather than with the generations. The universe grows as the
+    pattern does: unlike adjust_grid there is no edge at column and row 0 and 40.
+
+    The node table and memoized results keep growing as new squares appear, so once
+    the table holds more than max_nodes, every node no longer reachable from the
+    current universe is dropped, with the results that point to one. This is checked
+    between the doublings of the root that start an advance and after it. The
+    squares an advance computes are all reachable from the recursion until it
+    returns, so the cap is not a hard bound during one advance: a single large
+    advance can grow the table past it, and the collection after it brings it back.
+
+    Attributes:
+        generation (int): How many generations have been run.
+        max_nodes (int): The node count that triggers a collection.
+    """
+
+    def __init__(self, positions: Iterable[Position] = (), max_nodes: int = NODE_CACHE_SIZE) -> None:
+        """
+        Initializes the HashLife.
+
+        Args:
+            positions (Iterable[Position]): The live cells, as (col, row).
+            max_nodes (int): The node count that triggers a collection.
+
+        Raises:
+            ValueError: If max_nodes is not positive.
+        """
+        if max_nodes < 1:
+            raise ValueError('max_nodes must be positive')
+
+        self.generation = 0
+        self.max_nodes = max_nodes
+        self._table: Dict[Tuple[Node, Node, Node, Node], Node] = {}
+        # Results for steps shorter than a node's own 2**(level - 2), by (node, step)
+        self._steps: Dict[Tuple[Node, int], Node] = {}
+        self._empties: List[Node] = [_OFF]
+
+        positions = set(positions)
+        if positions:
+            left = min(x for x, _ in positions)
+            top = min(y for _, y in positions)
+            size = max(max(x for x, _ in positions) - left, max(y for _, y in positions) - top) + 1
+        else:
+            left = top = size = 0
+
+        level = max(3, (size - 1).bit_length())
+        self._root = self._build([(x - left, y - top) for x, y in positions], level)
+        # The (col, row) of the root's top left cell
+        self._origin = (left, top)
+
+    def _join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """
+        Returns the canonical node made of four quadrants.
+
+        Args:
+            nw (Node): The top left quadrant.
+            ne (Node): The top right quadrant.
+            sw (Node): The bottom left quadrant.
+            se (Node): The bottom right quadrant.
+
+        Returns:
+            Node: The node one level up.
+        """
+        key = (nw, ne, sw, se)
+        node = self._table.get(key)
+        if node is None:
+            node = self._table[key] = Node(nw, ne, sw, se, nw.level + 1,
+                                           nw.population + ne.population + sw.population + se.population)
+        return node
+
+    def _empty(self, level: int) -> Node:
+        """
+        Returns the empty node of a level.
+
+        Args:
+            level (int): The level.
+
+        Returns:
+            Node: A square with no live cells.
+        """
+        empties = self._empties
+        while len(empties) <= level:
+            empty = empties[-1]
+            empties.append(self._join(empty, empty, empty, empty))
+        return empties[level]
+
+    def _build(self, cells: List[Position], level: int) -> Node:
+        """
+        Builds the node of a square from the live cells in it.
+
+        Args:
+            cells (list): The live cells, relative to the square's top left cell.
+            level (int): The square's level.
+
+        Returns:
+            Node: The node.
+        """
+        if not cells:
+            return self._empty(level)
+        if level == 0:
+            return _ON
+
+        half = 1 << (level - 1)
+        quadrants = [[], [], [], []]
+        for x, y in cells:
+            quadrants[(y >= half) * 2 + (x >= half)].append((x % half, y % half))
+        return self._join(*[self._build(quadrant, level - 1) for quadrant in quadrants])
+
+    @property
+    def positions(self) -> Set[Position]:
+        """
+        The live cells, as (col, row).
+        """
+        positions = set()
+        stack = [(self._root, *self._origin)]
+        while stack:
+            node, x, y = stack.pop()
+            if not node.population:
+                continue
+            if node.level == 0:
+                positions.add((x, y))
+                continue
+
+            half = 1 << (node.level - 1)
+            stack += [(node.nw, x, y), (node.ne, x + half, y), (node.sw, x, y + half), (node.se, x + half, y + half)]
+        return positions
+
+    @property
+    def nodes(self) -> int:
+        """
+        The number of canonical nodes kept.
+        """
+        return len(self._table)
+
+    def _life(self, node: Node) -> Node:
+        """
+        Runs one generation on the centre of a 4x4 node, cell by cell.
+
+        Args:
+            node (Node): A level 2 node.
+
+        Returns:
+            Node: Its centre 2x2 cells one generation on.
+        """
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        rows = [
+            [nw.nw, nw.ne, ne.nw, ne.ne],
+            [nw.sw, nw.se, ne.sw, ne.se],
+            [sw.nw, sw.ne, se.nw, se.ne],
+            [sw.sw, sw.se, se.sw, se.se],
+        ]
+        cells = []
+        for row in (1, 2):
+            for col in (1, 2):
+                count = sum(rows[r][c].population for r in (row - 1, row, row + 1) for c in (col - 1, col, col + 1))
+                alive = rows[row][col].population
+                # count includes the cell itself
+                cells.append(_ON if count == 3 or alive and count == 4 else _OFF)
+        return self._join(*cells)
+
+    def _center(self, node: Node) -> Node:
+        """
+        Returns the centre half of a node, as it is.
+        """
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _next(self, node: Node, step: int) -> Node:
+        """
+        Advances the centre half of a node by 2**step generations.
+
+        The node is cut into nine overlapping squares a quarter of its area. When
+        step is the most the node allows, level - 2, each is advanced by half the
+        step and the four squares they overlap in are advanced by the other half.
+        Shorter steps take the nine squares' centres as they are and advance only the
+        four.
+
+        Args:
+            node (Node): A node of level 2 or more.
+            step (int): The log2 of the generations, at most node.level - 2.
+
+        Returns:
+            Node: The centre half of the node, one level down, 2**step generations on.
+        """
+        full = step == node.level - 2
+        if full:
+            if node.result is not None:
+                return node.result
+        else:
+            result = self._steps.get((node, step))
+            if result is not None:
+                return result
+
+        if not node.population:
+            result = self._empty(node.level - 1)
+        elif node.level == 2:
+            result = self._life(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            join = self._join
+            squares = (
+                nw, join(nw.ne, ne.nw, nw.se, ne.sw), ne,
+                join(nw.sw, nw.se, sw.nw, sw.ne), join(nw.se, ne.sw, sw.ne, se.nw), join(ne.sw, ne.se, se.nw, se.ne),
+                sw, join(sw.ne, se.nw, sw.se, se.sw), se,
+            )
+            if full:
+                a, b, c, d, e, f, g, h, i = [self._next(square, step - 1) for square in squares]
+                step -= 1
+            else:
+                a, b, c, d, e, f, g, h, i = [self._center(square) for square in squares]
+
+            result = join(self._next(join(a, b, d, e), step), self._next(join(b, c, e, f), step),
+                          self._next(join(d, e, g, h), step), self._next(join(e, f, h, i), step))
+
+        if full:
+            node.result = result
+        else:
+            self._steps[(node, step)] = result
+        return result
+
+    def _centered(self, node: Node) -> bool:
+        """
+        Tells whether every live cell of a node is in its centre quarter.
+        """
+        return (node.nw.se.se.population + node.ne.sw.sw.population + node.sw.ne.ne.population
+                + node.se.nw.nw.population) == node.population
+
+    def _expand(self) -> None:
+        """
+        Doubles the root, keeping the universe where it is.
+        """
+        root = self._root
+        empty = self._empty(root.level - 1)
+        self._root = self._join(self._join(empty, empty, empty, root.nw), self._join(empty, empty, root.ne, empty),
+                                self._join(empty, root.sw, empty, empty), self._join(root.se, empty, empty, empty))
+        half = 1 << (root.level - 1)
+        self._origin = (self._origin[0] - half, self._origin[1] - half)
+
+    def advance(self, k: int) -> None:
+        """
+        Advances by 2**k generations in one call.
+
+        The root is first doubled until it is at least three levels above k and the
+        pattern sits in its centre quarter, so nothing can grow out of the half the
+        result keeps. Nodes past max_nodes are collected between doublings and after
+        the advance, not during it.
+
+        Args:
+            k (int): The log2 of the generations.
+
+        Raises:
+            ValueError: If k is negative.
+        """
+        if k < 0:
+            raise ValueError('k cannot be negative')
+
+        while self._root.level < k + 3 or not self._centered(self._root):
+            if len(self._table) > self.max_nodes:
+                self.collect()
+            self._expand()
+
+        root = self._root
+        self._root = self._next(root, k)
+        quarter = 1 << (root.level - 2)
+        self._origin = (self._origin[0] + quarter, self._origin[1] + quarter)
+        self.generation += 1 << k
+
+        if len(self._table) > self.max_nodes:
+            self.collect()
+
+    def run(self, generations: int) -> Set[Position]:
+        """
+        Advances by a number of generations, one advance per bit of the number.
+
+        Args:
+            generations (int): How many generations to run.
+
+        Returns:
+            set: The live cells.
+
+        Raises:
+            ValueError: If generations is negative.
+        """
+        if generations < 0:
+            raise ValueError('generations cannot be negative')
+
+        k = 0
+        while generations:
+            if generations & 1:
+                self.advance(k)
+            generations >>= 1
+            k += 1
+        return self.positions
+
+    def step(self) -> Set[Position]:
+        """
+        Advances by one generation.
+
+        Returns:
+            set: The live cells.
+        """
+        return self.run(1)
+
+    def collect(self) -> int:
+        """
+        Drops every node not reachable from the current universe.
+
+        Memoized results pointing to a dropped node are forgotten too, so a
+        collection trades recomputation for memory.
+
+        Returns:
+            int: The number of nodes dropped.
+        """
+        keep = set()
+        stack = [self._root, *self._empties[1:]]
+        while stack:
+            node = stack.pop()
+            if node.level and node not in keep:
+                keep.add(node)
+                stack += (node.nw, node.ne, node.sw, node.se)
+
+        dropped = len(self._table) - len(keep)
+        self._table = {key: node for key, node in self._table.items() if node in keep}
+        for node in keep:
+            if node.result is not None and node.result not in keep:
+                node.result = None
+        self._steps = {key: result for key, result in self._steps.items() if key[0] in keep and result in keep}
+        return dropped
+
+    def __len__(self) -> int:
+        return self._root.population
@@ -0,0 +1,177 @@
+from typing import Iterable, List, Set
+
+from game_of_life import GRID_HEIGHT, GRID_WIDTH, Position
+
+
+def to_rows(positions: Iterable[Position], width: int = GRID_WIDTH, height: int = GRID_HEIGHT) -> List[int]:
+    """
+    Packs live cells into one integer per row, bit `col` set for a live cell.
+
+    As in to_array, the grid has one more column and row than its size, because
+    adjust_grid lets cells live in column `width` and row `height`.
+
+    Args:
+        positions (Iterable[Position]): The live cells, as (col, row).
+        width (int): The grid width.
+        height (int): The grid height.
+
+    Returns:
+        list: height + 1 integers of width + 1 bits.
+
+    Raises:
+        ValueError: If a cell is outside the grid.
+    """
+    rows = [0] * (height + 1)
+    for x, y in positions:
+        if not (0 <= x <= width and 0 <= y <= height):
+            raise ValueError(f'cells must be within (0, 0) and ({width}, {height})')
+        rows[y] |= 1 << x
+    return rows
+
+
+def to_positions(rows: List[int]) -> Set[Position]:
+    """
+    Unpacks rows of bits into live cells.
+
+    Args:
+        rows (list): One integer per row.
+
+    Returns:
+        set: The live cells, as (col, row).
+    """
+    positions = set()
+    for y, row in enumerate(rows):
+        if not row:
+            continue
+        # Reading the binary digits backwards finds every set bit in one pass
+        bits = bin(row)[:1:-1]
+        x = bits.find('1')
+        while x != -1:
+            positions.add((x, y))
+            x = bits.find('1', x + 1)
+    return positions
+
+
+class PackedLife:
+    """
+    A Game of Life on rows packed into integers, with the same results as adjust_grid.
+
+    Each row is an arbitrary-precision integer holding one bit per cell, so the grid
+    takes about one bit per cell. A generation is computed a whole row at a time
+    with shifts, AND, OR and XOR: each row's cells and their left and right
+    neighbours are added into a two-bit sum per column, and the sums of three
+    consecutive rows are added into the 3x3 count, whose bits give the rule.
+
+    Attributes:
+        rows (list): height + 1 integers of width + 1 bits, bit `col` of rows[row]
+            set for a live cell.
+        width (int): The grid width.
+        height (int): The grid height.
+        generation (int): How many generations have been run.
+    """
+
+    def __init__(self, positions: Iterable[Position] = (), width: int = GRID_WIDTH,
+                 height: int = GRID_HEIGHT) -> None:
+        """
+        Initializes the PackedLife.
+
+        Args:
+            positions (Iterable[Position]): The live cells.
+            width (int): The grid width.
+            height (int): The grid height.
+
+        Raises:
+            ValueError: If a cell is outside the grid.
+        """
+        self.rows = to_rows(positions, width, height)
+        self.width = width
+        self.height = height
+        self.generation = 0
+
+    @property
+    def positions(self) -> Set[Position]:
+        """
+        The live cells, as (col, row).
+        """
+        return to_positions(self.rows)
+
+    def step(self) -> List[int]:
+        """
+        Advances by one generation.
+
+        Returns:
+            list: The rows.
+        """
+        mask = (1 << (self.width + 1)) - 1
+        rows = self.rows
+
+        # Per column, the two bits of the live cells among each cell and its left and
+        # right neighbours, with the rows above the first and below the last empty
+        ones = [0]
+        twos = [0]
+        for row in rows:
+            left = (row << 1) & mask
+            right = row >> 1
+            ones.append(left ^ row ^ right)
+            twos.append(left & row | right & (left ^ row))
+        ones.append(0)
+        twos.append(0)
+
+        new_rows = []
+        for y, row in enumerate(rows):
+            a0, b0, c0 = ones[y], ones[y + 1], ones[y + 2]
+            a1, b1, c1 = twos[y], twos[y + 1], twos[y + 2]
+            # The 3x3 count, the cell included, is ones_sum + 2 * (a1 + b1 + c1 + carry)
+            ones_sum = a0 ^ b0 ^ c0
+            carry = a0 & b0 | c0 & (a0 ^ b0)
+            # twos_sum + 2 * twos_carry is a1 + b1 + c1 + carry, except at 4
+            # (all four set), which leaves both at 0 and matches neither 1 nor 2
+            partial = a1 ^ b1 ^ c1
+            twos_sum = partial ^ carry
+            twos_carry = (a1 & b1 | c1 & (a1 ^ b1)) ^ (partial & carry)
+            # A count of 3 gives life, and so does 4 for a live cell
+            new_rows.append(ones_sum & twos_sum & ~twos_carry | row & ~ones_sum & ~twos_sum & twos_carry)
+
+        self.rows = new_rows
+        self.generation += 1
+        return new_rows
+
+    def run(self, generations: int) -> List[int]:
+        """
+        Advances by a number of generations.
+
+        Args:
+            generations (int): How many generations to run.
+
+        Returns:
+            list: The rows.
+
+        Raises:
+            ValueError: If generations is negative.
+        """
+        if generations < 0:
+            raise ValueError('generations cannot be negative')
+
+        for _ in range(generations):
+            self.step()
+        return self.rows
+
+    def __len__(self) -> int:
+        return sum(bin(row).count('1') for row in self.rows)
+
+
+def adjust_grid(positions: Iterable[Position], width: int = GRID_WIDTH, height: int = GRID_HEIGHT) -> Set[Position]:
+    """
+    Advances the live cells by one generation on packed rows, see PackedLife.
+
+    Args:
+        positions (Iterable[Position]): The live cells.
+        width (int): The grid width.
+        height (int): The grid height.
+
+    Returns:
+        set: The live cells of the next generation.
+    """
+    life = PackedLife(positions, width, height)
+    life.step()
+    return life.positions
@@ -1,4 +1,39 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import bench
+import encrypt
+import encrypt_metrics
+import encrypt_shm
+from encrypt_async import atransform, transform_stream
+from encrypt_batch import encrypt_batch, decrypt_batch, encrypt_chunks
+from encrypt_container import ContainerReader, ContainerWriter, decrypt_container
+from encrypt_file import DecryptedReader, encrypt_file, decrypt_file, open_decrypted
+from encrypt_jsonl import decrypt_jsonl, transform_jsonl
+from encrypt_pipeline import CipherPipeline
+import game_of_life
+from game_of_life_hashlife import HashLife
+import game_of_life_packed
+try:
+    import crack
+except ImportError:
+    crack = None
+try:
+    from encrypt_search import SearchIndex
+except ImportError:
+    SearchIndex = None
+try:
+    import game_of_life_dense
+except ImportError:
+    game_of_life_dense = None
 from encrypt import Salting, ReverseCipher1, ReverseCipher2, XORCipher, CaesarCipher, VigenereCipher, CustomMappingCipher
 
 class TestSalting(unittest.TestCase):
@@ -83,6 +118,35 @@ class TestXORCipher(unittest.TestCase):
         with self.assertRaises(TypeError):
             XOR = XORCipher("Hello, Students" , 78)
 
+    def test_bytes_match_text(self):
+        xor = XORCipher('Hello, Students', 'gvsu')
+        self.assertEqual(xor.cipher_text.encode('latin-1'), xor.cipher_bytes(b'Hello, Students'))
+
+    def test_bytes_in_place(self):
+        xor = XORCipher('', 'gvsu')
+        data = bytearray(b'Hello, Students')
+        self.assertIs(data, xor.cipher_bytes(data, inplace=True))
+        self.assertEqual(b'Hello, Students', xor.cipher_bytes(memoryview(data)))
+
+    def test_bytes_offset(self):
+        xor = XORCipher('', 'gvsu')
+        encrypted = xor.cipher_bytes(b'Hello, Students')
+        self.assertEqual(encrypted[5:], xor.cipher_bytes(b', Students', offset=5))
+
+    def test_bytes_bad_data(self):
+        xor = XORCipher('', 'gvsu')
+        with self.assertRaises(TypeError):
+            xor.cipher_bytes(b'read only', inplace=True)
+
+        with self.assertRaises(ValueError):
+            XORCipher('', '\u20ac').cipher_bytes(b'euro key')
+
+    def test_empty_key(self):
+        self.assertEqual('', XORCipher('', '').cipher_text)
+        self.assertEqual('Hello, Students', XORCipher('Hello, Students', '').cipher_text)
+        self.assertEqual(b'', XORCipher('', '').cipher_bytes(b''))
+        self.assertEqual(b'Hello', XORCipher('', '').cipher_bytes(b'Hello', offset=3))
+
 class TestCaesarCipher(unittest.TestCase):
     def test_encryption_example_1(self):
         cc = CaesarCipher('HELLO', 3)
@@ -123,6 +187,17 @@ class TestCaesarCipher(unittest.TestCase):
     def test_bad_data_key(self):
         with self.assertRaises(TypeError):
             cc = CaesarCipher(5, 'Bad data')
+
+    def test_drops_unknown_characters(self):
+        cc = CaesarCipher('Room 101? Yes!', 1)
+        self.assertEqual('Sppn  Zft!', cc.cipher_text)
+
+    def test_bytes(self):
+        cc = CaesarCipher('', 3)
+        self.assertEqual(b'KHOOR!', cc.cipher(b'HELLO!', 3))
+
+    def test_table_is_shared(self):
+        self.assertIs(encrypt._caesar_table(3), encrypt._caesar_table(3))
     
 class TestVigenereCipher(unittest.TestCase):
     def test_example_1(self):
@@ -141,12 +216,934 @@ class TestVigenereCipher(unittest.TestCase):
         vc = VigenereCipher('Hello Students', '163')
         self.assertEqual("Hello Students", vc.__str__())
 
+    def test_mixed_case_key(self):
+        vc = VigenereCipher('Hello Students', 'KEY')
+        self.assertEqual('Rijvs Cxsnildw', vc.cipher_text)
+        self.assertEqual('Hello Students', vc.__str__())
+
+    def test_drops_unknown_characters(self):
+        vc = VigenereCipher('Room 101? Yes!', 'abc')
+        self.assertEqual('Rpqm  Zgs!', vc.cipher_text)
+
+    def test_offset(self):
+        vc = VigenereCipher('', 'KEYKE')
+        self.assertEqual('JVS', vc.cipher('LLO', offset=2))
+        self.assertEqual(b'RIJVS', vc.cipher(b'HELLO'))
+
+    def test_bad_key_character(self):
+        vc = VigenereCipher('HELLO', 'K?Y')
+        with self.assertRaises(ValueError):
+            vc.cipher_text
+
 class TestCustomMappingCipher(unittest.TestCase):  
     def test_example_1(self):
         cmc = CustomMappingCipher('Hello Students. Welcome to GVSU!')   
         self.assertEqual('gkPP"m5oK&k$o~*m+kP/"Vkmo"my15YQ', cmc.cipher_text)
+
+    def test_decryption(self):
+        cmc = CustomMappingCipher('Hello Students. Welcome to GVSU!')
+        self.assertEqual('Hello Students. Welcome to GVSU!', cmc.__str__())
+
+    def test_bytes(self):
+        cmc = CustomMappingCipher('')
+        self.assertEqual(b'gkPP"', cmc.cipher(b'Hello'))
+        self.assertEqual(b'Hello', cmc.decrypt(b'gkPP"'))
     
 
+class TestStreaming(unittest.TestCase):
+    def test_xor_across_chunks(self):
+        chunks = ['Hello', ', Stu', 'dents']
+        encrypted = ''.join(XORCipher.encoder('gvsu').stream(chunks))
+        self.assertEqual(XORCipher('Hello, Students', 'gvsu').cipher_text, encrypted)
+        self.assertEqual('Hello, Students', ''.join(XORCipher.decoder('gvsu').stream([encrypted[:4], encrypted[4:]])))
+
+    def test_vigenere_across_chunks(self):
+        chunks = ['HEL', 'LO']
+        encrypted = ''.join(VigenereCipher.encoder('KEYKE').stream(chunks))
+        self.assertEqual('RIJVS', encrypted)
+        self.assertEqual('HELLO', ''.join(VigenereCipher.decoder('KEYKE').stream(['R', 'IJVS'])))
+
+    def test_reverse_words_across_chunks(self):
+        chunks = ['Hel', 'lo Wor', 'ld!']
+        self.assertEqual('olleH !dlroW', ''.join(ReverseCipher2.encoder().stream(chunks)))
+
+    def test_reverse_across_chunks(self):
+        chunks = ['GRAND', ' VAL', 'LEY']
+        self.assertEqual('YELLAV DNARG', ''.join(ReverseCipher1.encoder().stream(chunks)))
+
+    def test_salting_across_chunks(self):
+        self.assertEqual('GRAND VALLEY salted', ''.join(Salting.encoder(' salted').stream(['GRAND', ' VALLEY'])))
+        chunks = ['GRAND VALLEY sa', 'lt', 'ed']
+        self.assertEqual('GRAND VALLEY', ''.join(Salting.decoder(' salted').stream(chunks)))
+
+    def test_empty_salt(self):
+        # Streaming matches Salting, whose text[:-0] leaves nothing
+        self.assertEqual(str(Salting('GRAND VALLEY', '')), ''.join(Salting.decoder('').stream(['GRAND', ' VALLEY'])))
+
+    def test_long_word(self):
+        transform = encrypt.WordChunkTransform(ReverseCipher2('').encrypt, max_pending=8)
+        self.assertEqual('olleH ', transform.update('Hello Stu'))
+        with self.assertRaises(ValueError):
+            transform.update('dentsdents')
+
+    def test_caesar_and_mapping(self):
+        self.assertEqual('KHOOR', ''.join(CaesarCipher.encoder(3).stream(['HE', 'LLO'])))
+        self.assertEqual('HELLO', ''.join(CaesarCipher.decoder(3).stream(['KHO', 'OR'])))
+        encrypted = ''.join(CustomMappingCipher.encoder().stream(['Hello ', 'Students']))
+        self.assertEqual(CustomMappingCipher('Hello Students').cipher_text, encrypted)
+        self.assertEqual('Hello Students', ''.join(CustomMappingCipher.decoder().stream([encrypted])))
+
+    def test_bad_key(self):
+        with self.assertRaises(TypeError):
+            XORCipher.encoder(5)
+
+        with self.assertRaises(TypeError):
+            CaesarCipher.decoder('Bad data')
+
+class TestCodec(unittest.TestCase):
+    def test_matches_classes(self):
+        self.assertEqual('KHOOR', encrypt.Codec('caesar', 3).encrypt('HELLO'))
+        self.assertEqual('RIJVS', encrypt.Codec('vigenere', 'KEYKE').encrypt('HELLO'))
+        self.assertEqual('GRAND VALLEY salted', encrypt.Codec('salting', ' salted').encrypt('GRAND VALLEY'))
+
+    def test_round_trip(self):
+        for name, key in [('salting', '!!'), ('reverse1', None), ('reverse2', None), ('xor', 'gvsu'),
+                          ('caesar', 6), ('vigenere', '163'), ('mapping', None)]:
+            codec = encrypt.Codec(name, key)
+            self.assertEqual('Hello Students', codec.decrypt(codec.encrypt('Hello Students')))
+
+    def test_bad_data(self):
+        with self.assertRaises(ValueError):
+            encrypt.Codec('rot13')
+
+        with self.assertRaises(TypeError):
+            encrypt.Codec('caesar', 'three')
+
+
+class TestBatch(unittest.TestCase):
+    def test_order_preserved(self):
+        texts = [f'Message {encrypt.LOWER_CASE[:i % 26]}' for i in range(500)]
+        encrypted = list(encrypt_batch('vigenere', texts, 'KEY', workers=2, chunksize=16))
+        self.assertEqual([VigenereCipher(text, 'KEY').cipher_text for text in texts], encrypted)
+        self.assertEqual(texts, list(decrypt_batch('vigenere', encrypted, 'KEY', workers=2, chunksize=16)))
+
+    def test_in_process(self):
+        self.assertEqual(['KHOOR', 'DEF'], list(encrypt_batch('caesar', iter(['HELLO', 'ABC']), 3, workers=0)))
+
+    def test_bad_data(self):
+        with self.assertRaises(ValueError):
+            list(encrypt_batch('caesar', ['HELLO'], 3, chunksize=0))
+
+    def test_eager_validation(self):
+        # Bad arguments fail at the call, not at the first next()
+        with self.assertRaises(ValueError):
+            encrypt_batch('rot13', ['HELLO'])
+        with self.assertRaises(TypeError):
+            decrypt_batch('caesar', ['HELLO'], 'three', workers=2)
+        with self.assertRaises(ValueError):
+            encrypt_chunks('reverse1', ['HELLO'])
+        with self.assertRaises(TypeError):
+            atransform([], 'xor', 3)
+
+    def test_negative_workers(self):
+        with self.assertRaisesRegex(ValueError, 'workers'):
+            encrypt_batch('caesar', ['HELLO'], 3, workers=-1)
+        with self.assertRaisesRegex(ValueError, 'workers'):
+            encrypt_chunks('caesar', ['HELLO'], 3, workers=-1)
+        with self.assertRaisesRegex(ValueError, 'workers'):
+            encrypt_chunks('caesar', ['HELLO'], 3, workers=0)
+        with self.assertRaisesRegex(ValueError, 'workers'):
+            encrypt_shm.encrypt_shared(b'HELLO', 'caesar', 3, workers=-1)
+        with self.assertRaisesRegex(ValueError, 'workers'):
+            decrypt_container(os.devnull, workers=-1)
+        if crack is not None:
+            with self.assertRaisesRegex(ValueError, 'workers'):
+                crack.crack_many(['KHOOR'], workers=-1)
+
+class TestFileMode(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'plain.txt')
+        with open(self.path, 'wb') as f:
+            f.write(b'Hello, Students! ' * 5000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_xor_in_place(self):
+        plain = self.read(self.path)
+        stats = encrypt_file(self.path, 'xor', 'gvsu', window=4096)
+        self.assertEqual(len(plain), stats['bytes'])
+        self.assertEqual(XORCipher('', 'gvsu').cipher_bytes(plain), self.read(self.path))
+        decrypt_file(self.path, 'xor', 'gvsu', window=4096)
+        self.assertEqual(plain, self.read(self.path))
+
+    def test_output_file(self):
+        output = os.path.join(self.directory.name, 'cipher.txt')
+        encrypt_file(self.path, 'caesar', 3, output=output, window=4096)
+        self.assertEqual(b'Khoor, Vwxghqwv! ' * 5000, self.read(output))
+
+    def test_progress(self):
+        calls = []
+        encrypt_file(self.path, 'mapping', window=4096, progress=lambda done, total, seconds: calls.append(done))
+        self.assertEqual(85000, calls[-1])
+
+    def test_bad_data(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'0123')
+
+        with self.assertRaises(ValueError):
+            encrypt_file(self.path, 'caesar', 3)
+
+        with self.assertRaises(ValueError):
+            encrypt_file(self.path, 'reverse1')
+
+    def test_bad_key_in_place(self):
+        plain = self.read(self.path)
+        # Only the '!' at key position 5000, in the second window, lines up with a letter
+        with self.assertRaises(ValueError):
+            encrypt_file(self.path, 'vigenere', 'b' * 5000 + '!', window=4096)
+        self.assertEqual(plain, self.read(self.path))
+
+    def test_bad_key_output_file(self):
+        output = os.path.join(self.directory.name, 'cipher.txt')
+        with self.assertRaises(ValueError):
+            encrypt_file(self.path, 'vigenere', 'a!', output=output, window=4096)
+        self.assertFalse(os.path.exists(output))
+
+    def test_seekable_reader(self):
+        plain = self.read(self.path)
+        for cipher, key in [('xor', 'gvsu'), ('vigenere', 'lemon')]:
+            encrypt_file(self.path, cipher, key)
+            with open_decrypted(self.path, cipher, key) as f:
+                f.seek(40001)
+                self.assertEqual(plain[40001:41001], f.read(1000))
+                self.assertEqual(41001, f.tell())
+                f.seek(-7, io.SEEK_END)
+                self.assertEqual(plain[-7:], f.read())
+                f.seek(0)
+                self.assertEqual(plain, f.read())
+            decrypt_file(self.path, cipher, key)
+
+    def test_seekable_reader_bad_data(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'0123')
+
+        with DecryptedReader(self.path, 'vigenere', 'lemon') as f:
+            with self.assertRaises(ValueError):
+                f.seek(-1)
+            f.seek(85000)
+            with self.assertRaises(ValueError):
+                f.read(4)
+
+class TestAsync(unittest.TestCase):
+    def test_atransform(self):
+        async def chunks():
+            for chunk in ['Hello, ', 'Stu', 'dents']:
+                yield chunk
+
+        async def run():
+            return [chunk async for chunk in atransform(chunks(), 'xor', 'gvsu', offload_threshold=4)]
+
+        self.assertEqual(XORCipher('Hello, Students', 'gvsu').cipher_text, ''.join(asyncio.run(run())))
+
+    def test_transform_stream(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data('Hello World! Grand Valley'.encode())
+            reader.feed_eof()
+            left, right = socket.socketpair()
+            _, writer = await asyncio.open_connection(sock=left)
+            output, _ = await asyncio.open_connection(sock=right)
+            await transform_stream(reader, writer, 'reverse2', chunk_size=4)
+            return await output.read()
+
+        self.assertEqual('olleH !dlroW dnarG yellaV', asyncio.run(run()).decode())
+
+class TestCipherPipeline(unittest.TestCase):
+    def test_matches_stages(self):
+        pipeline = CipherPipeline([('salting', ' salted'), 'reverse1', ('caesar', 3), ('xor', 'gvsu')])
+        expected = XORCipher(CaesarCipher(ReverseCipher1('GRAND VALLEY salted').cipher_text, 3).cipher_text, 'gvsu').cipher_text
+        self.assertEqual(expected, pipeline.encrypt('GRAND VALLEY'))
+        self.assertEqual('GRAND VALLEY', pipeline.decrypt(pipeline.encrypt('GRAND VALLEY')))
+
+    def test_fusion(self):
+        pipeline = CipherPipeline([('caesar', 3), 'reverse1', ('caesar', 4), 'mapping', 'reverse1'])
+        self.assertEqual(['table'], pipeline.passes())
+        self.assertEqual(CustomMappingCipher('Olssv').cipher_text, pipeline.encrypt('Hello'))
+        self.assertEqual('Hello', pipeline.decrypt(pipeline.encrypt('Hello')))
+
+    def test_caesar_shifts_add(self):
+        pipeline = CipherPipeline([('caesar', 3), ('caesar', 20)])
+        self.assertEqual(['caesar'], pipeline.passes())
+        self.assertEqual('EBIIL', pipeline.encrypt('HELLO'))
+
+    def test_bad_data(self):
+        with self.assertRaises(ValueError):
+            CipherPipeline([])
+
+        with self.assertRaises(TypeError):
+            CipherPipeline(['reverse1']).encrypt(5)
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.directory.name, 'plain.txt')
+        self.output = os.path.join(self.directory.name, 'cipher.txt')
+        with open(self.input, 'w') as f:
+            f.write('Hello Students ' * 1000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        with open(self.output) as f:
+            return f.read()
+
+    def test_file_to_file(self):
+        encrypt.main(['caesar', '-k', '3', '-i', self.input, '-o', self.output, '--chunk-size', '100'])
+        self.assertEqual('Khoor Vwxghqwv ' * 1000, self.read())
+
+    def test_workers(self):
+        encrypt.main(['vigenere', '-k', 'KEY', '-i', self.input, '-o', self.output, '--chunk-size', '999', '-w', '2'])
+        self.assertEqual(VigenereCipher('Hello Students ' * 1000, 'KEY').cipher_text, self.read())
+
+    def test_stats(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            encrypt.main(['reverse2', '-i', self.input, '-o', self.output, '--stats'])
+        self.assertEqual('olleH stnedutS ' * 1000, self.read())
+        self.assertIn('bytes read:      15000', stderr.getvalue())
+
+    def test_stats_time_every_chunk(self):
+        # Every reading of the clock is a second after the one before
+        with mock.patch('encrypt.time.perf_counter', side_effect=range(1000)), \
+                mock.patch('encrypt._print_stats') as print_stats:
+            encrypt.main(['reverse2', '-i', self.input, '-o', self.output, '--chunk-size', '5000', '--stats'])
+        latencies = print_stats.call_args[0][3]
+        # Three chunks and the flush at the end
+        self.assertEqual([1, 1, 1, 1], latencies)
+
+    def test_stats_count_input_bytes(self):
+        # UTF-16 text re-encoded chunk by chunk would gain a byte order mark per chunk
+        with open(self.input, 'w', encoding='utf-16') as f:
+            f.write('Héllo Students ' * 1000)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            encrypt.main(['reverse2', '-i', self.input, '-o', self.output, '--encoding', 'utf-16',
+                          '--chunk-size', '1000', '--stats'])
+        self.assertIn(f'bytes read:      {os.path.getsize(self.input)}\n', stderr.getvalue())
+
+    def test_output_error_closes_input(self):
+        opened = []
+        real_open = open
+
+        def tracked_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        missing = os.path.join(self.directory.name, 'missing', 'cipher.txt')
+        with mock.patch('builtins.open', tracked_open), self.assertRaises(FileNotFoundError):
+            encrypt.main(['caesar', '-k', '3', '-i', self.input, '-o', missing])
+        self.assertEqual(1, len(opened))
+        self.assertTrue(opened[0].closed)
+
+    def test_bad_data(self):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            encrypt.main(['caesar', '-k', 'three'])
+
+class TestBench(unittest.TestCase):
+    def test_make_text(self):
+        text = bench.make_text(1000, 'special')
+        self.assertEqual(1000, len(text))
+        self.assertTrue(set(text) <= set(encrypt.SPECIAL_CHAR))
+
+    def test_run_and_compare(self):
+        baseline = bench.run([10], ['letters'], ['CaesarCipher'])
+        self.assertEqual(['encrypt', 'decrypt'], [entry['operation'] for entry in baseline['results']])
+        self.assertEqual([], bench.compare(baseline, baseline))
+
+        slower = json.loads(json.dumps(baseline))
+        slower['results'][0]['throughput'] /= 2
+        self.assertEqual(1, len(bench.compare(baseline, slower)))
+
+    def test_encrypt_runs_the_cipher(self):
+        calls = []
+        original = CaesarCipher._encrypt_text
+
+        def counting(self, text):
+            calls.append(text)
+            return original(self, text)
+
+        with mock.patch.object(CaesarCipher, '_encrypt_text', counting):
+            bench.run([10], ['letters'], ['CaesarCipher'], memory=False)
+        # One call for the object decryption is timed on, the rest from timing encryption
+        self.assertGreaterEqual(len(calls), 6)
+        self.assertEqual({bench.make_text(10, 'letters')}, set(calls))
+
+class TestCompactObjects(unittest.TestCase):
+    def tearDown(self):
+        encrypt.set_plaintext_cache(0)
+        encrypt.PLAINTEXT_CACHE.clear()
+
+    def test_no_instance_dict(self):
+        for cipher in [Salting('GRAND', '!'), ReverseCipher1('GRAND'), XORCipher('GRAND', 'gvsu'),
+                       CaesarCipher('GRAND', 3), VigenereCipher('GRAND', 'KEY'), CustomMappingCipher('GRAND')]:
+            self.assertFalse(hasattr(cipher, '__dict__'))
+
+    def test_shared_mapping(self):
+        self.assertIs(CustomMappingCipher('a').character_map, CustomMappingCipher('b').character_map)
+
+    def test_lazy_cipher_text(self):
+        cc = CaesarCipher('HELLO', 3)
+        self.assertIsNone(cc._cipher_text)
+        self.assertEqual('KHOOR', cc.cipher_text)
+        self.assertIsNone(cc._text)
+
+    def test_plaintext_cache(self):
+        encrypt.set_plaintext_cache(2)
+        rc = ReverseCipher1('GRAND VALLEY')
+        self.assertEqual('GRAND VALLEY', rc.__str__())
+        self.assertEqual('GRAND VALLEY', rc.__str__())
+        self.assertEqual(1, len(encrypt.PLAINTEXT_CACHE))
+
+        XORCipher('GRAND', 'gvsu').__str__()
+        XORCipher('GRAND', 'gvsx').__str__()
+        self.assertEqual(2, len(encrypt.PLAINTEXT_CACHE))
+
+
+class TestJsonl(unittest.TestCase):
+    RECORDS = (b'{"id": 1, "title": "Hello", "user": {"name": "Ana"}}\n'
+               b'\n'
+               b'{"id": 2, "title": "Students", "tags": [{"name": "gvsu"}, {"name": null}]}\n'
+               b'{"id": 3}')
+
+    def run_jsonl(self, data, decrypt=False, workers=0):
+        out = io.BytesIO()
+        transform_jsonl(io.BytesIO(data), out, ['title', 'user.name', 'tags.name'], [('caesar', 3)],
+                        decrypt, workers, block_size=16)
+        return out.getvalue()
+
+    def test_fields(self):
+        encrypted = self.run_jsonl(self.RECORDS).split(b'\n')
+        self.assertEqual({'id': 1, 'title': 'Khoor', 'user': {'name': 'Dqd'}}, json.loads(encrypted[0]))
+        self.assertEqual(b'', encrypted[1])
+        self.assertEqual([{'name': 'jyvx'}, {'name': None}], json.loads(encrypted[2])['tags'])
+        self.assertEqual(b'{"id": 3}', encrypted[3])
+
+    def test_round_trip(self):
+        encrypted = self.run_jsonl(self.RECORDS, workers=2)
+        self.assertEqual(self.run_jsonl(self.RECORDS), encrypted)
+        self.assertEqual(self.RECORDS, self.run_jsonl(encrypted, decrypt=True, workers=2))
+
+    def test_xor_round_trip(self):
+        out, back = io.BytesIO(), io.BytesIO()
+        transform_jsonl(io.BytesIO(self.RECORDS), out, ['title'], [('xor', 'ключ')], workers=0)
+        decrypt_jsonl(io.BytesIO(out.getvalue()), back, ['title'], [('xor', 'ключ')], workers=0)
+        self.assertEqual(self.RECORDS, back.getvalue())
+
+    def test_layout_kept(self):
+        records = ('{"title":"Hello","n":1.0,"u":"café"}\n'
+                   '{"title": "Students",  "n": 1.10, "u": "caf\\u00e9"}\n').encode('utf-8')
+        encrypted = self.run_jsonl(records)
+        self.assertEqual(('{"title":"Khoor","n":1.0,"u":"café"}\n'
+                          '{"title": "Vwxghqwv",  "n": 1.10, "u": "caf\\u00e9"}\n').encode('utf-8'), encrypted)
+        self.assertEqual(records, self.run_jsonl(encrypted, decrypt=True, workers=2))
+
+    def test_bad_data(self):
+        with self.assertRaises(TypeError):
+            self.run_jsonl(b'{"title": 5}\n')
+
+        with self.assertRaises(ValueError):
+            self.run_jsonl(b'{"title": "a"}\n'[:-3])
+
+        with self.assertRaises(ValueError):
+            self.run_jsonl(b'{"title": "a", "title": "b"}\n')
+
+    def test_overlapping_fields(self):
+        for fields in (['title', 'title'], ['user', 'id', 'user.name']):
+            with self.assertRaises(ValueError):
+                transform_jsonl(io.BytesIO(self.RECORDS), io.BytesIO(), fields, [('caesar', 3)], workers=0)
+
+
+class TestViews(unittest.TestCase):
+    def test_salted_view(self):
+        view = Salting.view('GRAND VALLEY', ' salted')
+        self.assertEqual(Salting('GRAND VALLEY', ' salted').cipher_text, view)
+        self.assertEqual('GRAND VALLEY salted', str(view))
+        self.assertEqual(19, len(view))
+        self.assertEqual('Y s', view[11:14])
+        self.assertEqual('d', view[-1])
+        self.assertEqual('GRAND VALLEY salted'[::2], view[::2])
+        self.assertEqual('GRAND VALLEY', view.text)
+        self.assertEqual(b'ab!', bytes(Salting.view(b'ab', b'!')))
+
+        with self.assertRaises(TypeError):
+            Salting.view('ab', b'!')
+
+    def test_reversed_view(self):
+        view = ReverseCipher1.view('GRAND VALLEY')
+        self.assertEqual(ReverseCipher1('GRAND VALLEY').cipher_text, view)
+        self.assertEqual('YELLAV DNARG', str(view))
+        self.assertEqual('Y', view[0])
+        self.assertEqual('LLA', view[2:5])
+        self.assertEqual('GRAND VALLEY', view[::-1])
+        self.assertEqual(list('YELLAV DNARG'), list(view))
+
+    def test_views_match_cipher_text(self):
+        text = 'Hello World, Grand Valley'
+        for name, cls in encrypt.CIPHERS.items():
+            if not hasattr(cls, 'view'):
+                continue
+            args = (' salted',) if name in encrypt.KEYED_CIPHERS else ()
+            self.assertEqual(cls(text, *args).cipher_text, str(cls.view(text, *args)), name)
+
+        self.assertFalse(hasattr(ReverseCipher2, 'view'))
+
+    def test_reversed_memoryview(self):
+        data = bytearray(b'GRAND')
+        exported = ReverseCipher1.view(data).memoryview()
+        self.assertEqual(b'DNARG', exported.tobytes())
+        data[0] = ord('B')
+        self.assertEqual(b'DNARB', exported.tobytes())
+
+        with self.assertRaises(TypeError):
+            ReverseCipher1.view('GRAND').memoryview()
+
+
+class TestSharedMemory(unittest.TestCase):
+    def setUp(self):
+        self.min_range_size = encrypt_shm.MIN_RANGE_SIZE
+        encrypt_shm.MIN_RANGE_SIZE = 1000
+
+    def tearDown(self):
+        encrypt_shm.MIN_RANGE_SIZE = self.min_range_size
+
+    def test_matches_codec(self):
+        data = b'Hello, Students 2024! ' * 500
+        for cipher, key in [('xor', 'gvsu'), ('caesar', 3), ('vigenere', 'lemon'), ('mapping', None)]:
+            codec = encrypt.Codec(cipher, key)
+            encrypted = encrypt_shm.encrypt_shared(data, cipher, key, workers=2)
+            self.assertEqual(codec.encrypt(data), encrypted)
+            self.assertEqual(codec.decrypt(encrypted), encrypt_shm.decrypt_shared(encrypted, cipher, key, workers=2))
+
+    def test_bad_data(self):
+        self.assertEqual(b'', encrypt_shm.encrypt_shared(b'', 'xor', 'gvsu'))
+
+        with self.assertRaises(ValueError):
+            encrypt_shm.encrypt_shared(b'abc', 'reverse1')
+
+
+class TestContainer(unittest.TestCase):
+    TEXT = 'Hello, Students! ' * 300
+
+    def write(self, cipher, key, chunk_size=1000):
+        target = io.BytesIO()
+        with ContainerWriter(target, cipher, key, chunk_size) as writer:
+            for start in range(0, len(self.TEXT), 333):
+                writer.write(self.TEXT[start:start + 333])
+        target.seek(0)
+        return target
+
+    def test_round_trip(self):
+        for cipher, key in [('xor', 'gvsu'), ('caesar', 3), ('vigenere', 'lemon'), ('mapping', None)]:
+            reader = ContainerReader(self.write(cipher, key), key)
+            self.assertEqual(self.TEXT, reader.read())
+            self.assertEqual(6, len(reader.chunks))
+            self.assertEqual(self.TEXT[4000:5000], reader.read_chunk(reader.find_chunk(4321)))
+
+    def test_parallel(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'text.enc')
+            with open(path, 'wb') as f:
+                f.write(self.write('vigenere', 'lemon').getvalue())
+            self.assertEqual(self.TEXT, ''.join(decrypt_container(path, 'lemon', workers=2)))
+
+    def test_bad_data(self):
+        data = bytearray(self.write('xor', 'gvsu').getvalue())
+        with self.assertRaises(ValueError):
+            ContainerReader(io.BytesIO(data), 'gvsx')
+
+        data[100] ^= 1
+        reader = ContainerReader(io.BytesIO(data), 'gvsu')
+        with self.assertRaises(ValueError):
+            reader.read()
+
+        with self.assertRaises(ValueError):
+            ContainerWriter(io.BytesIO(), 'reverse1')
+
+        data = bytearray(self.write('xor', 'gvsu').getvalue())
+        data[ContainerReader(io.BytesIO(data), 'gvsu').chunks[1].position] = ord('X')
+        reader = ContainerReader(io.BytesIO(data), 'gvsu')
+        with self.assertRaisesRegex(ValueError, 'corrupt container'):
+            reader.read()
+
+    def test_key_fingerprint(self):
+        # Keys that encrypt the same way match, and each container has its own salt
+        self.assertEqual(self.TEXT, ContainerReader(self.write('caesar', 3), 29).read())
+        self.assertEqual(self.TEXT, ContainerReader(self.write('vigenere', 'Lemon'), 'l4mon').read())
+        first = ContainerReader(self.write('caesar', 3), 3)
+        second = ContainerReader(self.write('caesar', 3), 3)
+        self.assertNotEqual(first.salt, second.salt)
+        self.assertNotEqual(first.fingerprint, second.fingerprint)
+
+
+class TestMetrics(unittest.TestCase):
+    def tearDown(self):
+        encrypt_metrics.disable()
+
+    def test_instrument(self):
+        registry = encrypt_metrics.Registry()
+        with encrypt_metrics.instrument(registry):
+            cc = CaesarCipher('HELLO', 3)
+            self.assertEqual('KHOOR', cc.cipher_text)
+            self.assertEqual('HELLO', str(cc))
+            encrypt.Codec('vigenere', 'lemon').encrypt('attack')
+
+        series = {(s['cipher'], s['operation']): s for s in registry.snapshot()}
+        self.assertEqual({('CaesarCipher', 'encrypt'), ('CaesarCipher', 'decrypt'), ('CaesarCipher', '__str__'),
+                          ('VigenereCipher', 'encrypt')}, set(series))
+        self.assertEqual(1, series['CaesarCipher', '__str__']['calls'])
+        self.assertEqual(6, series['VigenereCipher', 'encrypt']['characters'])
+        self.assertEqual(1, sum(count for _, count in series['CaesarCipher', 'encrypt']['histogram']))
+        self.assertEqual(4, len(json.loads(registry.to_json())))
+        self.assertIn('cipher_seconds_count{cipher="CaesarCipher",operation="encrypt"} 1', registry.to_prometheus())
+
+    def test_self_inverse_decrypt(self):
+        for name, key in [('reverse1', None), ('reverse2', None), ('xor', 'gvsu')]:
+            codec = encrypt.Codec(name, key)
+            ciphertext = codec.encrypt('Hello, Students!')
+            with encrypt_metrics.instrument(encrypt_metrics.Registry()) as registry:
+                self.assertEqual('Hello, Students!', codec.decrypt(ciphertext))
+            self.assertEqual(['decrypt'], [series['operation'] for series in registry.snapshot()])
+
+    def test_disabled(self):
+        with encrypt_metrics.instrument() as registry:
+            with self.assertRaises(RuntimeError):
+                encrypt_metrics.enable()
+        self.assertFalse(encrypt_metrics.enabled())
+        self.assertNotIn('__str__', vars(CaesarCipher))
+        self.assertIs(encrypt._LazyCipher.__str__, CaesarCipher.__str__)
+
+        registry.reset()
+        CaesarCipher('HELLO', 3).cipher_text
+        self.assertEqual([], registry.snapshot())
+
+
+class TestKeyScheduleCache(unittest.TestCase):
+    def tearDown(self):
+        encrypt.set_key_schedule_cache(encrypt.KEY_SCHEDULE_CACHE_SIZE)
+
+    def test_counters(self):
+        cache = encrypt.LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2}, cache.stats())
+
+    def test_schedules_reused(self):
+        encrypt.KEY_SCHEDULE_CACHE.clear()
+        for _ in range(3):
+            VigenereCipher('attack at dawn', 'lemon').cipher_text
+            XORCipher('attack at dawn', 'gvsu').cipher_text
+        stats = encrypt.KEY_SCHEDULE_CACHE.stats()
+        self.assertEqual(stats['size'], stats['misses'])
+        self.assertGreater(stats['hits'], stats['misses'])
+
+    def test_disabled(self):
+        encrypt.set_key_schedule_cache(0)
+        self.assertEqual(0, len(encrypt.KEY_SCHEDULE_CACHE))
+        self.assertEqual('KHOOR', CaesarCipher('HELLO', 3).cipher_text)
+        self.assertEqual(0, len(encrypt.KEY_SCHEDULE_CACHE))
+
+    def test_threads(self):
+        encrypt.set_key_schedule_cache(8)
+        texts = [f'message number {encrypt.LOWER_CASE[i]}' for i in range(26)]
+        with ThreadPoolExecutor(4) as executor:
+            encrypted = list(executor.map(lambda i: VigenereCipher(texts[i], encrypt.LOWER_CASE[i:] + 'x').cipher_text,
+                                          range(26)))
+        self.assertEqual([VigenereCipher(text, encrypt.LOWER_CASE[i:] + 'x').cipher_text for i, text in enumerate(texts)],
+                         encrypted)
+        self.assertLessEqual(len(encrypt.KEY_SCHEDULE_CACHE), 8)
+
+
+class TestGameOfLife(unittest.TestCase):
+    GLIDER = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+
+    def test_patterns(self):
+        blinker = {(5, 4), (5, 5), (5, 6)}
+        self.assertEqual({(4, 5), (5, 5), (6, 5)}, game_of_life.adjust_grid(blinker))
+        self.assertEqual(blinker, game_of_life.run(blinker, 2))
+
+        block = {(0, 0), (0, 1), (1, 0), (1, 1)}
+        self.assertEqual(block, game_of_life.run(block, 5))
+        self.assertEqual({(x + 1, y + 1) for x, y in self.GLIDER}, game_of_life.run(self.GLIDER, 4))
+
+    def test_edges(self):
+        # Column and row 40 exist past the 40x40 grid, 41 and -1 do not
+        self.assertEqual(8, len(game_of_life.get_neighbors((39, 39))))
+        self.assertEqual(3, len(game_of_life.get_neighbors((40, 40))))
+        self.assertEqual(3, len(game_of_life.get_neighbors((0, 0))))
+        self.assertEqual({(39, 1), (40, 1)}, game_of_life.adjust_grid({(40, 0), (40, 1), (40, 2)}))
+        self.assertEqual({(0, 0), (1, 0), (0, 1), (1, 1)}, game_of_life.adjust_grid({(0, 0), (1, 0), (0, 1)}))
+
+    def test_life(self):
+        life = game_of_life.Life(self.GLIDER)
+        life.run(3)
+        life.step()
+        self.assertEqual(4, life.generation)
+        self.assertEqual({(x + 1, y + 1) for x, y in self.GLIDER}, life.positions)
+        self.assertEqual(5, len(life))
+        with self.assertRaises(ValueError):
+            life.run(-1)
+
+    def test_sparse(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            # Including cells off a small grid, which adjust_grid keeps while they
+            # have neighbours on it
+            positions = game_of_life.gen(30, 8, 8, rng) | {(rng.randrange(-2, 11), rng.randrange(-2, 11))
+                                                          for _ in range(10)}
+            for _ in range(4):
+                expected = game_of_life.adjust_grid(positions, 8, 8)
+                self.assertEqual(expected, game_of_life.adjust_grid_sparse(positions, 8, 8))
+                positions = expected
+
+        # An unbounded universe has no edge to stop a glider
+        self.assertEqual({(x - 40, y + 40) for x, y in {(1, 0), (0, 1), (2, 2), (1, 2), (0, 2)}},
+                         game_of_life.run({(1, 0), (0, 1), (2, 2), (1, 2), (0, 2)}, 160, None, None))
+        with self.assertRaises(ValueError):
+            game_of_life.adjust_grid_sparse(self.GLIDER, None, 40)
+
+    def test_front_end_import(self):
+        import Conways_Game_of_Life
+        self.assertIs(game_of_life.adjust_grid, Conways_Game_of_Life.adjust_grid)
+
+
+class TestPackedLife(unittest.TestCase):
+    def test_matches_adjust_grid(self):
+        rng = random.Random(0)
+        for _ in range(5):
+            # Including the extra column and row past the grid
+            positions = game_of_life.gen(600, rng=rng) | {(40, row) for row in range(0, 41, 3)} | {(8, 40), (9, 40)}
+            reference = set(positions)
+            life = game_of_life_packed.PackedLife(positions)
+            for _ in range(30):
+                reference = game_of_life.adjust_grid(reference)
+                life.step()
+                self.assertEqual(reference, life.positions)
+            self.assertEqual(len(reference), len(life))
+
+    def test_adaptive_step(self):
+        # Stepping one generation at a time checks the density once per batch
+        rng = random.Random(2)
+        positions = game_of_life.gen(400, rng=rng)
+        reference = set(positions)
+        life = game_of_life_dense.AdaptiveLife(positions)
+        with mock.patch.object(life, '_to_dense', wraps=life._to_dense) as to_dense, \
+                mock.patch.object(life, '_check_dense', wraps=life._check_dense) as check_dense:
+            for _ in range(3 * game_of_life_dense.ADAPTIVE_BATCH):
+                reference = game_of_life.adjust_grid(reference)
+                life.step()
+                self.assertEqual(reference, life.positions)
+        self.assertEqual(3, to_dense.call_count + check_dense.call_count)
+
+    def test_conversion(self):
+        positions = {(0, 0), (3, 1), (40, 40)}
+        rows = game_of_life_packed.to_rows(positions)
+        self.assertEqual(41, len(rows))
+        self.assertEqual(0b1000, rows[1])
+        self.assertEqual(positions, game_of_life_packed.to_positions(rows))
+        self.assertEqual({(4, 5), (5, 5), (6, 5)}, game_of_life_packed.adjust_grid({(5, 4), (5, 5), (5, 6)}))
+        with self.assertRaises(ValueError):
+            game_of_life_packed.to_rows({(0, 41)})
+
+
+class TestHashLife(unittest.TestCase):
+    R_PENTOMINO = {(1, 0), (2, 0), (0, 1), (1, 1), (1, 2)}
+
+    def test_matches_sparse(self):
+        rng = random.Random(0)
+        for _ in range(5):
+            positions = {(rng.randrange(-8, 8), rng.randrange(-8, 8)) for _ in range(80)}
+            sparse = game_of_life.Life(positions, None, None)
+            life = HashLife(positions)
+            for generations in [1, 2, 5, 13, 64]:
+                self.assertEqual(sparse.run(generations), life.run(generations))
+            self.assertEqual(85, life.generation)
+
+    def test_advance(self):
+        glider = TestGameOfLife.GLIDER
+        life = HashLife(glider)
+        life.advance(40)
+        # A glider moves one cell diagonally every four generations
+        self.assertEqual({(x + 2 ** 38, y + 2 ** 38) for x, y in glider}, life.positions)
+
+        life = HashLife(self.R_PENTOMINO)
+        life.run(1103)
+        self.assertEqual(116, len(life))
+        with self.assertRaises(ValueError):
+            life.advance(-1)
+
+    def test_collect(self):
+        sparse = game_of_life.Life(self.R_PENTOMINO, None, None)
+        life = HashLife(self.R_PENTOMINO, max_nodes=300)
+        for generations in [100, 37, 256]:
+            self.assertEqual(sparse.run(generations), life.run(generations))
+            self.assertLessEqual(life.nodes, 300)
+        self.assertEqual(0, life.collect())
+        self.assertEqual(set(), HashLife().run(10))
+
+        # The table is also collected while the root doubles ahead of one advance
+        life = HashLife(self.R_PENTOMINO, max_nodes=50)
+        life.run(200)
+        with mock.patch.object(life, 'collect', wraps=life.collect) as collect:
+            life.advance(30)
+        self.assertGreater(collect.call_count, 1)
+
+
+@unittest.skipIf(game_of_life_dense is None, 'game_of_life_dense.py needs numpy')
+class TestDenseLife(unittest.TestCase):
+    def test_matches_adjust_grid(self):
+        rng = random.Random(0)
+        for _ in range(5):
+            # Cells in the extra column and row past the grid follow the same rules
+            positions = game_of_life.gen(600, rng=rng) | {(40, row) for row in range(0, 41, 3)}
+            reference = game_of_life.Life(positions)
+            dense = game_of_life_dense.DenseLife(positions)
+            for _ in range(30):
+                reference.step()
+                dense.step()
+                self.assertEqual(reference.positions, dense.positions)
+            self.assertEqual(len(reference), len(dense))
+
+    def test_adaptive(self):
+        rng = random.Random(1)
+        positions = game_of_life.gen(400, rng=rng)
+        reference = set(positions)
+        life = game_of_life_dense.AdaptiveLife(positions)
+        for _ in range(4):
+            for _ in range(20):
+                reference = game_of_life.adjust_grid(reference)
+            life.run(20)
+            self.assertEqual(reference, life.positions)
+        self.assertEqual(80, life.generation)
+
+        # A soup in an unbounded universe runs dense, then thins out into debris and
+        # gliders flying apart, and goes back to the sparse engine
+        positions = game_of_life.gen(400, 30, 30, rng)
+        sparse = game_of_life.Life(positions, None, None)
+        life = game_of_life_dense.AdaptiveLife(positions, None, None)
+        engines = set()
+        for _ in range(60):
+            life.run(50)
+            sparse.run(50)
+            engines.add(life.engine)
+            self.assertEqual(sparse.positions, life.positions)
+        self.assertEqual({'dense', 'sparse'}, engines)
+
+        life = game_of_life_dense.AdaptiveLife(TestGameOfLife.GLIDER, None, None)
+        life.run(40)
+        self.assertEqual('sparse', life.engine)
+        self.assertEqual(5, len(life))
+
+    def test_conversion(self):
+        positions = {(0, 0), (3, 1), (40, 40)}
+        cells = game_of_life_dense.to_array(positions)
+        self.assertEqual((41, 41), cells.shape)
+        self.assertEqual(1, cells[1, 3])
+        self.assertEqual(positions, game_of_life_dense.to_positions(cells))
+        self.assertEqual({(4, 5), (5, 5), (6, 5)}, game_of_life_dense.adjust_grid({(5, 4), (5, 5), (5, 6)}))
+        with self.assertRaises(ValueError):
+            game_of_life_dense.to_array({(41, 0)})
+
+
+@unittest.skipIf(crack is None, 'crack.py needs numpy')
+class TestCrack(unittest.TestCase):
+    TEXT = ('It was the best of times it was the worst of times it was the age of wisdom it was the age '
+            'of foolishness it was the epoch of belief it was the epoch of incredulity it was the season '
+            'of light it was the season of darkness it was the spring of hope it was the winter of despair')
+
+    def test_caesar(self):
+        self.assertEqual((7, self.TEXT), crack.crack_caesar(CaesarCipher(self.TEXT, 7).cipher_text))
+
+    def test_vigenere(self):
+        for key in ['key', 'lemon', 'abcdefgh']:
+            ciphertext = VigenereCipher(self.TEXT, key).cipher_text
+            self.assertEqual(len(key), crack.estimate_key_length(ciphertext))
+            self.assertEqual((key, self.TEXT), crack.crack_vigenere(ciphertext))
+
+    def test_repeated_key(self):
+        ciphertext = VigenereCipher(self.TEXT, 'gvsu').cipher_text
+        self.assertEqual(('gvsu', self.TEXT), crack.crack_vigenere(ciphertext, key_length=8))
+
+    def test_many(self):
+        ciphertexts = [CaesarCipher(self.TEXT, shift).cipher_text for shift in range(4)]
+        self.assertEqual([0, 1, 2, 3], [shift for shift, _ in crack.crack_many(ciphertexts, workers=2)])
+
+        with self.assertRaises(ValueError):
+            crack.crack_many(ciphertexts, 'xor')
+
+
+@unittest.skipIf(SearchIndex is None, 'encrypt_search.py needs numpy')
+class TestSearch(unittest.TestCase):
+    RECORDS = ['Hello, Students!', 'say hello to the students', 'yellow fellows', 'ok', '']
+
+    def build(self, cipher='caesar', key=3):
+        codec = encrypt.Codec(cipher, key)
+        return SearchIndex.build([codec.encrypt(text) for text in self.RECORDS], cipher, key, range(10, 15))
+
+    def test_search(self):
+        index = self.build()
+        self.assertEqual(5, len(index))
+        self.assertEqual([11], index.search('hello'))
+        self.assertEqual([10, 11, 12], index.search('ello'))
+        self.assertEqual([11], index.search('lo t'))
+        self.assertEqual([10, 11, 12, 13], index.search('o'))
+        self.assertEqual([], index.search('so'))
+        self.assertEqual([], index.search('students!?'))
+        self.assertEqual(list(range(10, 15)), index.search(''))
+        with self.assertRaises(TypeError):
+            index.search(b'hello')
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'records.idx')
+            self.build('mapping', None).save(path)
+            index = SearchIndex.load(path)
+            try:
+                self.assertEqual([10, 11], index.search('tudents'))
+                self.assertEqual([12], index.search('ws'))
+            finally:
+                index.close()
+
+            with self.assertRaises(ValueError):
+                SearchIndex.load(path, 'abc')
+
+    def test_whole_words(self):
+        index = self.build('reverse2', None)
+        self.assertEqual([11], index.search('say hello'))
+        self.assertEqual([12], index.search('yellow'))
+        self.assertEqual([11], index.search('o t'))
+        # 'hello world' encrypts to 'olleh dlrow', and 'ah da' to 'ha ad'
+        index = SearchIndex.build([encrypt.Codec('reverse2').encrypt(text) for text in
+                                   ['hello world', 'hah dad', 'ah da', 'a  b']], 'reverse2')
+        self.assertEqual([1, 2], index.search('h d'))
+        self.assertEqual([1, 2], index.search('ah da'))
+        self.assertEqual([0], index.search('lo wo'))
+        self.assertEqual([3], index.search('  '))
+        self.assertEqual([], index.search('o  w'))
+
+    def test_invalid_cipher(self):
+        with self.assertRaises(ValueError):
+            SearchIndex.build([], 'vigenere', 'lemon')
+
 
 if __name__ == "__main__":
     # Isolated Testing for Salting